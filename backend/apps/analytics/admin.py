@@ -0,0 +1,17 @@
+from django.contrib import admin
+
+from .models import HourlyCategoryRollup, HourlyOrderRollup
+
+
+@admin.register(HourlyOrderRollup)
+class HourlyOrderRollupAdmin(admin.ModelAdmin):
+    list_display = ("vendor", "hour", "orders", "covers", "revenue")
+    list_filter = ("vendor",)
+    date_hierarchy = "hour"
+
+
+@admin.register(HourlyCategoryRollup)
+class HourlyCategoryRollupAdmin(admin.ModelAdmin):
+    list_display = ("vendor", "category", "hour", "quantity", "revenue")
+    list_filter = ("vendor",)
+    date_hierarchy = "hour"
@@ -0,0 +1,16 @@
+from apps.analytics.utils import rebuild_rollups
+from apps.vendor.sharding import vendor_tenants
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = "Recompute the hourly order and menu item rollups from delivered orders."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--vendor", type=int, help="Only this vendor.")
+
+    def handle(self, *args, **options):
+        hours = 0
+        for vendor_id in vendor_tenants(options["vendor"]):
+            hours += rebuild_rollups(vendor_id)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {hours} hourly rollups."))
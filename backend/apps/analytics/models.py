@@ -0,0 +1,47 @@
+from apps.category.models import Category
+from apps.vendor.models import Vendor, VendorScopedModel
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class HourlyOrderRollup(VendorScopedModel):
+    """Delivered orders of a vendor per local hour, bucketed by creation time."""
+
+    vendor = models.ForeignKey(
+        Vendor, on_delete=models.CASCADE, related_name="hourly_order_rollups"
+    )
+    hour = models.DateTimeField()
+    # weekday * 24 + hour of day in ANALYTICS_TIME_ZONE, Monday = 0.
+    hour_of_week = models.PositiveSmallIntegerField()
+    orders = models.PositiveIntegerField(default=0)
+    covers = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        unique_together = ["vendor", "hour"]
+        verbose_name = _("Hourly order rollup")
+
+    def __str__(self):
+        return f"{self.vendor} {self.hour:%Y-%m-%d %H}:00 - {self.orders} orders"
+
+
+class HourlyCategoryRollup(VendorScopedModel):
+    """Quantity and revenue of one menu item of a vendor per local hour."""
+
+    vendor = models.ForeignKey(
+        Vendor, on_delete=models.CASCADE, related_name="hourly_category_rollups"
+    )
+    category = models.ForeignKey(
+        Category, on_delete=models.CASCADE, related_name="hourly_rollups"
+    )
+    hour = models.DateTimeField()
+    hour_of_week = models.PositiveSmallIntegerField()
+    quantity = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        unique_together = ["vendor", "category", "hour"]
+        verbose_name = _("Hourly category rollup")
+
+    def __str__(self):
+        return f"{self.category} {self.hour:%Y-%m-%d %H}:00 - {self.quantity}"
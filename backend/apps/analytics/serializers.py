@@ -0,0 +1,41 @@
+from datetime import timedelta
+
+from django.utils import timezone
+from rest_framework import serializers
+
+from .utils import analytics_timezone, parse_report_date
+
+
+class HeatmapQuerySerializer(serializers.Serializer):
+    CALENDARS = ["gregorian", "jalali"]
+
+    start = serializers.RegexField(r"^\d{4}-\d{1,2}-\d{1,2}$", required=False)
+    end = serializers.RegexField(r"^\d{4}-\d{1,2}-\d{1,2}$", required=False)
+    calendar = serializers.ChoiceField(choices=CALENDARS, default="gregorian")
+    top = serializers.IntegerField(min_value=1, max_value=50, default=10)
+
+    def validate(self, data):
+        calendar = data["calendar"]
+        try:
+            end = (
+                parse_report_date(data["end"], calendar)
+                if data.get("end")
+                else timezone.localtime(timezone=analytics_timezone()).date()
+            )
+            start = (
+                parse_report_date(data["start"], calendar)
+                if data.get("start")
+                else end - timedelta(days=29)
+            )
+        except ValueError as exc:
+            raise serializers.ValidationError({"detail": str(exc)})
+        if start > end:
+            raise serializers.ValidationError(
+                {"start": "The range must not end before it starts."}
+            )
+        if (end - start).days > 366 * 2:
+            raise serializers.ValidationError(
+                {"start": "Reports cover at most two years."}
+            )
+        data["start"], data["end"] = start, end
+        return data
@@ -0,0 +1,11 @@
+from apps.restaurant.models import Order
+from apps.restaurant.utils import order_status_changed
+from django.dispatch import receiver
+
+from .utils import record_delivered_order
+
+
+@receiver(order_status_changed, sender=Order)
+def roll_up_delivered_order(sender, order, **kwargs):
+    if order.status == Order.OrderStatus.DELIVERED:
+        record_delivered_order(order)
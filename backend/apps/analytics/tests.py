@@ -0,0 +1,92 @@
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import jdatetime
+import pytest
+from apps.category.models import Category
+from apps.restaurant.models import Order, OrderItem
+from apps.restaurant.utils import transition_order
+from apps.users.models import User
+from apps.vendor.models import Vendor
+from django.core.management import call_command
+from rest_framework.test import APIClient
+
+from .models import HourlyCategoryRollup, HourlyOrderRollup
+
+
+def _deliver(vendor, created_at, items, covers=2):
+    order = Order.objects.create(
+        vendor=vendor,
+        customer="Guest",
+        covers=covers,
+        status=Order.OrderStatus.ACCEPTED,
+    )
+    Order.objects.filter(pk=order.pk).update(created_at=created_at)
+    for category, quantity, price in items:
+        OrderItem.objects.create(
+            order=order, category=category, quantity=quantity, price=price
+        )
+    order.refresh_from_db()
+    assert transition_order(order, Order.OrderStatus.DELIVERED)
+    return order
+
+
+@pytest.mark.django_db
+def test_delivered_orders_roll_up_into_heatmaps(settings):
+    settings.ANALYTICS_TIME_ZONE = "Asia/Kabul"
+    user = User.objects.create_user(
+        first_name="john", last_name="doe", email="john@example.com", password="x"
+    )
+    vendor = Vendor.objects.create(user=user, name="Shop")
+    kebab = Category.objects.create(vendor=vendor, owner=user, name="Kebab")
+    tea = Category.objects.create(vendor=vendor, owner=user, name="Tea")
+
+    # 2024-03-22 15:40 UTC is Friday 20:10 in Kabul (UTC+4:30), 1403-01-03.
+    friday_evening = datetime(2024, 3, 22, 15, 40, tzinfo=timezone.utc)
+    _deliver(
+        vendor, friday_evening, [(kebab, 2, Decimal("4.50")), (tea, 4, Decimal("0.50"))]
+    )
+    _deliver(vendor, friday_evening, [(kebab, 1, Decimal("4.50"))], covers=1)
+    Order.objects.create(vendor=vendor, customer="Pending")
+
+    assert HourlyOrderRollup.objects.get().orders == 2
+    assert HourlyCategoryRollup.objects.get(category=kebab).quantity == 3
+
+    client = APIClient()
+    client.force_authenticate(user)
+    response = client.get(
+        "/api/v1/analytics/heatmap/",
+        {"start": "1403-01-01", "end": "1403-01-07", "calendar": "jalali"},
+    )
+    assert response.status_code == 200
+    report = response.json()
+    assert report["range"]["start"] == "2024-03-20"
+    # Jalali rows start on Saturday, so Friday is the last row.
+    assert report["weekdays"][0] == "Saturday"
+    assert report["orders"][6][20] == 2
+    assert report["covers"][6][20] == 3
+    assert report["revenue"][6][20] == 15.5
+    assert report["peak"] == {"weekday": "Friday", "hour": 20, "orders": 2}
+    assert [item["name"] for item in report["popular_items"]] == ["Tea", "Kebab"]
+    assert report["popular_items"][1]["by_hour"][20] == 3
+
+    outside = client.get(
+        "/api/v1/analytics/heatmap/", {"start": "2024-03-23", "end": "2024-03-30"}
+    ).json()
+    assert outside["totals"]["orders"] == 0
+
+    expected = list(HourlyOrderRollup.objects.values("hour", "orders", "revenue"))
+    call_command("rebuild_order_rollups")
+    assert list(HourlyOrderRollup.objects.values("hour", "orders", "revenue")) == (
+        expected
+    )
+    assert HourlyCategoryRollup.objects.get(category=tea).revenue == Decimal("2.00")
+
+
+def test_jalali_dates_parse_to_gregorian():
+    from .utils import parse_report_date
+
+    assert (
+        parse_report_date("1403-01-01", "jalali")
+        == jdatetime.date(1403, 1, 1).togregorian()
+    )
@@ -0,0 +1,7 @@
+from django.urls import path
+
+from . import views
+
+urlpatterns = [
+    path("heatmap/", views.HeatmapView.as_view(), name="analytics-heatmap"),
+]
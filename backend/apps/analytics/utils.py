@@ -0,0 +1,300 @@
+import zoneinfo
+from datetime import date, datetime, time, timedelta
+
+import jdatetime
+import numpy as np
+from apps.vendor.sharding import tenant_atomic
+from django.conf import settings
+from django.db.models import (
+    Case,
+    Count,
+    DecimalField,
+    F,
+    Q,
+    Sum,
+    Value,
+    When,
+)
+from django.db.models.functions import TruncHour
+from django.utils import timezone
+
+from .models import HourlyCategoryRollup, HourlyOrderRollup
+
+MONEY = DecimalField(max_digits=14, decimal_places=2)
+WEEKDAYS = [
+    "Monday",
+    "Tuesday",
+    "Wednesday",
+    "Thursday",
+    "Friday",
+    "Saturday",
+    "Sunday",
+]
+# The Jalali week starts on Saturday, i.e. two rows before Monday.
+JALALI_WEEK_SHIFT = 2
+
+
+def analytics_timezone():
+    return zoneinfo.ZoneInfo(settings.ANALYTICS_TIME_ZONE)
+
+
+def hour_bucket(moment):
+    """Return the local hour ``moment`` falls in and its hour of the week."""
+    local = timezone.localtime(moment, analytics_timezone())
+    local = local.replace(minute=0, second=0, microsecond=0)
+    return local, local.weekday() * 24 + local.hour
+
+
+def _add_to_rollups(model, unique_fields, buckets):
+    """
+    Add counters onto rollup rows in a constant number of queries.
+
+    ``buckets`` maps a tuple of ``unique_fields`` values to ``(fixed, increments)``
+    dicts. Missing rows are inserted empty with ``ignore_conflicts``, then one
+    UPDATE adds every increment with ``F()``, so concurrent deliveries never
+    overwrite each other.
+    """
+    if not buckets:
+        return
+    model.objects.bulk_create(
+        [
+            model(**dict(zip(unique_fields, key)), **fixed)
+            for key, (fixed, _) in buckets.items()
+        ],
+        ignore_conflicts=True,
+    )
+    match = Q()
+    for key in buckets:
+        match |= Q(**dict(zip(unique_fields, key)))
+    ids = {
+        tuple(row[:-1]): row[-1]
+        for row in model.objects.filter(match).values_list(*unique_fields, "pk")
+    }
+    fields = next(iter(buckets.values()))[1]
+    model.objects.filter(pk__in=ids.values()).update(
+        **{
+            field: Case(
+                *[
+                    When(pk=ids[key], then=F(field) + Value(increments[field]))
+                    for key, (_, increments) in buckets.items()
+                ],
+                output_field=model._meta.get_field(field),
+            )
+            for field in fields
+        }
+    )
+
+
+@tenant_atomic
+def record_delivered_order(order):
+    """Add a delivered order and its items to the hourly rollups."""
+    from apps.restaurant.models import OrderItem
+
+    hour, hour_of_week = hour_bucket(order.created_at)
+    fixed = {"hour_of_week": hour_of_week}
+    _add_to_rollups(
+        HourlyOrderRollup,
+        ["vendor_id", "hour"],
+        {
+            (order.vendor_id, hour): (
+                fixed,
+                {"orders": 1, "covers": order.covers, "revenue": order.subtotal},
+            )
+        },
+    )
+    items = (
+        OrderItem.objects.filter(order=order)
+        .order_by()
+        .values("category_id")
+        .annotate(
+            sold=Sum("quantity"),
+            income=Sum(F("price") * F("quantity"), output_field=MONEY),
+        )
+    )
+    _add_to_rollups(
+        HourlyCategoryRollup,
+        ["vendor_id", "category_id", "hour"],
+        {
+            (order.vendor_id, item["category_id"], hour): (
+                fixed,
+                {"quantity": item["sold"], "revenue": item["income"]},
+            )
+            for item in items
+        },
+    )
+
+
+@tenant_atomic
+def rebuild_rollups(vendor_id=None):
+    """Recompute the rollups from delivered orders; returns the hours written."""
+    from apps.restaurant.models import Order, OrderItem
+
+    tz = analytics_timezone()
+    orders = Order.objects.filter(status=Order.OrderStatus.DELIVERED)
+    order_rollups = HourlyOrderRollup.objects.all()
+    category_rollups = HourlyCategoryRollup.objects.all()
+    if vendor_id is not None:
+        orders = orders.filter(vendor_id=vendor_id)
+        order_rollups = order_rollups.filter(vendor_id=vendor_id)
+        category_rollups = category_rollups.filter(vendor_id=vendor_id)
+    order_rollups.delete()
+    category_rollups.delete()
+
+    def bucket(value):
+        return hour_bucket(value)[1]
+
+    hours = (
+        orders.annotate(bucket=TruncHour("created_at", tzinfo=tz))
+        .order_by()
+        .values("vendor_id", "bucket")
+        .annotate(count=Count("pk"), guests=Sum("covers"), income=Sum("subtotal"))
+    )
+    created = HourlyOrderRollup.objects.bulk_create(
+        (
+            HourlyOrderRollup(
+                vendor_id=row["vendor_id"],
+                hour=row["bucket"],
+                hour_of_week=bucket(row["bucket"]),
+                orders=row["count"],
+                covers=row["guests"],
+                revenue=row["income"],
+            )
+            for row in hours
+        ),
+        batch_size=1000,
+    )
+    items = (
+        OrderItem.objects.filter(order__in=orders)
+        .annotate(bucket=TruncHour("order__created_at", tzinfo=tz))
+        .order_by()
+        .values("order__vendor_id", "category_id", "bucket")
+        .annotate(
+            sold=Sum("quantity"),
+            income=Sum(F("price") * F("quantity"), output_field=MONEY),
+        )
+    )
+    HourlyCategoryRollup.objects.bulk_create(
+        (
+            HourlyCategoryRollup(
+                vendor_id=row["order__vendor_id"],
+                category_id=row["category_id"],
+                hour=row["bucket"],
+                hour_of_week=bucket(row["bucket"]),
+                quantity=row["sold"],
+                revenue=row["income"],
+            )
+            for row in items
+        ),
+        batch_size=1000,
+    )
+    return len(created)
+
+
+def parse_report_date(value, calendar):
+    """Parse ``YYYY-MM-DD`` in the given calendar into a Gregorian ``date``."""
+    year, month, day = (int(part) for part in value.split("-"))
+    if calendar == "jalali":
+        return jdatetime.date(year, month, day).togregorian()
+    return date(year, month, day)
+
+
+def _weekday_counts(start, end):
+    days = np.arange(
+        np.datetime64(start), np.datetime64(end + timedelta(days=1)), dtype="M8[D]"
+    )
+    # 1970-01-01 was a Thursday (Monday = 0).
+    return np.bincount((days.astype(np.int64) + 3) % 7, minlength=7)
+
+
+def _hour_grid(hour_of_week, weights):
+    return np.bincount(hour_of_week, weights=weights, minlength=168).reshape(7, 24)
+
+
+def heatmap_report(vendor_id, start, end, calendar="gregorian", top=10):
+    """
+    Build peak-hour heatmaps and item popularity for ``start``..``end``.
+
+    Only rollup rows are read; the grids are summed with ``numpy.bincount``
+    over the hour of the week. Rows are weekdays, starting on Saturday for
+    the Jalali calendar, and columns are the hours of the day.
+    """
+    tz = analytics_timezone()
+    lower = datetime.combine(start, time.min, tzinfo=tz)
+    upper = datetime.combine(end + timedelta(days=1), time.min, tzinfo=tz)
+
+    rows = np.array(
+        HourlyOrderRollup.objects.for_vendor(vendor_id)
+        .filter(hour__gte=lower, hour__lt=upper)
+        .values_list("hour_of_week", "orders", "covers", "revenue"),
+        dtype=float,
+    ).reshape(-1, 4)
+    hour_of_week = rows[:, 0].astype(np.int64)
+    orders = _hour_grid(hour_of_week, rows[:, 1])
+    covers = _hour_grid(hour_of_week, rows[:, 2])
+    revenue = _hour_grid(hour_of_week, rows[:, 3])
+    average_orders = orders / np.maximum(_weekday_counts(start, end), 1)[:, None]
+
+    items = list(
+        HourlyCategoryRollup.objects.for_vendor(vendor_id)
+        .filter(hour__gte=lower, hour__lt=upper)
+        .values_list(
+            "category_id", "category__name", "hour_of_week", "quantity", "revenue"
+        )
+    )
+    popularity = []
+    if items:
+        names = {row[0]: row[1] for row in items}
+        category_ids, index = np.unique([row[0] for row in items], return_inverse=True)
+        quantities = np.array([row[3] for row in items], dtype=float)
+        quantity = np.bincount(index, weights=quantities)
+        income = np.bincount(index, weights=[float(row[4]) for row in items])
+        by_hour = np.zeros((len(category_ids), 24))
+        np.add.at(
+            by_hour, (index, np.array([row[2] for row in items]) % 24), quantities
+        )
+        for position in np.argsort(-quantity, kind="stable")[:top]:
+            category_id = category_ids[position].item()
+            popularity.append(
+                {
+                    "category": category_id,
+                    "name": names[category_id],
+                    "quantity": int(quantity[position]),
+                    "revenue": round(float(income[position]), 2),
+                    "by_hour": by_hour[position].astype(int).tolist(),
+                }
+            )
+
+    weekdays = WEEKDAYS
+    if calendar == "jalali":
+        weekdays = np.roll(WEEKDAYS, JALALI_WEEK_SHIFT).tolist()
+        orders, covers, revenue, average_orders = (
+            np.roll(grid, JALALI_WEEK_SHIFT, axis=0)
+            for grid in (orders, covers, revenue, average_orders)
+        )
+
+    peak_day, peak_hour = np.unravel_index(np.argmax(orders), orders.shape)
+    return {
+        "range": {
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "start_jalali": jdatetime.date.fromgregorian(date=start).isoformat(),
+            "end_jalali": jdatetime.date.fromgregorian(date=end).isoformat(),
+            "time_zone": settings.ANALYTICS_TIME_ZONE,
+        },
+        "weekdays": weekdays,
+        "orders": orders.astype(int).tolist(),
+        "average_orders": np.round(average_orders, 2).tolist(),
+        "covers": covers.astype(int).tolist(),
+        "revenue": np.round(revenue, 2).tolist(),
+        "totals": {
+            "orders": int(orders.sum()),
+            "covers": int(covers.sum()),
+            "revenue": round(float(revenue.sum()), 2),
+        },
+        "peak": {
+            "weekday": weekdays[peak_day],
+            "hour": int(peak_hour),
+            "orders": int(orders[peak_day, peak_hour]),
+        },
+        "popular_items": popularity,
+    }
@@ -0,0 +1,33 @@
+from apps.restaurant.utils import user_vendor_id
+from apps.vendor.mixins import VendorScopedViewMixin
+from apps.vendor.tenancy import current_vendor_id
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .serializers import HeatmapQuerySerializer
+from .utils import heatmap_report
+
+
+class HeatmapView(VendorScopedViewMixin, APIView):
+    """Peak hours and best-selling menu items of the user's vendor."""
+
+    permission_classes = [IsAuthenticated]
+
+    def get_tenant_vendor_id(self, request):
+        # Reports are for the vendor's own people, not for any user who
+        # happens to browse its subdomain.
+        return user_vendor_id(request.user)
+
+    def get(self, request):
+        serializer = HeatmapQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        vendor_id = current_vendor_id()
+        if vendor_id is None:
+            return Response(
+                {"detail": "No vendor found for this user."},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        report = heatmap_report(vendor_id, **serializer.validated_data)
+        return Response(report, status=status.HTTP_200_OK)
@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Attribute, AttributeValue, Category
+from .models import Attribute, AttributeValue, Category, ToolPropagationJob
 
 
 # Inline admin for AttributeValue (attached to Attribute only)
@@ -31,6 +31,13 @@ class AttributeAdmin(admin.ModelAdmin):
     inlines = [AttributeValueInline]
 
 
+@admin.register(ToolPropagationJob)
+class ToolPropagationJobAdmin(admin.ModelAdmin):
+    list_display = ("category", "status", "processed", "total", "created_at")
+    list_filter = ("status",)
+    readonly_fields = ("renames", "removed", "total", "processed", "error")
+
+
 # IMPORTANT: Don't register AttributeValue separately
 # That prevents it from appearing independently in admin
 try:
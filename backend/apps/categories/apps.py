@@ -6,3 +6,6 @@ class CategoriesConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.categories"
     verbose_name = _("Category")
+
+    def ready(self):
+        from apps.categories import signals
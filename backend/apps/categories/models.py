@@ -1,11 +1,11 @@
 from apps.common.models import TimeStampedModel
-from apps.vendor.models import Vendor
+from apps.vendor.models import Vendor, VendorScopedModel
 from django.core.exceptions import ValidationError
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 
 
-class Category(TimeStampedModel):
+class Category(TimeStampedModel, VendorScopedModel):
     vendor = models.ForeignKey(
         Vendor,
         on_delete=models.CASCADE,
@@ -29,7 +29,7 @@ class Category(TimeStampedModel):
         return self.name
 
 
-class Attribute(models.Model):
+class Attribute(VendorScopedModel):
     class AttributeChoiceType(models.TextChoices):
         DROPDOWN = "dropdown", "Dropdown"
         DATE = "date", "Date"
@@ -89,9 +89,14 @@ class Attribute(models.Model):
     class Meta:
         unique_together = ["name", "category", "tool_key"]
         ordering = ["-category", "tool_key"]
+        indexes = [
+            models.Index(
+                fields=["vendor", "category"], name="attribute_vendor_category"
+            ),
+        ]
 
 
-class AttributeValue(models.Model):
+class AttributeValue(VendorScopedModel):
     vendor = models.ForeignKey(
         Vendor, on_delete=models.CASCADE, related_name="attribute_values"
     )
@@ -135,3 +140,42 @@ class AttributeValue(models.Model):
     class Meta:
         unique_together = ["attribute", "attribute_value"]
         ordering = ["-attribute"]
+        indexes = [
+            models.Index(fields=["vendor", "attribute"], name="attribute_value_vendor"),
+        ]
+
+
+class ToolPropagationJob(TimeStampedModel):
+    class JobStatus(models.TextChoices):
+        PENDING = "pending", _("Pending")
+        RUNNING = "running", _("Running")
+        DONE = "done", _("Done")
+        FAILED = "failed", _("Failed")
+
+    category = models.ForeignKey(
+        Category, on_delete=models.CASCADE, related_name="tool_jobs"
+    )
+    renames = models.JSONField(
+        default=dict, help_text=_("Mapping of old tool key to new tool key.")
+    )
+    removed = models.JSONField(
+        default=list, help_text=_("Tool keys dropped from the category.")
+    )
+    status = models.CharField(
+        max_length=10, choices=JobStatus.choices, default=JobStatus.PENDING
+    )
+    total = models.PositiveIntegerField(default=0)
+    processed = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"{self.category.name} tools ({self.status})"
+
+    @property
+    def progress(self):
+        if not self.total:
+            return 100 if self.status == self.JobStatus.DONE else 0
+        return round(self.processed * 100 / self.total)
@@ -1,6 +1,6 @@
 from rest_framework import serializers
 
-from .models import Attribute, AttributeValue, Category
+from .models import Attribute, AttributeValue, Category, ToolPropagationJob
 
 
 class AttributeValueSerializer(serializers.ModelSerializer):
@@ -58,11 +58,64 @@ class AttributeSerializer(serializers.ModelSerializer):
 
 
 class CategorySerializer(serializers.ModelSerializer):
+    tool_renames = serializers.DictField(
+        child=serializers.CharField(), write_only=True, required=False
+    )
+
     class Meta:
         model = Category
-        fields = ["id", "name", "tools", "created_at", "updated_at"]
+        fields = ["id", "name", "tools", "tool_renames", "created_at", "updated_at"]
         read_only_fields = ["id", "created_at", "updated_at"]
 
     def create(self, validated_data):
+        validated_data.pop("tool_renames", None)
         validated_data["vendor"] = self.context["request"].user.vendor
         return super().create(validated_data)
+
+    def validate(self, attrs):
+        renames = attrs.get("tool_renames") or {}
+        if self.instance is not None and renames:
+            old_tools = self.instance.tools
+            new_tools = attrs.get("tools", old_tools)
+            invalid = [
+                old
+                for old, new in renames.items()
+                if old not in old_tools
+                or old in new_tools
+                or new not in new_tools
+                or new in old_tools
+            ]
+            if invalid:
+                # Dropping them would turn the intended renames into removals.
+                raise serializers.ValidationError(
+                    {
+                        "tool_renames": f"Not renames of removed to added tools: {invalid}."
+                    }
+                )
+        return attrs
+
+    def update(self, instance, validated_data):
+        # Picked up by the post_save signal to tell renames from removals.
+        instance._tool_renames = validated_data.pop("tool_renames", None)
+        return super().update(instance, validated_data)
+
+
+class ToolPropagationJobSerializer(serializers.ModelSerializer):
+    progress = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = ToolPropagationJob
+        fields = [
+            "id",
+            "category",
+            "renames",
+            "removed",
+            "status",
+            "total",
+            "processed",
+            "progress",
+            "error",
+            "created_at",
+            "updated_at",
+        ]
+        read_only_fields = fields
@@ -0,0 +1,34 @@
+from apps.common.tasks import run_in_background
+from django.db.models.signals import post_save, pre_save
+from django.dispatch import receiver
+
+from .models import Category, ToolPropagationJob
+from .utils import diff_tools, propagate_tool_changes
+
+
+@receiver(pre_save, sender=Category)
+def remember_previous_values(sender, instance, **kwargs):
+    previous = None
+    if not instance._state.adding:
+        previous = (
+            Category.objects.filter(pk=instance.pk).values_list("tools", "name").first()
+        )
+    instance._previous_tools, instance._previous_name = previous or (None, None)
+
+
+@receiver(post_save, sender=Category)
+def schedule_tool_propagation(sender, instance, created, **kwargs):
+    previous = getattr(instance, "_previous_tools", None)
+    if created or previous is None or previous == instance.tools:
+        return
+
+    renames, removed = diff_tools(
+        previous, instance.tools, getattr(instance, "_tool_renames", None)
+    )
+    if not renames and not removed:
+        return
+
+    job = ToolPropagationJob.objects.create(
+        category=instance, renames=renames, removed=removed
+    )
+    run_in_background(propagate_tool_changes, job.pk)
@@ -1,3 +1,95 @@
-from django.test import TestCase
+import pytest
+from apps.inventory.models import Product
+from apps.users.models import User
+from apps.vendor.models import Vendor
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from .models import Attribute, Category, ToolPropagationJob
+from .utils import diff_tools
+
+
+def test_diff_tools_only_renames_explicitly():
+    # A removal and an addition at the same index are not a rename.
+    renames, removed = diff_tools(["drill", "saw", "hammer"], ["drill", "jigsaw"])
+    assert renames == {}
+    assert removed == ["saw", "hammer"]
+
+    renames, removed = diff_tools(
+        ["drill", "saw", "hammer"], ["jigsaw", "drill"], renames={"saw": "jigsaw"}
+    )
+    assert renames == {"saw": "jigsaw"}
+    assert removed == ["hammer"]
+
+
+def test_diff_tools_prefers_explicit_renames():
+    renames, removed = diff_tools(["a", "b"], ["c", "d"], renames={"a": "d"})
+    assert renames == {"a": "d"}
+    assert removed == ["b"]
+
+
+@pytest.mark.django_db
+def test_tool_change_propagates_to_products_and_attributes(
+    settings, django_capture_on_commit_callbacks
+):
+    settings.BACKGROUND_TASKS_EAGER = True
+    user = User.objects.create_user(
+        first_name="john", last_name="doe", email="john@example.com", password="x"
+    )
+    vendor = Vendor.objects.create(user=user, name="Shop")
+    category = Category.objects.create(
+        vendor=vendor, name="Tools", tools=["saw", "axe"]
+    )
+    for i in range(3):
+        Product.objects.create(
+            vendor=vendor, category=category, tool="saw", attributes={}, sku=f"s{i}"
+        )
+    Product.objects.create(
+        vendor=vendor, category=category, tool="axe", attributes={}, sku="a0"
+    )
+    Attribute.objects.create(
+        vendor=vendor,
+        category=category,
+        name="Blade",
+        tool_key="saw",
+        attribute_value=[],
+    )
+    Attribute.objects.create(
+        vendor=vendor,
+        category=category,
+        name="Weight",
+        tool_key="axe",
+        attribute_value=[],
+    )
+
+    with django_capture_on_commit_callbacks(execute=True):
+        category.tools = ["jigsaw"]
+        category._tool_renames = {"saw": "jigsaw"}
+        category.save()
+
+    job = ToolPropagationJob.objects.get(category=category)
+    assert job.status == ToolPropagationJob.JobStatus.DONE
+    assert job.processed == job.total == 6
+    assert Product.objects.filter(tool="jigsaw").count() == 3
+    assert Product.objects.get(sku="a0").tool == ""
+    assert list(Attribute.objects.values_list("tool_key", flat=True)) == ["jigsaw"]
+
+
+@pytest.mark.django_db
+def test_invalid_tool_renames_are_rejected():
+    user = User.objects.create_user(
+        first_name="john", last_name="doe", email="john@example.com", password="x"
+    )
+    vendor = Vendor.objects.create(user=user, name="Shop")
+    category = Category.objects.create(vendor=vendor, name="Tools", tools=["saw"])
+    client = APIClient()
+    client.force_authenticate(user)
+
+    response = client.patch(
+        f"/api/v1/categories/categories/{category.pk}/",
+        {"tools": ["jigsaw"], "tool_renames": {"saw": "bandsaw"}},
+        format="json",
+    )
+    assert response.status_code == 400
+    assert "tool_renames" in response.json()
+    category.refresh_from_db()
+    assert category.tools == ["saw"]
@@ -0,0 +1,99 @@
+from django.db import transaction
+from django.db.models import F
+
+from .models import Attribute, ToolPropagationJob
+
+# Rows rewritten per transaction. Small chunks keep SQLite's single writer lock
+# short so regular requests can interleave with a large propagation.
+CHUNK_SIZE = 500
+
+
+def diff_tools(old_tools, new_tools, renames=None):
+    """
+    Work out which tool keys were renamed and which were removed.
+
+    Tool keys are the identity of a tool, so a key missing from
+    ``new_tools`` was removed unless ``renames`` (old key -> new key) maps it
+    to a key that was added. Where a key sits in the list does not matter.
+    """
+    old_tools = list(old_tools or [])
+    new_tools = list(new_tools or [])
+    renames = {
+        old: new
+        for old, new in (renames or {}).items()
+        if old in old_tools
+        and old not in new_tools
+        and new in new_tools
+        and new not in old_tools
+    }
+    removed = [t for t in old_tools if t not in new_tools and t not in renames]
+    return renames, removed
+
+
+def _chunked(queryset, job, apply, after=None):
+    """Apply ``apply`` to ``queryset`` in short transactions until it is empty."""
+    model = queryset.model
+    while True:
+        ids = list(queryset.values_list("pk", flat=True)[:CHUNK_SIZE])
+        if not ids:
+            return
+        with transaction.atomic(using=queryset.db):
+            apply(model.objects.filter(pk__in=ids))
+            if after is not None:
+                after(ids)
+            ToolPropagationJob.objects.filter(pk=job.pk).update(
+                processed=F("processed") + len(ids)
+            )
+
+
+def _delete(queryset):
+    queryset.delete()
+
+
+def _update(**changes):
+    def apply(queryset):
+        queryset.update(**changes)
+
+    return apply
+
+
+def propagate_tool_changes(job_id):
+    """Rewrite the products and attributes of a category after its tools changed."""
+    from apps.inventory.models import Product
+    from apps.inventory.utils import index_products
+
+    job = ToolPropagationJob.objects.select_related("category").get(pk=job_id)
+    category = job.category
+    products = Product.objects.filter(category=category)
+    attributes = Attribute.objects.filter(category=category)
+    keys = list(job.renames) + list(job.removed)
+
+    total = (
+        products.filter(tool__in=keys).count()
+        + attributes.filter(tool_key__in=keys).count()
+    )
+    ToolPropagationJob.objects.filter(pk=job.pk).update(
+        status=ToolPropagationJob.JobStatus.RUNNING, total=total, processed=0
+    )
+
+    try:
+        for old, new in job.renames.items():
+            # Attributes already defined under the new key would collide on
+            # the (name, category, tool_key) constraint; the new key wins.
+            taken = attributes.filter(tool_key=new).values("name")
+            _chunked(attributes.filter(tool_key=old, name__in=taken), job, _delete)
+            _chunked(attributes.filter(tool_key=old), job, _update(tool_key=new))
+            _chunked(products.filter(tool=old), job, _update(tool=new), index_products)
+
+        for tool in job.removed:
+            _chunked(attributes.filter(tool_key=tool), job, _delete)
+            _chunked(products.filter(tool=tool), job, _update(tool=""), index_products)
+    except Exception as exc:
+        ToolPropagationJob.objects.filter(pk=job.pk).update(
+            status=ToolPropagationJob.JobStatus.FAILED, error=str(exc)
+        )
+        raise
+
+    ToolPropagationJob.objects.filter(pk=job.pk).update(
+        status=ToolPropagationJob.JobStatus.DONE
+    )
@@ -1,49 +1,39 @@
-from rest_framework import permissions, viewsets
+from apps.vendor.mixins import VendorScopedViewMixin
+from rest_framework import permissions, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
 
 from .models import Attribute, AttributeValue, Category
 from .serializers import (
     AttributeSerializer,
     AttributeValueSerializer,
     CategorySerializer,
+    ToolPropagationJobSerializer,
 )
 
 
-class VendorPermission(permissions.BasePermission):
-    def has_object_permission(self, request, view, obj):
-        return (
-            hasattr(request.user, "vendor")
-            and getattr(obj, "vendor", None) == request.user.vendor
-        )
-
-
-class CategoryViewSet(viewsets.ModelViewSet):
+class CategoryViewSet(VendorScopedViewMixin, viewsets.ModelViewSet):
+    queryset = Category.objects.all()
     serializer_class = CategorySerializer
-    permission_classes = [permissions.IsAuthenticated, VendorPermission]
+    permission_classes = [permissions.IsAuthenticated]
+    owners_only = True
 
-    def get_queryset(self):
-        return Category.objects.filter(vendor=self.request.user.vendor)
+    @action(detail=True, methods=["get"], url_path="tool-jobs")
+    def tool_jobs(self, request, pk=None):
+        category = self.get_object()
+        serializer = ToolPropagationJobSerializer(category.tool_jobs.all(), many=True)
+        return Response(serializer.data, status=status.HTTP_200_OK)
 
-    def perform_create(self, serializer):
-        serializer.save(vendor=self.request.user.vendor)
 
-
-class AttributeViewSet(viewsets.ModelViewSet):
+class AttributeViewSet(VendorScopedViewMixin, viewsets.ModelViewSet):
+    queryset = Attribute.objects.all()
     serializer_class = AttributeSerializer
-    permission_classes = [permissions.IsAuthenticated, VendorPermission]
-
-    def get_queryset(self):
-        return Attribute.objects.filter(vendor=self.request.user.vendor)
+    permission_classes = [permissions.IsAuthenticated]
+    owners_only = True
 
-    def perform_create(self, serializer):
-        serializer.save(vendor=self.request.user.vendor)
 
-
-class AttributeValueViewSet(viewsets.ModelViewSet):
+class AttributeValueViewSet(VendorScopedViewMixin, viewsets.ModelViewSet):
+    queryset = AttributeValue.objects.all()
     serializer_class = AttributeValueSerializer
-    permission_classes = [permissions.IsAuthenticated, VendorPermission]
-
-    def get_queryset(self):
-        return AttributeValue.objects.filter(vendor=self.request.user.vendor)
-
-    def perform_create(self, serializer):
-        serializer.save(vendor=self.request.user.vendor)
+    permission_classes = [permissions.IsAuthenticated]
+    owners_only = True
@@ -6,3 +6,6 @@ class CategoryConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.category"
     verbose_name = _("Category")
+
+    def ready(self):
+        from apps.category import signals
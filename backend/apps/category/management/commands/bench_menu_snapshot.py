@@ -0,0 +1,72 @@
+import time
+
+from apps.category.models import Category, Menu
+from apps.category.views import MenuViewSet
+from apps.users.models import User
+from apps.vendor.models import Vendor
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import RequestFactory, override_settings
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure requests per second of the public menu listing with and "
+        "without the cached snapshot. Test data is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--items", type=int, default=200)
+        parser.add_argument("--requests", type=int, default=500)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            vendor_id = self.seed(options["items"])
+            view = MenuViewSet.as_view({"get": "list"})
+            factory = RequestFactory(HTTP_HOST="localhost")
+            total = options["requests"]
+
+            def run(headers=None):
+                started = time.perf_counter()
+                for _ in range(total):
+                    request = factory.get(
+                        "/api/v1/category/menus/",
+                        {"vendor": vendor_id},
+                        **(headers or {}),
+                    )
+                    response = view(request)
+                elapsed = time.perf_counter() - started
+                return total / elapsed, response
+
+            with override_settings(MENU_SNAPSHOT_ENABLED=False):
+                uncached, _ = run()
+            cache.clear()
+            cached, response = run()
+            not_modified, _ = run({"HTTP_IF_NONE_MATCH": response["ETag"]})
+
+            transaction.set_rollback(True)
+
+        self.stdout.write(f"menu items:          {options['items']}")
+        self.stdout.write(f"database (before):   {uncached:10.1f} req/s")
+        self.stdout.write(f"snapshot (after):    {cached:10.1f} req/s")
+        self.stdout.write(f"snapshot, 304:       {not_modified:10.1f} req/s")
+
+    def seed(self, items):
+        user = User.objects.create_user(
+            first_name="bench",
+            last_name="menu",
+            email=f"bench-menu-{time.time_ns()}@example.com",
+            password=None,
+        )
+        vendor = Vendor.objects.create(user=user, name="Menu benchmark")
+        category = Category.objects.create(vendor=vendor, owner=user, name="Dishes")
+        Menu.objects.bulk_create(
+            Menu(
+                category=category,
+                vendor=vendor,
+                attributes={"name": f"Dish {i}", "price": "9.50", "spicy": i % 2 == 0},
+            )
+            for i in range(items)
+        )
+        return vendor.id
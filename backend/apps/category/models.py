@@ -1,4 +1,5 @@
-from apps.vendor.models import Vendor
+from apps.common.storage import content_addressed_storage
+from apps.vendor.models import Vendor, VendorScopedModel
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
 from django.db import models
@@ -6,7 +7,7 @@ from django.db import models
 User = get_user_model()
 
 
-class Category(models.Model):
+class Category(VendorScopedModel):
     vendor = models.ForeignKey(
         Vendor,
         on_delete=models.CASCADE,
@@ -28,7 +29,7 @@ class Category(models.Model):
         unique_together = ("vendor", "name")
 
 
-class AttributeType(models.Model):
+class AttributeType(VendorScopedModel):
     ATTRIBUTE_CHOICE_TYPE = (
         ("dropdown", "dropdown"),
         ("checkbox", "checkbox"),
@@ -64,9 +65,12 @@ class AttributeType(models.Model):
 
     class Meta:
         unique_together = ["name", "category"]
+        indexes = [
+            models.Index(fields=["vendor", "category"], name="attribute_type_vendor"),
+        ]
 
 
-class AttributeValue(models.Model):
+class AttributeValue(VendorScopedModel):
     attribute = models.ForeignKey(
         AttributeType,
         on_delete=models.CASCADE,
@@ -97,9 +101,14 @@ class AttributeValue(models.Model):
 
     class Meta:
         unique_together = ["attribute", "attribute_value"]
+        indexes = [
+            models.Index(
+                fields=["vendor", "attribute"], name="menu_attribute_value_vendor"
+            ),
+        ]
 
 
-class Menu(models.Model):
+class Menu(VendorScopedModel):
     category = models.ForeignKey(
         Category, on_delete=models.CASCADE, related_name="menu_items"
     )
@@ -108,7 +117,18 @@ class Menu(models.Model):
     )
     attributes = models.JSONField(default=dict)
     is_available = models.BooleanField(default=True)
-    image = models.ImageField(upload_to="menu_images/", blank=True, null=True)
+    image = models.ImageField(
+        upload_to="menu_images/",
+        storage=content_addressed_storage,
+        blank=True,
+        null=True,
+    )
+    image_hash = models.CharField(max_length=64, blank=True, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["vendor", "category"], name="menu_vendor_category"),
+        ]
 
     def __str__(self):
         return self.category.name
@@ -1,6 +1,8 @@
+from apps.common.images import image_variant_urls, schedule_image_derivatives
+from apps.common.storage import retain_files
 from apps.restaurant.models import MultiImages
 from apps.restaurant.serializers import MultiImagesSerializer
-from apps.vendor.models import Vendor
+from apps.vendor.mixins import VendorScopedSerializerMixin
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
 
@@ -10,14 +12,7 @@ User = get_user_model()
 import json
 
 
-class CategorySerializer(serializers.ModelSerializer):
-    vendor_id = serializers.PrimaryKeyRelatedField(
-        queryset=Vendor.objects.all(), source="vendor", write_only=True
-    )
-    owner_id = serializers.PrimaryKeyRelatedField(
-        queryset=User.objects.all(), source="owner", write_only=True
-    )
-
+class CategorySerializer(VendorScopedSerializerMixin, serializers.ModelSerializer):
     multi_images = MultiImagesSerializer(many=True, read_only=True)
 
     uploaded_images = serializers.ListField(
@@ -32,9 +27,7 @@ class CategorySerializer(serializers.ModelSerializer):
         model = Category
         fields = [
             "id",
-            "vendor_id",
             "name",
-            "owner_id",
             "created_at",
             "multi_images",
             "uploaded_images",
@@ -45,10 +38,7 @@ class CategorySerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         uploaded_images = validated_data.pop("uploaded_images", [])
         category = Category.objects.create(**validated_data)
-
-        for img in uploaded_images:
-            MultiImages.objects.create(category=category, image=img)
-
+        self._save_images(category, uploaded_images)
         return category
 
     def update(self, instance, validated_data):
@@ -68,8 +58,7 @@ class CategorySerializer(serializers.ModelSerializer):
             kept_ids = []
 
         # Save new uploaded images
-        for img in uploaded_images:
-            MultiImages.objects.create(category=instance, image=img)
+        self._save_images(instance, uploaded_images)
 
         # Delete images not in kept_ids
         to_remove = set(existing_ids) - set(kept_ids)
@@ -78,16 +67,23 @@ class CategorySerializer(serializers.ModelSerializer):
 
         return instance
 
+    def _save_images(self, category, uploaded_images):
+        # bulk_create skips post_save, so file references and derivatives
+        # are handled here.
+        images = MultiImages.objects.bulk_create(
+            [MultiImages(category=category, image=img) for img in uploaded_images]
+        )
+        retain_files(images)
+        for image in images:
+            schedule_image_derivatives(image)
+
 
-class AttributeTypeSerializer(serializers.ModelSerializer):
-    category = serializers.PrimaryKeyRelatedField(queryset=Category.objects.all())
+class AttributeTypeSerializer(VendorScopedSerializerMixin, serializers.ModelSerializer):
+    category = serializers.PrimaryKeyRelatedField(queryset=Category.objects)
     attribute_type = serializers.ChoiceField(
         choices=AttributeType.ATTRIBUTE_CHOICE_TYPE,
         default="select attribute type",
     )
-    vendor_id = serializers.PrimaryKeyRelatedField(
-        queryset=Vendor.objects.all(), source="vendor", write_only=True
-    )
 
     class Meta:
         model = AttributeType
@@ -95,18 +91,16 @@ class AttributeTypeSerializer(serializers.ModelSerializer):
             "id",
             "name",
             "category",
-            "vendor_id",
             "attribute_type",
             "created_at",
             "updated_at",
         ]
 
 
-class AttributeValueSerializer(serializers.ModelSerializer):
-    attribute = serializers.PrimaryKeyRelatedField(queryset=AttributeType.objects.all())
-    vendor_id = serializers.PrimaryKeyRelatedField(
-        queryset=Vendor.objects.all(), source="vendor", write_only=True
-    )
+class AttributeValueSerializer(
+    VendorScopedSerializerMixin, serializers.ModelSerializer
+):
+    attribute = serializers.PrimaryKeyRelatedField(queryset=AttributeType.objects)
 
     class Meta:
         model = AttributeValue
@@ -114,15 +108,52 @@ class AttributeValueSerializer(serializers.ModelSerializer):
             "id",
             "attribute",
             "attribute_value",
-            "vendor_id",
             "created_at",
             "updated_at",
         ]
 
 
-class MenuSerializer(serializers.ModelSerializer):
+class MenuSerializer(VendorScopedSerializerMixin, serializers.ModelSerializer):
     attributes = serializers.JSONField()
+    image_variants = serializers.SerializerMethodField()
 
     class Meta:
         model = Menu
-        fields = ["id", "category", "vendor", "attributes", "is_available", "image"]
+        fields = [
+            "id",
+            "category",
+            "vendor",
+            "attributes",
+            "is_available",
+            "image",
+            "image_variants",
+        ]
+        read_only_fields = ("vendor",)
+
+    def get_image_variants(self, obj):
+        return image_variant_urls(
+            obj.image, obj.image_hash, self.context.get("request")
+        )
+
+
+class AttributeMatrixRowSerializer(serializers.Serializer):
+    name = serializers.CharField(max_length=50)
+    attribute_type = serializers.ChoiceField(
+        choices=AttributeType.ATTRIBUTE_CHOICE_TYPE
+    )
+    values = serializers.ListField(
+        child=serializers.CharField(max_length=255), allow_empty=True
+    )
+
+
+class AttributeMatrixSerializer(serializers.Serializer):
+    attributes = AttributeMatrixRowSerializer(many=True)
+    prune = serializers.BooleanField(default=True)
+
+    def validate_attributes(self, value):
+        names = [row["name"] for row in value]
+        if len(names) != len(set(names)):
+            raise serializers.ValidationError(
+                "Each attribute name may appear only once in the matrix."
+            )
+        return value
@@ -0,0 +1,42 @@
+from apps.common.images import (
+    derivatives_ready,
+    remember_image_name,
+    schedule_image_derivatives,
+)
+from apps.vendor.sharding import vendor_db
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from .models import Category, Menu
+from .utils import bump_menu_snapshot_version
+
+
+@receiver(post_init, sender=Menu)
+def remember_menu_image_name(sender, instance, **kwargs):
+    remember_image_name(instance)
+
+
+@receiver(post_save, sender=Menu)
+def build_menu_image_derivatives(sender, instance, **kwargs):
+    schedule_image_derivatives(instance)
+
+
+@receiver(post_save, sender=Menu)
+@receiver(post_delete, sender=Menu)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_menu_snapshot(sender, instance, **kwargs):
+    # After commit, so a concurrent read cannot cache the old rows under the
+    # new version.
+    vendor_id = instance.vendor_id
+    transaction.on_commit(
+        lambda: bump_menu_snapshot_version(vendor_id), using=vendor_db(vendor_id)
+    )
+
+
+@receiver(derivatives_ready, sender=Menu)
+def invalidate_menu_snapshot_for_images(sender, pk, **kwargs):
+    vendor_id = Menu.objects.filter(pk=pk).values_list("vendor_id", flat=True).first()
+    if vendor_id is not None:
+        bump_menu_snapshot_version(vendor_id)
@@ -1,3 +1,202 @@
-from django.test import TestCase
+import io
 
-# Create your tests here.
+import pytest
+from apps.common.images import IMAGE_VARIANTS, variant_name
+from apps.users.models import User
+from apps.vendor.models import Vendor
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from PIL import Image
+from rest_framework.test import APIClient
+
+from .models import AttributeType, AttributeValue, Category, Menu
+from .utils import upsert_attribute_matrix
+
+
+@pytest.fixture
+def category(db):
+    user = User.objects.create_user(
+        first_name="john", last_name="doe", email="john@example.com", password="x"
+    )
+    vendor = Vendor.objects.create(user=user, name="Shop")
+    return Category.objects.create(vendor=vendor, owner=user, name="Shirts")
+
+
+def matrix(sizes, colors):
+    return [
+        {"name": "Size", "attribute_type": "dropdown", "values": sizes},
+        {"name": "Color", "attribute_type": "checkbox", "values": colors},
+    ]
+
+
+@pytest.mark.django_db
+def test_upsert_attribute_matrix_creates_rows(category):
+    summary = upsert_attribute_matrix(category, matrix(["S", "M"], ["Red"]))
+
+    assert summary["attribute_types_upserted"] == 2
+    assert summary["attribute_values_created"] == 3
+    assert set(
+        AttributeValue.objects.filter(attribute__category=category).values_list(
+            "attribute__name", "attribute_value"
+        )
+    ) == {("Size", "S"), ("Size", "M"), ("Color", "Red")}
+
+
+@pytest.mark.django_db
+def test_upsert_attribute_matrix_diffs_and_prunes(category):
+    upsert_attribute_matrix(category, matrix(["S", "M"], ["Red"]))
+    rows = matrix(["M", "L"], [])[:1]
+    rows[0]["attribute_type"] = "input"
+
+    summary = upsert_attribute_matrix(category, rows)
+
+    assert summary == {
+        "attribute_types_upserted": 1,
+        "attribute_types_deleted": 1,
+        "attribute_values_created": 1,
+        "attribute_values_deleted": 1,
+    }
+    size = AttributeType.objects.get(category=category)
+    assert size.attribute_type == "input"
+    assert sorted(size.attribute_values.values_list("attribute_value", flat=True)) == [
+        "L",
+        "M",
+    ]
+
+
+@pytest.mark.django_db
+def test_upsert_attribute_matrix_query_count_is_constant(category):
+    rows = [
+        {
+            "name": f"attr-{i}",
+            "attribute_type": "dropdown",
+            "values": [f"value-{j}" for j in range(30)],
+        }
+        for i in range(20)
+    ]
+    with CaptureQueriesContext(connection) as ctx:
+        upsert_attribute_matrix(category, rows)
+
+    assert AttributeValue.objects.filter(attribute__category=category).count() == 600
+    # SQLite splits the 600 inserts into a few batches, never one per row.
+    assert len(ctx.captured_queries) <= 12
+
+
+@pytest.mark.django_db
+def test_only_the_vendor_owner_upserts_the_attribute_matrix(category):
+    client = APIClient()
+    url = f"/api/v1/category/category/attribute/{category.id}/bulk/"
+    data = {"attributes": matrix(["S"], ["Red"])}
+
+    assert client.put(url, data, format="json").status_code == 401
+    other = User.objects.create_user(
+        first_name="jane", last_name="doe", email="jane@example.com", password="x"
+    )
+    client.force_authenticate(other)
+    assert client.put(url, data, format="json").status_code == 403
+    Vendor.objects.create(user=other, name="Other")
+    assert client.put(url, data, format="json").status_code == 404
+    assert not AttributeType.objects.exists()
+
+    client.force_authenticate(category.owner)
+    assert client.put(url, data, format="json").status_code == 200
+    assert AttributeType.objects.filter(category=category).count() == 2
+
+
+@pytest.mark.django_db
+def test_menu_image_derivatives_are_built_once(
+    category, settings, tmp_path, django_capture_on_commit_callbacks
+):
+    settings.MEDIA_ROOT = str(tmp_path)
+    settings.BACKGROUND_TASKS_EAGER = True
+    buffer = io.BytesIO()
+    Image.new("RGBA", (1200, 900), "red").save(buffer, "PNG")
+    upload = SimpleUploadedFile("dish.png", buffer.getvalue(), "image/png")
+
+    with django_capture_on_commit_callbacks(execute=True):
+        menu = Menu.objects.create(
+            category=category, vendor=category.vendor, image=upload
+        )
+    menu.refresh_from_db()
+
+    assert menu.image_hash
+    for variant in IMAGE_VARIANTS:
+        assert (tmp_path / variant_name(menu.image.name, variant)).exists()
+    thumbnail = tmp_path / variant_name(menu.image.name, "thumbnail")
+    with Image.open(thumbnail) as thumb:
+        assert max(thumb.size) == 200
+    thumbnail.unlink()
+
+    # Same source bytes: the hash matches, so nothing is re-rendered.
+    with django_capture_on_commit_callbacks(execute=True):
+        menu.is_available = False
+        menu.save()
+    assert not thumbnail.exists()
+
+    # A new image replaces the variants of the old one.
+    old_name = menu.image.name
+    buffer = io.BytesIO()
+    Image.new("RGB", (300, 300), "blue").save(buffer, "PNG")
+    menu = Menu.objects.get(pk=menu.pk)
+    with django_capture_on_commit_callbacks(execute=True):
+        menu.image = SimpleUploadedFile("dish.png", buffer.getvalue(), "image/png")
+        menu.save()
+    menu.refresh_from_db()
+    assert menu.image.name != old_name and menu.image_hash
+    for variant in IMAGE_VARIANTS:
+        assert (tmp_path / variant_name(menu.image.name, variant)).exists()
+        assert not (tmp_path / variant_name(old_name, variant)).exists()
+    assert not (tmp_path / old_name).exists()
+
+
+@pytest.mark.django_db
+def test_menu_snapshot_etag_and_invalidation(
+    category, settings, django_capture_on_commit_callbacks
+):
+    settings.MENU_SNAPSHOT_ENABLED = True
+    client = APIClient()
+    url = f"/api/v1/category/menus/?vendor={category.vendor_id}"
+    with django_capture_on_commit_callbacks(execute=True):
+        menu = Menu.objects.create(
+            category=category, vendor=category.vendor, attributes={"name": "Soup"}
+        )
+
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.json()[0]["attributes"] == {"name": "Soup"}
+    etag = response["ETag"]
+
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+    assert len(ctx.captured_queries) == 0
+
+    with django_capture_on_commit_callbacks(execute=True):
+        menu.attributes = {"name": "Stew"}
+        menu.save()
+
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response["ETag"] != etag
+    assert response.json()[0]["attributes"] == {"name": "Stew"}
+
+
+@pytest.mark.django_db
+def test_menu_snapshots_are_cached_per_query(
+    category, settings, django_capture_on_commit_callbacks
+):
+    settings.MENU_SNAPSHOT_ENABLED = True
+    drinks = Category.objects.create(
+        vendor=category.vendor, owner=category.owner, name="Drinks"
+    )
+    with django_capture_on_commit_callbacks(execute=True):
+        Menu.objects.create(category=category, vendor=category.vendor)
+        tea = Menu.objects.create(category=drinks, vendor=category.vendor)
+    client = APIClient()
+    url = f"/api/v1/category/menus/?vendor={category.vendor_id}"
+
+    assert len(client.get(url).json()) == 2
+    response = client.get(f"{url}&category={drinks.pk}")
+    assert [item["id"] for item in response.json()] == [tea.pk]
+    assert len(client.get(url).json()) == 2
@@ -45,4 +45,9 @@ urlpatterns = [
         views.CategoryAttributeView.as_view(),
         name="category-attributes",
     ),
+    path(
+        "category/attribute/<int:category_id>/bulk/",
+        views.CategoryAttributeBulkUpsertView.as_view(),
+        name="category-attributes-bulk-upsert",
+    ),
 ]
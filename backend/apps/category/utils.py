@@ -0,0 +1,164 @@
+import hashlib
+import time
+from urllib.parse import urlencode
+
+from apps.common.renderers import FastJSONRenderer
+from apps.vendor.sharding import vendor_db
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import AttributeType, AttributeValue
+
+
+def upsert_attribute_matrix(category, rows, prune=True):
+    """
+    Apply a whole attribute matrix to a category in a constant number of queries.
+
+    ``rows`` is a list of ``{"name", "attribute_type", "values"}`` dicts. The
+    current attributes and values of the category are loaded once and diffed in
+    memory; the changes are then written with ``bulk_create(update_conflicts=True)``
+    on the ``unique_together`` keys instead of per-row ``clean()`` checks.
+    When ``prune`` is set, attributes and values missing from ``rows`` are deleted.
+    """
+    existing_types = {
+        attr.name: attr for attr in AttributeType.objects.filter(category=category)
+    }
+    existing_values = {}
+    for value in AttributeValue.objects.filter(attribute__category=category).only(
+        "id", "attribute_id", "attribute_value"
+    ):
+        existing_values[(value.attribute_id, value.attribute_value)] = value.id
+
+    wanted_names = {row["name"] for row in rows}
+    types_to_upsert = []
+    for row in rows:
+        current = existing_types.get(row["name"])
+        if current is None or current.attribute_type != row["attribute_type"]:
+            types_to_upsert.append(
+                AttributeType(
+                    name=row["name"],
+                    category=category,
+                    vendor_id=category.vendor_id,
+                    attribute_type=row["attribute_type"],
+                )
+            )
+
+    stale_type_ids = []
+    if prune:
+        stale_type_ids = [
+            attr.id for name, attr in existing_types.items() if name not in wanted_names
+        ]
+
+    with transaction.atomic(using=vendor_db(category.vendor_id)):
+        if stale_type_ids:
+            AttributeType.objects.filter(id__in=stale_type_ids).delete()
+
+        if types_to_upsert:
+            AttributeType.objects.bulk_create(
+                types_to_upsert,
+                update_conflicts=True,
+                unique_fields=["name", "category"],
+                update_fields=["attribute_type", "updated_at"],
+            )
+
+        type_ids = {name: attr.id for name, attr in existing_types.items()}
+        type_ids.update({attr.name: attr.pk for attr in types_to_upsert if attr.pk})
+        if any(row["name"] not in type_ids for row in rows):
+            # Backends that do not return ids from an upsert need one lookup.
+            type_ids.update(
+                AttributeType.objects.filter(
+                    category=category, name__in=wanted_names
+                ).values_list("name", "id")
+            )
+
+        wanted_values = set()
+        values_to_create = []
+        for row in rows:
+            attribute_id = type_ids[row["name"]]
+            for attribute_value in row["values"]:
+                key = (attribute_id, attribute_value)
+                if key in wanted_values:
+                    continue
+                wanted_values.add(key)
+                if key not in existing_values:
+                    values_to_create.append(
+                        AttributeValue(
+                            attribute_id=attribute_id,
+                            attribute_value=attribute_value,
+                            vendor_id=category.vendor_id,
+                        )
+                    )
+
+        stale_value_ids = []
+        if prune:
+            kept_type_ids = {type_ids[name] for name in wanted_names}
+            stale_value_ids = [
+                value_id
+                for key, value_id in existing_values.items()
+                if key[0] in kept_type_ids and key not in wanted_values
+            ]
+            if stale_value_ids:
+                AttributeValue.objects.filter(id__in=stale_value_ids).delete()
+
+        if values_to_create:
+            AttributeValue.objects.bulk_create(
+                values_to_create,
+                update_conflicts=True,
+                unique_fields=["attribute", "attribute_value"],
+                update_fields=["vendor", "updated_at"],
+            )
+
+    return {
+        "attribute_types_upserted": len(types_to_upsert),
+        "attribute_types_deleted": len(stale_type_ids),
+        "attribute_values_created": len(values_to_create),
+        "attribute_values_deleted": len(stale_value_ids),
+    }
+
+
+def _menu_version_key(vendor_id):
+    return f"menu-snapshot-version:{vendor_id}"
+
+
+def menu_snapshot_version(vendor_id):
+    # Versions start from the clock so an evicted counter never comes back
+    # at a value an older snapshot was stored under.
+    key = _menu_version_key(vendor_id)
+    initial = time.time_ns()
+    cache.add(key, initial, timeout=None)
+    return cache.get(key, initial)
+
+
+def bump_menu_snapshot_version(vendor_id):
+    """Retire every cached snapshot of a vendor's menu."""
+    key = _menu_version_key(vendor_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), timeout=None)
+
+
+def get_menu_snapshot(vendor_id, request, build):
+    """
+    Return ``(etag, body)`` for a listing of the menu of a vendor.
+
+    ``build()`` returns the data of the listing; its serialized JSON bytes are
+    cached under the vendor's current version, so a page view costs one or
+    two cache reads until a ``Menu`` or ``Category`` of the vendor changes.
+    Every query string (filters, pages) gets its own snapshot, and absolute
+    image URLs depend on the host, so both are part of the key.
+    """
+    version = menu_snapshot_version(vendor_id)
+    query = urlencode(sorted(request.query_params.lists()), doseq=True)
+    listing = hashlib.sha1(
+        f"{request.build_absolute_uri('/')}?{query}".encode()
+    ).hexdigest()[:16]
+    key = f"menu-snapshot:{vendor_id}:{version}:{listing}"
+    snapshot = cache.get(key)
+    if snapshot is None:
+        body = FastJSONRenderer().render(build())
+        etag = f'"{hashlib.sha1(body).hexdigest()}"'
+        snapshot = (etag, body)
+        cache.set(key, snapshot, timeout=settings.MENU_SNAPSHOT_TIMEOUT)
+    return snapshot
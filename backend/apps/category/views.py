@@ -1,42 +1,53 @@
+from apps.vendor.mixins import VendorScopedViewMixin
+from apps.vendor.permissions import IsVendorMemberOrReadOnly, IsVendorOwner
+from apps.vendor.tenancy import current_vendor_id
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
 from django.shortcuts import render
+from django.utils.http import parse_etags
 from rest_framework import generics, permissions, status, viewsets
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.permissions import SAFE_METHODS, AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from .models import AttributeType, AttributeValue, Category, Menu
 from .serializers import (
+    AttributeMatrixSerializer,
     AttributeTypeSerializer,
     AttributeValueSerializer,
     CategorySerializer,
     MenuSerializer,
 )
+from .utils import get_menu_snapshot, upsert_attribute_matrix
 
 
 # Create your views here.
-class CategoryCreateView(generics.ListCreateAPIView):
+class CategoryCreateView(VendorScopedViewMixin, generics.ListCreateAPIView):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
-    permission_classes = [AllowAny]
+    permission_classes = [IsVendorMemberOrReadOnly]
+
+    def perform_create(self, serializer):
+        serializer.save(vendor_id=current_vendor_id(), owner=self.request.user)
 
 
-class CategoryUpdateView(generics.RetrieveUpdateDestroyAPIView):
+class CategoryUpdateView(VendorScopedViewMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
-    permission_classes = [AllowAny]
+    permission_classes = [IsVendorMemberOrReadOnly]
 
 
-class CategoryDeleteView(generics.DestroyAPIView):
+class CategoryDeleteView(VendorScopedViewMixin, generics.DestroyAPIView):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
-    permission_classes = [AllowAny]
+    permission_classes = [IsVendorMemberOrReadOnly]
 
 
-class AttributeValueListCreateView(APIView):
-    permission_classes = [AllowAny]
+class AttributeValueListCreateView(VendorScopedViewMixin, APIView):
+    permission_classes = [IsVendorMemberOrReadOnly]
 
     def get(self, request):
-        attribute_values = AttributeValue.objects.all()
+        attribute_values = AttributeValue.objects.for_current_vendor()
         serializer = AttributeValueSerializer(attribute_values, many=True)
         return Response(serializer.data)
 
@@ -44,18 +55,18 @@ class AttributeValueListCreateView(APIView):
 
         serializer = AttributeValueSerializer(data=request.data)
         if serializer.is_valid():
-            serializer.save()
+            serializer.save(vendor_id=current_vendor_id())
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class AttributeValueDetailView(APIView):
-    permission_classes = [AllowAny]
+class AttributeValueDetailView(VendorScopedViewMixin, APIView):
+    permission_classes = [IsVendorMemberOrReadOnly]
 
     def get(self, request, pk):
 
         try:
-            attribute_value = AttributeValue.objects.get(pk=pk)
+            attribute_value = AttributeValue.objects.for_current_vendor().get(pk=pk)
         except AttributeValue.DoesNotExist:
             return Response(status=status.HTTP_404_NOT_FOUND)
 
@@ -65,20 +76,20 @@ class AttributeValueDetailView(APIView):
     def put(self, request, pk):
 
         try:
-            attribute_value = AttributeValue.objects.get(pk=pk)
+            attribute_value = AttributeValue.objects.for_current_vendor().get(pk=pk)
         except AttributeValue.DoesNotExist:
             return Response(status=status.HTTP_404_NOT_FOUND)
 
         serializer = AttributeValueSerializer(attribute_value, data=request.data)
         if serializer.is_valid():
-            serializer.save()
+            serializer.save(vendor_id=current_vendor_id())
             return Response(serializer.data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     def delete(self, request, pk):
 
         try:
-            attribute_value = AttributeValue.objects.get(pk=pk)
+            attribute_value = AttributeValue.objects.for_current_vendor().get(pk=pk)
         except AttributeValue.DoesNotExist:
             return Response(status=status.HTTP_404_NOT_FOUND)
 
@@ -86,26 +97,28 @@ class AttributeValueDetailView(APIView):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
-class AttributeTypeListCreateView(generics.ListCreateAPIView):
+class AttributeTypeListCreateView(VendorScopedViewMixin, generics.ListCreateAPIView):
     queryset = AttributeType.objects.all()
     serializer_class = AttributeTypeSerializer
-    permission_classes = [AllowAny]
+    permission_classes = [IsVendorMemberOrReadOnly]
 
 
-class AttributeTypeDetailView(generics.RetrieveUpdateDestroyAPIView):
+class AttributeTypeDetailView(
+    VendorScopedViewMixin, generics.RetrieveUpdateDestroyAPIView
+):
 
     queryset = AttributeType.objects.all()
     serializer_class = AttributeTypeSerializer
-    permission_classes = [AllowAny]
+    permission_classes = [IsVendorMemberOrReadOnly]
 
 
-class CategoryAttributeView(generics.GenericAPIView):
-    permission_classes = [AllowAny]
+class CategoryAttributeView(VendorScopedViewMixin, generics.GenericAPIView):
+    permission_classes = [IsVendorMemberOrReadOnly]
 
     def get(self, request, category_id):
         try:
 
-            category = Category.objects.get(id=category_id)
+            category = Category.objects.for_current_vendor().get(id=category_id)
         except Category.DoesNotExist:
             return Response(
                 {"error": "Category not found"}, status=status.HTTP_404_NOT_FOUND
@@ -127,29 +140,79 @@ class CategoryAttributeView(generics.GenericAPIView):
         return Response(response_data, status=status.HTTP_200_OK)
 
 
-class MenuViewSet(viewsets.ModelViewSet):
+class CategoryAttributeBulkUpsertView(VendorScopedViewMixin, generics.GenericAPIView):
+    serializer_class = AttributeMatrixSerializer
+    permission_classes = [IsVendorOwner]
+    owners_only = True
+
+    def put(self, request, category_id):
+        try:
+            category = Category.objects.for_current_vendor().get(id=category_id)
+        except Category.DoesNotExist:
+            return Response(
+                {"error": "Category not found"}, status=status.HTTP_404_NOT_FOUND
+            )
+
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        summary = upsert_attribute_matrix(
+            category,
+            serializer.validated_data["attributes"],
+            prune=serializer.validated_data["prune"],
+        )
+        return Response(summary, status=status.HTTP_200_OK)
+
+
+class MenuViewSet(VendorScopedViewMixin, viewsets.ModelViewSet):
     queryset = Menu.objects.all()
     serializer_class = MenuSerializer
-    # permission_classes = [permissions.IsAuthenticated]
+    permission_classes = [IsVendorMemberOrReadOnly]
+
+    def vendor_id(self):
+        """The ``vendor`` query param, or the vendor of the subdomain."""
+        vendor = getattr(self.request, "vendor", None)
+        default = str(vendor.pk) if vendor is not None else ""
+        return self.request.query_params.get("vendor", default)
+
+    def get_tenant_vendor_id(self, request):
+        # Customers read the menu of the vendor they browse; changes go to
+        # the user's own vendor.
+        if request.method in SAFE_METHODS:
+            vendor_id = self.vendor_id()
+            return int(vendor_id) if vendor_id.isdigit() else None
+        return super().get_tenant_vendor_id(request)
 
     def get_queryset(self):
         """
-        Optionally filter menus by vendor or category from query params.
+        Optionally filter menus by category from query params.
         """
         queryset = super().get_queryset()
-        vendor_id = self.request.query_params.get("vendor")
         category_id = self.request.query_params.get("category")
 
-        if vendor_id:
-            queryset = queryset.filter(vendor_id=vendor_id)
         if category_id:
             queryset = queryset.filter(category_id=category_id)
 
         return queryset
 
-    def perform_create(self, serializer):
-        # Optionally attach the current user or vendor if needed here
-        serializer.save()
+    def list(self, request, *args, **kwargs):
+        """
+        Serve a vendor's menu listings from cached snapshots.
 
-    def perform_update(self, serializer):
-        serializer.save()
+        The snapshots are built by the regular listing and cached per query
+        string, so filters and pages are served as they would be uncached.
+        """
+        vendor_id = current_vendor_id()
+        if not settings.MENU_SNAPSHOT_ENABLED or vendor_id is None:
+            return super().list(request, *args, **kwargs)
+
+        def build():
+            return super(MenuViewSet, self).list(request, *args, **kwargs).data
+
+        etag, body = get_menu_snapshot(vendor_id, request, build)
+        if_none_match = parse_etags(request.headers.get("If-None-Match", ""))
+        if etag in if_none_match or "*" in if_none_match:
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(body, content_type="application/json")
+        response["ETag"] = etag
+        return response
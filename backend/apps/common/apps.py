@@ -6,3 +6,8 @@ class CommonConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.common"
     verbose_name = _("Common")
+
+    def ready(self):
+        from apps.common.signals import connect_content_addressed_fields
+
+        connect_content_addressed_fields()
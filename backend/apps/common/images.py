@@ -0,0 +1,163 @@
+import hashlib
+import io
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.db.models.fields.files import FieldFile
+from django.dispatch import Signal
+
+from .tasks import run_in_background
+
+# variant name -> (bounding box or None to keep the size, Pillow format, extension)
+IMAGE_VARIANTS = {
+    "thumbnail": ((200, 200), "JPEG", "jpg"),
+    "medium": ((800, 800), "JPEG", "jpg"),
+    "webp": (None, "WEBP", "webp"),
+}
+
+# Sent with ``sender=<model>`` and ``pk`` once new variants are stored.
+derivatives_ready = Signal()
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool():
+    # The pool is created from a background task thread. Forking a process
+    # with running threads can copy locks held by them, so workers are
+    # spawned and only import this module.
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ProcessPoolExecutor(
+                    max_workers=getattr(settings, "IMAGE_DERIVATIVE_WORKERS", 2),
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+    return _pool
+
+
+def variant_name(name, variant):
+    """``category/shirt.png`` -> ``category/shirt__thumbnail.jpg``."""
+    root, _ = os.path.splitext(name)
+    return f"{root}__{variant}.{IMAGE_VARIANTS[variant][2]}"
+
+
+def render_variants(data):
+    """Resize and re-encode raw image bytes into every configured variant."""
+    from PIL import Image, ImageOps
+
+    rendered = {}
+    with Image.open(io.BytesIO(data)) as source:
+        source = ImageOps.exif_transpose(source)
+        for variant, (size, image_format, _) in IMAGE_VARIANTS.items():
+            image = source.copy()
+            if size:
+                image.thumbnail(size)
+            if image_format == "JPEG" and image.mode not in ("RGB", "L"):
+                image = image.convert("RGB")
+            buffer = io.BytesIO()
+            image.save(buffer, image_format, quality=82)
+            rendered[variant] = buffer.getvalue()
+    return rendered
+
+
+def generate_image_derivatives(model_label, pk, field_name="image"):
+    """
+    Build the variants of an uploaded image next to the original.
+
+    The source bytes are hashed first and nothing is re-rendered when the hash
+    matches the one stored on the row. Encoding runs in a process pool so it
+    never competes with request threads for the GIL.
+    """
+    model = apps.get_model(model_label)
+    instance = model.objects.filter(pk=pk).first()
+    if instance is None:
+        return
+    field_file = getattr(instance, field_name)
+    if not field_file:
+        return
+
+    with field_file.open("rb") as fh:
+        data = fh.read()
+    digest = hashlib.sha256(data).hexdigest()
+    if instance.image_hash == digest:
+        return
+
+    if getattr(settings, "BACKGROUND_TASKS_EAGER", False):
+        rendered = render_variants(data)
+    else:
+        rendered = _get_pool().submit(render_variants, data).result()
+
+    storage = field_file.storage
+    for variant, content in rendered.items():
+        name = variant_name(field_file.name, variant)
+        if hasattr(storage, "save_derivative"):
+            storage.save_derivative(name, ContentFile(content))
+            continue
+        if storage.exists(name):
+            storage.delete(name)
+        storage.save(name, ContentFile(content))
+
+    model.objects.filter(pk=pk).update(image_hash=digest)
+    derivatives_ready.send(sender=model, pk=pk)
+
+
+def delete_image_derivatives(storage, name):
+    for variant in IMAGE_VARIANTS:
+        storage.delete(variant_name(name, variant))
+
+
+def remember_image_name(instance, field_name="image"):
+    """Record the stored image name, from ``post_init`` and after saves."""
+    value = instance.__dict__.get(field_name)
+    if isinstance(value, FieldFile):
+        value = value.name
+    # Anything else is an upload that is not stored yet.
+    instance._previous_image_name = value if isinstance(value, str) and value else None
+
+
+def schedule_image_derivatives(instance, field_name="image"):
+    """
+    Build the variants of a saved image; call from ``post_save`` of models
+    whose ``post_init`` runs ``remember_image_name``.
+
+    When the image was replaced the row stops advertising variants until the
+    new ones are built, and those of the old image are deleted. Content
+    addressed storage deletes them itself with the last reference to the old
+    file, which other rows may still hold.
+    """
+    field_file = getattr(instance, field_name)
+    previous = getattr(instance, "_previous_image_name", None)
+    remember_image_name(instance, field_name)
+    if previous and previous != field_file.name:
+        if instance.image_hash:
+            instance.image_hash = ""
+            type(instance)._base_manager.filter(pk=instance.pk).update(image_hash="")
+        storage = field_file.storage
+        if not hasattr(storage, "save_derivative"):
+            transaction.on_commit(
+                lambda: delete_image_derivatives(storage, previous),
+                using=instance._state.db,
+            )
+    if field_file:
+        run_in_background(
+            generate_image_derivatives, instance._meta.label, instance.pk, field_name
+        )
+
+
+def image_variant_urls(field_file, image_hash, request=None):
+    """Return the variant URLs of an image, or ``None`` while they are pending."""
+    if not field_file or not image_hash:
+        return None
+    urls = {}
+    for variant in IMAGE_VARIANTS:
+        url = field_file.storage.url(variant_name(field_file.name, variant))
+        urls[variant] = request.build_absolute_uri(url) if request else url
+    return urls
@@ -0,0 +1,173 @@
+import hashlib
+import json
+import logging
+import smtplib
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import OutboxEmail
+
+logger = logging.getLogger(__name__)
+
+# Errors after which the SMTP connection is not worth reusing.
+CONNECTION_ERRORS = (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError)
+
+
+def queue_email(to, subject, body="", html_body="", from_email=None):
+    """
+    Put an email in the outbox and return its row.
+
+    Nothing is sent here; the ``send_outbox`` worker delivers it. Queuing a
+    message identical to one that is still waiting returns the waiting row.
+    """
+    to = list(to)
+    from_email = from_email or settings.DEFAULT_FROM_EMAIL or ""
+    dedupe_key = hashlib.sha256(
+        json.dumps([from_email, to, subject, body, html_body]).encode()
+    ).hexdigest()
+    waiting = OutboxEmail.objects.filter(
+        dedupe_key=dedupe_key,
+        status__in=[OutboxEmail.Status.PENDING, OutboxEmail.Status.SENDING],
+    )
+    while True:
+        try:
+            with transaction.atomic():
+                return OutboxEmail.objects.create(
+                    dedupe_key=dedupe_key,
+                    from_email=from_email,
+                    to=to,
+                    subject=subject,
+                    body=body,
+                    html_body=html_body,
+                )
+        except IntegrityError:
+            email = waiting.first()
+            # Otherwise the conflicting row was sent in the meantime, and the
+            # insert is tried again.
+            if email is not None:
+                return email
+
+
+def build_message(email):
+    message = EmailMultiAlternatives(
+        subject=email.subject,
+        body=email.body,
+        from_email=email.from_email or None,
+        to=email.to,
+    )
+    if email.html_body:
+        if email.body:
+            message.attach_alternative(email.html_body, "text/html")
+        else:
+            message.body = email.html_body
+            message.content_subtype = "html"
+    return message
+
+
+def retry_delay(attempts):
+    """Exponential backoff: 30s, 1m, 2m, ... capped at EMAIL_OUTBOX_MAX_DELAY."""
+    delay = settings.EMAIL_OUTBOX_RETRY_DELAY * 2 ** (attempts - 1)
+    return timedelta(seconds=min(delay, settings.EMAIL_OUTBOX_MAX_DELAY))
+
+
+def claim_outbox(limit):
+    """
+    Mark up to ``limit`` due messages as being sent and return them.
+
+    Messages claimed by a worker that died are handed out again once
+    ``EMAIL_OUTBOX_CLAIM_TIMEOUT`` has passed.
+    """
+    now = timezone.now()
+    stale = now - timedelta(seconds=settings.EMAIL_OUTBOX_CLAIM_TIMEOUT)
+    due = Q(status=OutboxEmail.Status.PENDING, next_attempt_at__lte=now) | Q(
+        status=OutboxEmail.Status.SENDING, claimed_at__lt=stale
+    )
+    ids = list(
+        OutboxEmail.objects.filter(due)
+        .order_by("next_attempt_at")
+        .values_list("pk", flat=True)[:limit]
+    )
+    # The conditional update keeps two workers from claiming the same row.
+    OutboxEmail.objects.filter(due, pk__in=ids).update(
+        status=OutboxEmail.Status.SENDING, claimed_at=now
+    )
+    return list(
+        OutboxEmail.objects.filter(
+            pk__in=ids, status=OutboxEmail.Status.SENDING, claimed_at=now
+        ).order_by("next_attempt_at")
+    )
+
+
+def _failed(email, exc, now):
+    email.attempts += 1
+    email.last_error = f"{type(exc).__name__}: {exc}"[:2000]
+    email.claimed_at = None
+    if email.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+        email.status = OutboxEmail.Status.FAILED
+    else:
+        email.status = OutboxEmail.Status.PENDING
+        email.next_attempt_at = now + retry_delay(email.attempts)
+
+
+def deliver_outbox(batch_size=100):
+    """
+    Send one batch of due outbox messages over a single SMTP connection.
+
+    Returns ``(sent, failed)``. A message that fails is retried with
+    exponential backoff until ``EMAIL_OUTBOX_MAX_ATTEMPTS``. When the server
+    drops the connection it is reopened for the rest of the batch.
+    """
+    emails = claim_outbox(batch_size)
+    if not emails:
+        return 0, 0
+
+    connection = get_connection(fail_silently=False)
+    sent, failed = [], []
+    try:
+        connection.open()
+        for email in emails:
+            now = timezone.now()
+            try:
+                connection.send_messages([build_message(email)])
+            except CONNECTION_ERRORS as exc:
+                _failed(email, exc, now)
+                failed.append(email)
+                connection.close()
+                connection.open()
+            except Exception as exc:
+                _failed(email, exc, now)
+                failed.append(email)
+            else:
+                email.status = OutboxEmail.Status.SENT
+                email.sent_at = now
+                email.attempts += 1
+                email.claimed_at = None
+                sent.append(email)
+    except Exception as exc:
+        # The connection could not be (re)opened: nothing else goes out.
+        logger.warning("Outbox delivery stopped: %s", exc)
+        done = {email.pk for email in sent + failed}
+        for email in emails:
+            if email.pk not in done:
+                _failed(email, exc, timezone.now())
+                failed.append(email)
+    finally:
+        connection.close()
+
+    OutboxEmail.objects.bulk_update(
+        sent + failed,
+        [
+            "status",
+            "attempts",
+            "next_attempt_at",
+            "claimed_at",
+            "last_error",
+            "sent_at",
+        ],
+    )
+    return len(sent), len(failed)
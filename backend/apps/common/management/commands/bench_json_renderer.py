@@ -0,0 +1,89 @@
+import io
+import json
+import time
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from ...renderers import FastJSONParser, FastJSONRenderer, orjson
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare rendering and parsing of large JSON responses with DRF's "
+        "encoder, the former json.dumps profile renderer and the fast renderer."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=10_000)
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        rows, repeat = options["rows"], options["repeat"]
+        now = timezone.now()
+        typed = [
+            {
+                "id": uuid.uuid4(),
+                "pkid": i,
+                "username": f"user{i}",
+                "first_name": "John",
+                "last_name": "Doe",
+                "email": f"user{i}@example.com",
+                "balance": Decimal(i) / 100,
+                "country": "IR",
+                "is_active": i % 7 != 0,
+                "created_at": now - timedelta(minutes=i),
+            }
+            for i in range(rows)
+        ]
+        # What a serializer hands to the renderer: strings for UUIDs,
+        # decimals and datetimes.
+        plain = json.loads(JSONRenderer().render(typed))
+        envelope = {"status_code": 200, "profiles": plain}
+
+        self.stdout.write(
+            f"rows: {rows}  repeat: {repeat}  "
+            f"orjson: {'yes' if orjson else 'not installed'}"
+        )
+        self.report(
+            "render serialized",
+            repeat,
+            [
+                ("json.dumps", lambda: json.dumps(envelope).encode()),
+                ("JSONRenderer", lambda: JSONRenderer().render(envelope)),
+                ("FastJSONRenderer", lambda: FastJSONRenderer().render(envelope)),
+            ],
+        )
+        self.report(
+            "render typed",
+            repeat,
+            [
+                ("JSONRenderer", lambda: JSONRenderer().render(typed)),
+                ("FastJSONRenderer", lambda: FastJSONRenderer().render(typed)),
+            ],
+        )
+        body = JSONRenderer().render(envelope)
+        self.stdout.write(f"body: {len(body) / 1024:.0f} KiB")
+        self.report(
+            "parse",
+            repeat,
+            [
+                ("JSONParser", lambda: JSONParser().parse(io.BytesIO(body))),
+                ("FastJSONParser", lambda: FastJSONParser().parse(io.BytesIO(body))),
+            ],
+        )
+
+    def report(self, title, repeat, candidates):
+        self.stdout.write(title)
+        for name, run in candidates:
+            run()
+            started = time.perf_counter()
+            for _ in range(repeat):
+                run()
+            elapsed = (time.perf_counter() - started) / repeat
+            self.stdout.write(f"  {name:<18} {elapsed * 1000:9.2f} ms")
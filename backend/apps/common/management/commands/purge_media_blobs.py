@@ -0,0 +1,33 @@
+from datetime import timedelta
+
+from apps.common.models import StoredBlob
+from apps.common.storage import content_addressed_storage, unrecorded_blobs
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete content-addressed uploads that no row references any more, "
+        "and files left behind by uploads whose transaction was rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--older-than-hours",
+            type=int,
+            default=24,
+            help="Only purge blobs created before this many hours ago.",
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(hours=options["older_than_hours"])
+        names = list(
+            StoredBlob.objects.filter(ref_count=0, created_at__lt=cutoff).values_list(
+                "name", flat=True
+            )
+        )
+        names += unrecorded_blobs(cutoff)
+        for name in names:
+            content_addressed_storage.delete(name)
+        self.stdout.write(self.style.SUCCESS(f"Purged {len(names)} unused blobs."))
@@ -0,0 +1,137 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .tasks import run_in_background
+
+
+def _count_cache_key(queryset):
+    sql, params = queryset.query.sql_with_params()
+    digest = hashlib.sha1(f"{queryset.db}:{sql}:{params!r}".encode()).hexdigest()
+    return f"row-count:{digest}"
+
+
+def _refresh_count(key, queryset):
+    cache.set(
+        key,
+        (queryset.count(), time.time()),
+        timeout=settings.PAGINATION_COUNT_TIMEOUT,
+    )
+
+
+def estimated_count(queryset):
+    """
+    Return the row count of ``queryset`` from the cache.
+
+    The first call counts in the request. Afterwards the cached count is
+    returned as is, and once it is older than ``PAGINATION_COUNT_REFRESH``
+    seconds one request schedules a recount in the background. Counts are
+    kept per query, so each filter (e.g. each vendor) has its own.
+    """
+    key = _count_cache_key(queryset)
+    cached = cache.get(key)
+    if cached is None:
+        count = queryset.count()
+        cache.set(key, (count, time.time()), timeout=settings.PAGINATION_COUNT_TIMEOUT)
+        return count
+
+    count, counted_at = cached
+    refresh = settings.PAGINATION_COUNT_REFRESH
+    if time.time() - counted_at >= refresh and cache.add(
+        f"{key}:refreshing", True, timeout=refresh or 1
+    ):
+        run_in_background(_refresh_count, key, queryset.all())
+    return count
+
+
+class KeysetPagination(CursorPagination):
+    """Cursor pagination over the ordering of the paginated queryset."""
+
+    def get_ordering(self, request, queryset, view):
+        ordering = tuple(queryset.query.order_by)
+        if not all(isinstance(field, str) for field in ordering):
+            raise ValueError("Keyset pagination needs an ordering by field names.")
+        return ordering or ("pk",)
+
+
+class EstimatedCountPagination(PageNumberPagination):
+    """
+    Page number pagination without a ``COUNT(*)`` per page.
+
+    ``count`` comes from ``estimated_count`` and may lag behind by about
+    ``PAGINATION_COUNT_REFRESH`` seconds. Whether a next page exists is found
+    by fetching one row more than the page holds, so links are always exact.
+
+    For deep scrolling pass ``?cursor=`` (empty for the first page): pages
+    are then read with a keyset on the queryset's ordering instead of an
+    ``OFFSET`` and ``next``/``previous`` carry the cursor. The response keys
+    are the same in both modes.
+    """
+
+    cursor_query_param = "cursor"
+    keyset_pagination_class = KeysetPagination
+    invalid_page_message = _("Invalid page.")
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.keyset = None
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+        if not queryset.ordered:
+            queryset = queryset.order_by("pk")
+        self.count = estimated_count(queryset)
+
+        if self.cursor_query_param in request.query_params:
+            self.keyset = self.keyset_pagination_class()
+            self.keyset.cursor_query_param = self.cursor_query_param
+            self.keyset.page_size = page_size
+            return self.keyset.paginate_queryset(queryset, request, view)
+
+        try:
+            self.number = int(request.query_params.get(self.page_query_param, 1))
+            if self.number < 1:
+                raise ValueError
+        except ValueError:
+            raise NotFound(self.invalid_page_message)
+        offset = (self.number - 1) * page_size
+        results = list(queryset[offset : offset + page_size + 1])
+        if not results and self.number > 1:
+            raise NotFound(self.invalid_page_message)
+        self.has_next = len(results) > page_size
+        return results[:page_size]
+
+    def get_next_link(self):
+        if self.keyset:
+            return self.keyset.get_next_link()
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.page_query_param, self.number + 1)
+
+    def get_previous_link(self):
+        if self.keyset:
+            return self.keyset.get_previous_link()
+        if self.number == 1:
+            return None
+        url = self.request.build_absolute_uri()
+        if self.number == 2:
+            return remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.page_query_param, self.number - 1)
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "count": self.count,
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
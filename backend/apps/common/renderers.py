@@ -0,0 +1,72 @@
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # The standard library encoder is used instead.
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    ``JSONRenderer`` that encodes with orjson when it is installed.
+
+    orjson writes str, numbers, dicts, lists, datetimes, dates, times and
+    UUIDs itself; anything else (Decimal, lazy strings, querysets, ...) goes
+    through DRF's encoder, so the output matches ``JSONRenderer`` byte for
+    byte, with two exceptions for floats:
+
+    - Below 1e-4 and from 1e16 up the notation differs, e.g. ``1e16`` and
+      ``0.00001`` for ``1e+16`` and ``1e-05``. The values are the same.
+    - NaN and infinities are written as ``null``. ``JSONRenderer`` refuses
+      them with ``STRICT_JSON`` (the default) and otherwise writes ``NaN``
+      and ``Infinity``, which are not JSON.
+
+    Telling such floats apart would mean walking the data or scanning the
+    output in Python, which costs more than orjson saves; Decimal fields,
+    which most money and measurement fields are, are not affected.
+    Indented or ASCII-only output, non-compact settings and data orjson
+    rejects (e.g. integers above 64 bits) are left to ``JSONRenderer``.
+    """
+
+    options = (
+        orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if orjson
+        else 0
+    )
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if orjson is None or indent or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=JSONEncoder().default, option=self.options)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Like JSONRenderer, keep the output a strict JavaScript subset. Both
+        # separators start with 0xE2, which is rare enough to look for first.
+        if b"\xe2" in ret:
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028")
+            ret = ret.replace(b"\xe2\x80\xa9", b"\\u2029")
+        return ret
+
+
+class FastJSONParser(JSONParser):
+    """``JSONParser`` that decodes UTF-8 bodies with orjson when installed."""
+
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get("encoding", settings.DEFAULT_CHARSET)
+        if orjson is None or encoding.lower().replace("-", "") != "utf8":
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
@@ -0,0 +1,106 @@
+from django.core.files.storage import default_storage
+from django.utils.encoding import force_str
+from django_countries import countries
+from rest_framework import serializers
+
+
+class FileURLField(serializers.Field):
+    """A file column read with ``values()``: the stored name, shown as a URL."""
+
+    def __init__(self, storage=None, absolute=False, **kwargs):
+        kwargs["read_only"] = True
+        self.storage = storage or default_storage
+        self.absolute = absolute
+        super().__init__(**kwargs)
+
+    def to_representation(self, name):
+        if not name:
+            return None
+        url = self.storage.url(name)
+        request = self.context.get("request")
+        if self.absolute and request is not None:
+            return request.build_absolute_uri(url)
+        return url
+
+
+class CountryCodeField(serializers.Field):
+    """
+    A country column read with ``values()``: its code, or its name with
+    ``name_only``. Unlike django_countries' field it builds no choices, which
+    are most of the cost of instantiating a serializer.
+    """
+
+    def __init__(self, name_only=False, **kwargs):
+        kwargs["read_only"] = True
+        self.name_only = name_only
+        super().__init__(**kwargs)
+
+    def to_representation(self, code):
+        code = countries.alpha2(code)
+        if not code:
+            return ""
+        return force_str(countries.name(code)) if self.name_only else code
+
+
+class FastReadSerializer(serializers.Serializer):
+    """
+    Read-only serializer over the rows of one joined ``values()`` query.
+
+    The ``source`` of each field is an ORM lookup such as ``user__email``; a
+    nested ``FastReadSerializer`` prefixes its own lookups with its source.
+    ``values(queryset)`` selects every lookup at once, so serializing a page
+    makes no further queries. Values go through the fields'
+    ``to_representation`` as usual, except that nulls stay null, and a nested
+    serializer whose row has no primary key renders as null, like a missing
+    relation. Method fields get the whole row; ``value(row, name)`` reads a
+    lookup relative to the serializer. Lookups only methods need go in
+    ``extra_lookups``.
+    """
+
+    extra_lookups = []
+
+    def __init__(self, *args, **kwargs):
+        kwargs["read_only"] = True
+        super().__init__(*args, **kwargs)
+
+    @classmethod
+    def values(cls, queryset):
+        return queryset.values(*cls().lookups())
+
+    @property
+    def prefix(self):
+        parent = getattr(self.parent, "prefix", "")
+        return f"{parent}{self.source}__" if self.source else parent
+
+    def lookups(self):
+        prefix = self.prefix
+        lookups = [prefix + name for name in self.extra_lookups]
+        if prefix:
+            lookups.append(f"{prefix}pk")
+        for field in self._readable_fields:
+            if isinstance(field, FastReadSerializer):
+                lookups += field.lookups()
+            elif field.source != "*":
+                lookups.append(prefix + field.source)
+        return list(dict.fromkeys(lookups))
+
+    def value(self, row, name):
+        return row[self.prefix + name]
+
+    def to_representation(self, row):
+        prefix = self.prefix
+        data = {}
+        for field in self._readable_fields:
+            if isinstance(field, FastReadSerializer):
+                present = row[f"{field.prefix}pk"] is not None
+                data[field.field_name] = (
+                    field.to_representation(row) if present else None
+                )
+            elif field.source == "*":
+                data[field.field_name] = field.to_representation(row)
+            else:
+                value = row[prefix + field.source]
+                data[field.field_name] = (
+                    None if value is None else field.to_representation(value)
+                )
+        return data
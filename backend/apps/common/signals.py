@@ -0,0 +1,39 @@
+from django.apps import apps
+from django.db.models.signals import post_delete, post_init, post_save
+
+from .storage import add_references, content_addressed_fields, drop_references
+
+
+def _file_names(instance, fields):
+    names = {}
+    for field in fields:
+        value = instance.__dict__.get(field.attname)
+        names[field.attname] = getattr(value, "name", value) or None
+    return names
+
+
+def remember_file_names(sender, instance, **kwargs):
+    instance._stored_file_names = _file_names(
+        instance, content_addressed_fields(sender)
+    )
+
+
+def update_file_references(sender, instance, created, **kwargs):
+    current = _file_names(instance, content_addressed_fields(sender))
+    previous = {} if created else getattr(instance, "_stored_file_names", {})
+    changed = [name for name in current if current[name] != previous.get(name)]
+    add_references([current[name] for name in changed])
+    drop_references([previous.get(name) for name in changed])
+    instance._stored_file_names = current
+
+
+def release_file_references(sender, instance, **kwargs):
+    drop_references(getattr(instance, "_stored_file_names", {}).values())
+
+
+def connect_content_addressed_fields():
+    for model in apps.get_models():
+        if content_addressed_fields(model):
+            post_init.connect(remember_file_names, sender=model)
+            post_save.connect(update_file_references, sender=model)
+            post_delete.connect(release_file_references, sender=model)
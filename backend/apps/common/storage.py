@@ -0,0 +1,156 @@
+import hashlib
+import os
+from collections import Counter, defaultdict
+
+from django.apps import apps
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.db.models import F
+
+
+def _blobs():
+    return apps.get_model("common", "StoredBlob")
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Local filesystem storage that names every file after its SHA-256.
+
+    Identical uploads collapse onto one file, a name never points at different
+    bytes (so URLs can be cached forever) and files are only removed once no
+    row references them. References are counted in ``common.StoredBlob`` by the
+    signal handlers in ``apps.common.signals``.
+    """
+
+    def content_name(self, name, content):
+        digest = hashlib.sha256()
+        if hasattr(content, "seek"):
+            content.seek(0)
+        for chunk in content.chunks():
+            digest.update(chunk)
+        if hasattr(content, "seek"):
+            content.seek(0)
+        value = digest.hexdigest()
+        ext = os.path.splitext(name)[1].lower()
+        return f"blobs/{value[:2]}/{value[2:4]}/{value}{ext}"
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, "chunks"):
+            from django.core.files import File
+
+            content = File(content, name)
+        name = self.content_name(name, content)
+        with transaction.atomic():
+            # Locked as in delete(): a deletion of the last reference that is
+            # under way finishes first, and the file is written again below.
+            _blobs().objects.select_for_update().get_or_create(
+                name=name, defaults={"size": content.size}
+            )
+            if not self.exists(name):
+                name = self._save(name, content)
+        return name
+
+    def save_derivative(self, name, content):
+        """Store a file derived from a blob under its exact, immutable name."""
+        if not self.exists(name):
+            self._save(name, content)
+        return name
+
+    def blob_names(self):
+        """Names of the blobs on disk, without their derivatives."""
+        if not self.exists("blobs"):
+            return
+        for first in self.listdir("blobs")[0]:
+            for second in self.listdir(f"blobs/{first}")[0]:
+                directory = f"blobs/{first}/{second}"
+                for filename in self.listdir(directory)[1]:
+                    if "__" not in filename:
+                        yield f"{directory}/{filename}"
+
+    def delete(self, name):
+        with transaction.atomic():
+            # Deletions run after the commit that dropped the last reference;
+            # an upload of the same bytes may have referenced the file since.
+            blob = _blobs().objects.select_for_update().filter(name=name).first()
+            if blob is not None and blob.ref_count > 0:
+                return
+            root = os.path.splitext(name)[0]
+            directory, prefix = os.path.split(f"{root}__")
+            if self.exists(directory):
+                for filename in self.listdir(directory)[1]:
+                    if filename.startswith(prefix):
+                        super().delete(os.path.join(directory, filename))
+            super().delete(name)
+            if blob is not None:
+                blob.delete()
+
+
+content_addressed_storage = ContentAddressedStorage()
+
+
+def content_addressed_fields(model):
+    return [
+        field
+        for field in model._meta.concrete_fields
+        if isinstance(getattr(field, "storage", None), ContentAddressedStorage)
+    ]
+
+
+def _group_by_count(names):
+    groups = defaultdict(list)
+    for name, count in Counter(name for name in names if name).items():
+        groups[count].append(name)
+    return groups.items()
+
+
+def add_references(names):
+    for count, group in _group_by_count(names):
+        _blobs().objects.filter(name__in=group).update(ref_count=F("ref_count") + count)
+
+
+def drop_references(names):
+    """Release references and delete the files nobody points at any more."""
+    names = [name for name in names if name]
+    if not names:
+        return
+    for count, group in _group_by_count(names):
+        _blobs().objects.filter(name__in=group, ref_count__gte=count).update(
+            ref_count=F("ref_count") - count
+        )
+    unused = list(
+        _blobs()
+        .objects.filter(name__in=names, ref_count=0)
+        .values_list("name", flat=True)
+    )
+    for name in unused:
+        transaction.on_commit(lambda name=name: content_addressed_storage.delete(name))
+
+
+def unrecorded_blobs(before, batch_size=1000):
+    """
+    Blobs on disk last written before ``before`` that have no ``StoredBlob``.
+
+    Files stay on disk when the transaction that recorded their upload is
+    rolled back.
+    """
+    storage = content_addressed_storage
+    names = list(storage.blob_names())
+    for start in range(0, len(names), batch_size):
+        batch = names[start : start + batch_size]
+        known = set(
+            _blobs().objects.filter(name__in=batch).values_list("name", flat=True)
+        )
+        for name in batch:
+            if name not in known and storage.get_modified_time(name) < before:
+                yield name
+
+
+def retain_files(instances):
+    """Count references for rows saved without signals, e.g. by bulk_create."""
+    names = []
+    for instance in instances:
+        for field in content_addressed_fields(type(instance)):
+            names.append(getattr(instance, field.attname).name)
+    add_references(names)
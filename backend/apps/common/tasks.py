@@ -0,0 +1,56 @@
+import contextvars
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from apps.vendor.sharding import tenant_db
+from django.conf import settings
+from django.db import close_old_connections, connections, transaction
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Return the process-wide worker pool, creating it on first use."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, "BACKGROUND_TASK_WORKERS", 2),
+                    thread_name_prefix="background-task",
+                )
+    return _executor
+
+
+def _run(func, args, kwargs):
+    close_old_connections()
+    try:
+        func(*args, **kwargs)
+    except Exception:
+        logger.exception("Background task %s failed.", func.__name__)
+    finally:
+        connections.close_all()
+
+
+def run_in_background(func, *args, **kwargs):
+    """
+    Run ``func`` outside the request once the current transaction commits.
+
+    With ``BACKGROUND_TASKS_EAGER`` enabled the task runs inline instead, which
+    keeps tests and management commands deterministic. The task runs in a copy
+    of the caller's context, so for the same tenant, and waits for the commit
+    of that tenant's database.
+    """
+    context = contextvars.copy_context()
+    using = tenant_db()
+    if getattr(settings, "BACKGROUND_TASKS_EAGER", False):
+        transaction.on_commit(lambda: context.run(func, *args, **kwargs), using=using)
+        return
+    transaction.on_commit(
+        lambda: get_executor().submit(context.run, _run, func, args, kwargs),
+        using=using,
+    )
@@ -1,3 +1,329 @@
-from django.test import TestCase
+import io
+import os
+import socketserver
+import threading
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+from zoneinfo import ZoneInfo
 
-# Create your tests here.
+import pytest
+from apps.category.models import Category, Menu
+from apps.users.models import User
+from apps.vendor.models import Vendor
+from django.core import mail
+from django.core.files.storage import FileSystemStorage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from rest_framework.utils.serializer_helpers import ReturnList
+
+from . import renderers
+from .images import IMAGE_VARIANTS, variant_name
+from .mail import queue_email
+from .models import OutboxEmail, StoredBlob
+from .renderers import FastJSONParser, FastJSONRenderer
+
+
+@pytest.fixture
+def category(db, settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    user = User.objects.create_user(
+        first_name="john", last_name="doe", email="john@example.com", password="x"
+    )
+    vendor = Vendor.objects.create(user=user, name="Shop")
+    return Category.objects.create(vendor=vendor, owner=user, name="Food")
+
+
+def upload(name, content=b"same bytes"):
+    return SimpleUploadedFile(name, content, "image/png")
+
+
+@pytest.mark.django_db
+def test_identical_uploads_share_one_file(category, tmp_path):
+    first = Menu(category=category, vendor=category.vendor)
+    first.image.save("a.png", upload("a.png"), save=True)
+    second = Menu(category=category, vendor=category.vendor)
+    second.image.save("b.png", upload("b.png"), save=True)
+
+    assert first.image.name == second.image.name
+    assert first.image.name.startswith("blobs/")
+    assert StoredBlob.objects.get(name=first.image.name).ref_count == 2
+
+
+@pytest.mark.django_db
+def test_file_removed_only_after_last_reference(
+    category, tmp_path, django_capture_on_commit_callbacks
+):
+    menus = []
+    for name in ("a.png", "b.png"):
+        menu = Menu(category=category, vendor=category.vendor)
+        menu.image.save(name, upload(name), save=True)
+        menus.append(Menu.objects.get(pk=menu.pk))
+    path = tmp_path / menus[0].image.name
+
+    with django_capture_on_commit_callbacks(execute=True):
+        menus[0].delete()
+    assert path.exists()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        menus[1].image = upload("c.png", b"other bytes")
+        menus[1].save()
+    assert not path.exists()
+    assert not StoredBlob.objects.filter(name=menus[0].image.name).exists()
+
+
+@pytest.mark.django_db
+def test_files_referenced_again_before_their_deletion_are_kept(
+    category, tmp_path, django_capture_on_commit_callbacks
+):
+    menu = Menu(category=category, vendor=category.vendor)
+    menu.image.save("a.png", upload("a.png"), save=True)
+    path = tmp_path / menu.image.name
+
+    # The same bytes are uploaded again between the commit that dropped the
+    # last reference and the deletion it scheduled.
+    with django_capture_on_commit_callbacks() as callbacks:
+        Menu.objects.get(pk=menu.pk).delete()
+    again = Menu(category=category, vendor=category.vendor)
+    again.image.save("b.png", upload("b.png"), save=True)
+    for callback in callbacks:
+        callback()
+    assert path.exists()
+    assert StoredBlob.objects.get(name=again.image.name).ref_count == 1
+
+
+@pytest.mark.django_db
+def test_replaced_images_lose_their_derivatives(
+    category, tmp_path, monkeypatch, settings, django_capture_on_commit_callbacks
+):
+    from PIL import Image
+
+    settings.BACKGROUND_TASKS_EAGER = True
+    monkeypatch.setattr(
+        Menu._meta.get_field("image"), "storage", FileSystemStorage(tmp_path)
+    )
+
+    def png(color):
+        buffer = io.BytesIO()
+        Image.new("RGB", (300, 300), color).save(buffer, "PNG")
+        return upload(f"{color}.png", buffer.getvalue())
+
+    with django_capture_on_commit_callbacks(execute=True):
+        menu = Menu.objects.create(
+            category=category, vendor=category.vendor, image=png("red")
+        )
+    old = [variant_name(menu.image.name, variant) for variant in IMAGE_VARIANTS]
+    assert all((tmp_path / name).exists() for name in old)
+
+    menu = Menu.objects.get(pk=menu.pk)
+    with django_capture_on_commit_callbacks(execute=True):
+        menu.image = png("blue")
+        menu.save()
+    assert not any((tmp_path / name).exists() for name in old)
+    assert (tmp_path / variant_name(menu.image.name, "thumbnail")).exists()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_purge_finds_files_of_rolled_back_uploads(category, tmp_path):
+    with pytest.raises(RuntimeError), transaction.atomic():
+        menu = Menu(category=category, vendor=category.vendor)
+        menu.image.save("a.png", upload("a.png"), save=True)
+        raise RuntimeError
+    path = tmp_path / menu.image.name
+    assert path.exists() and not StoredBlob.objects.exists()
+
+    call_command("purge_media_blobs")
+    assert path.exists()
+    day_ago = (timezone.now() - timedelta(days=1, minutes=1)).timestamp()
+    os.utime(path, (day_ago, day_ago))
+    call_command("purge_media_blobs")
+    assert not path.exists()
+
+
+class SMTPStandIn(socketserver.StreamRequestHandler):
+    """Just enough SMTP to accept mail; recipients named bounce@ are refused."""
+
+    def handle(self):
+        self.server.connections += 1
+        self.reply("220 localhost ready")
+        data = None
+        for line in self.rfile:
+            line = line.decode().rstrip("\r\n")
+            if data is not None:
+                if line == ".":
+                    self.server.messages.append("\n".join(data))
+                    data = None
+                    self.reply("250 OK")
+                else:
+                    data.append(line)
+                continue
+            verb = line[:4].upper()
+            if verb == "QUIT":
+                return self.reply("221 Bye")
+            if verb == "DATA":
+                data = []
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+            elif verb == "RCPT" and "bounce@" in line:
+                self.reply("550 No such user")
+            else:
+                self.reply("250 OK")
+
+    def reply(self, text):
+        self.wfile.write(f"{text}\r\n".encode())
+
+
+@pytest.fixture
+def smtp_server(settings):
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), SMTPStandIn)
+    server.daemon_threads = True
+    server.connections, server.messages = 0, []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    settings.EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
+    settings.EMAIL_HOST, settings.EMAIL_PORT = server.server_address
+    settings.EMAIL_USE_TLS = False
+    settings.EMAIL_HOST_USER = settings.EMAIL_HOST_PASSWORD = ""
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.django_db
+def test_emails_are_queued_again_when_the_waiting_one_was_sent(monkeypatch):
+    create = OutboxEmail.objects.create
+    conflicts = []
+
+    def create_after_conflict(**kwargs):
+        # The identical waiting message is sent between the failed insert
+        # and the lookup of the waiting row.
+        if not conflicts:
+            conflicts.append(kwargs)
+            raise IntegrityError("UNIQUE constraint failed")
+        return create(**kwargs)
+
+    monkeypatch.setattr(OutboxEmail.objects, "create", create_after_conflict)
+    email = queue_email(["guest@example.com"], "Welcome", body="Hello")
+    assert conflicts and email.status == OutboxEmail.Status.PENDING
+    assert OutboxEmail.objects.get() == email
+
+
+@pytest.mark.django_db
+def test_outbox_worker_sends_batches_over_one_connection(smtp_server, settings):
+    for i in range(5):
+        queue_email([f"guest{i}@example.com"], "Welcome", body=f"Hello {i}")
+    queue_email(["guest0@example.com"], "Welcome", body="Hello 0")
+    bounced = queue_email(["bounce@example.com"], "Welcome", body="Hello")
+    assert OutboxEmail.objects.count() == 6
+
+    call_command("send_outbox", batch_size=4)
+
+    assert len(smtp_server.messages) == 5
+    assert smtp_server.connections == 2
+    bounced.refresh_from_db()
+    assert bounced.status == OutboxEmail.Status.PENDING
+    assert bounced.attempts == 1 and "SMTPRecipientsRefused" in bounced.last_error
+    assert bounced.next_attempt_at > timezone.now() + timedelta(seconds=25)
+    assert OutboxEmail.objects.filter(status=OutboxEmail.Status.SENT).count() == 5
+
+    # Sent messages no longer block an identical new one.
+    assert queue_email(["guest0@example.com"], "Welcome", body="Hello 0").pk
+    settings.EMAIL_OUTBOX_MAX_ATTEMPTS = 2
+    OutboxEmail.objects.filter(pk=bounced.pk).update(next_attempt_at=timezone.now())
+    call_command("send_outbox")
+    bounced.refresh_from_db()
+    assert bounced.status == OutboxEmail.Status.FAILED
+    assert len(smtp_server.messages) == 6
+
+
+@pytest.mark.django_db
+def test_password_reset_only_queues_the_email():
+    user = User.objects.create_user(
+        first_name="john", last_name="doe", email="john@example.com", password="x"
+    )
+    response = APIClient().get(f"/api/v1/auth/user/password-reset/{user.email}/")
+
+    assert response.status_code == 200
+    assert mail.outbox == []
+    email = OutboxEmail.objects.get()
+    assert email.to == [user.email] and "Reset" in email.subject
+
+
+PAYLOAD = ReturnList(
+    [
+        {
+            "id": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+            "price": Decimal("12.50"),
+            "created_at": datetime(
+                2025, 3, 14, 19, 30, 5, 123456, tzinfo=ZoneInfo("UTC")
+            ),
+            "opens_at": datetime(2025, 3, 14, 8, tzinfo=timezone.get_fixed_timezone(0)),
+            "closes_at": datetime(2025, 3, 14, 22, tzinfo=ZoneInfo("Asia/Tehran")),
+            "naive": datetime(2025, 3, 14, 8),
+            "day": datetime(2025, 3, 14).date(),
+            "name": gettext_lazy("Shop"),
+            "note": "caf\u00e9 \u2028",
+            "tags": ("a", "b"),
+            3: None,
+        }
+    ],
+    serializer=None,
+)
+
+
+@pytest.mark.parametrize("fast", [True, False])
+def test_fast_json_renderer_matches_drf(fast, monkeypatch):
+    if not fast:
+        monkeypatch.setattr(renderers, "orjson", None)
+    expected = JSONRenderer().render(PAYLOAD)
+
+    assert FastJSONRenderer().render(PAYLOAD) == expected
+    assert FastJSONRenderer().render(None) == b""
+    indented = FastJSONRenderer().render(PAYLOAD, renderer_context={"indent": 2})
+    assert indented == JSONRenderer().render(PAYLOAD, renderer_context={"indent": 2})
+
+    parser = FastJSONParser()
+    assert parser.parse(io.BytesIO(expected)) == JSONParser().parse(
+        io.BytesIO(expected)
+    )
+    with pytest.raises(ParseError):
+        parser.parse(io.BytesIO(b"{"))
+
+
+@pytest.mark.parametrize(
+    "value, written",
+    [(2.5, b"2.5"), (0.0001, b"0.0001"), (1e16, b"1e16"), (1e-5, b"0.00001")],
+)
+def test_fast_json_renderer_floats(value, written):
+    data = {"value": value}
+    assert FastJSONRenderer().render(data) == b'{"value":%s}' % written
+    assert FastJSONParser().parse(io.BytesIO(JSONRenderer().render(data))) == data
+
+
+def test_fast_json_renderer_writes_non_finite_floats_as_null():
+    data = {"values": [float("nan"), float("-inf")]}
+    with pytest.raises(ValueError):
+        JSONRenderer().render(data)
+    assert FastJSONRenderer().render(data) == b'{"values":[null,null]}'
+
+
+@pytest.mark.django_db
+def test_profile_renderers_keep_the_envelope():
+    user = User.objects.create_user(
+        first_name="john", last_name="doe", email="john@example.com", password="x"
+    )
+    client = APIClient()
+    client.force_authenticate(user)
+
+    response = client.get("/api/v1/profiles/me/")
+    body = response.json()
+    assert response["Content-Type"] == "application/json; charset=utf-8"
+    assert body["status_code"] == 200
+    assert body["profile"]["email"] == user.email
+    body = client.get("/api/v1/profiles/all/").json()
+    assert body["status_code"] == 200 and "profiles" in body
@@ -1,3 +1,12 @@
-from django.shortcuts import render
+from django.conf import settings
+from django.views.static import serve
 
-# Create your views here.
+
+def serve_media(request, path, document_root=None, show_indexes=False):
+    """Serve uploads, marking content-addressed blobs as immutable."""
+    response = serve(request, path, document_root, show_indexes)
+    if path.startswith("blobs/"):
+        response["Cache-Control"] = (
+            f"public, max-age={settings.MEDIA_CACHE_MAX_AGE}, immutable"
+        )
+    return response
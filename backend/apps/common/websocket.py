@@ -0,0 +1,34 @@
+from urllib.parse import parse_qs
+
+from apps.users.authentication import VendorJWTAuthentication
+from channels.db import database_sync_to_async
+from channels.middleware import BaseMiddleware
+from django.contrib.auth.models import AnonymousUser
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+
+
+@database_sync_to_async
+def get_token_user(raw_token):
+    authentication = VendorJWTAuthentication()
+    try:
+        return authentication.get_user(authentication.get_validated_token(raw_token))
+    except (InvalidToken, AuthenticationFailed):
+        return AnonymousUser()
+
+
+class JWTAuthMiddleware(BaseMiddleware):
+    """
+    Authenticate WebSocket handshakes with ``?token=<access token>``.
+
+    Browsers cannot send an ``Authorization`` header when opening a socket, so
+    the same access token the REST API accepts is read from the query string.
+    """
+
+    async def __call__(self, scope, receive, send):
+        query = parse_qs(scope.get("query_string", b"").decode())
+        token = query.get("token", [None])[0]
+        if token:
+            scope = dict(scope, user=await get_token_user(token))
+        elif "user" not in scope:
+            scope = dict(scope, user=AnonymousUser())
+        return await super().__call__(scope, receive, send)
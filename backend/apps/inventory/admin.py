@@ -2,7 +2,14 @@
 from django import forms
 from django.contrib import admin
 
-from .models import Product, Sale, Stock, StockMovement, Warehouse
+from .models import (
+    Product,
+    RecipeIngredient,
+    Sale,
+    Stock,
+    StockMovement,
+    Warehouse,
+)
 
 
 @admin.register(Warehouse)
@@ -38,6 +45,13 @@ class StockMovementAdmin(admin.ModelAdmin):
         return self.readonly_fields
 
 
+@admin.register(RecipeIngredient)
+class RecipeIngredientAdmin(admin.ModelAdmin):
+    list_display = ("menu_item", "product", "warehouse", "quantity")
+    list_filter = ("warehouse",)
+    search_fields = ("menu_item__name", "product__tool", "product__sku")
+
+
 @admin.register(Sale)
 class SaleAdmin(admin.ModelAdmin):
     list_display = (
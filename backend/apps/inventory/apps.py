@@ -1,4 +1,5 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 from django.utils.translation import gettext_lazy as _
 
 
@@ -7,4 +8,8 @@ class InventoryConfig(AppConfig):
     name = "apps.inventory"
 
     verbose_name = _("Inventory")
-    
\ No newline at end of file
+
+    def ready(self):
+        from apps.inventory import signals
+
+        post_migrate.connect(signals.create_search_index, sender=self)
@@ -0,0 +1,117 @@
+import os
+import random
+import sqlite3
+import string
+import tempfile
+import time
+import uuid
+
+from apps.inventory.utils import FTS_RANK, FTS_SCHEMA, FTS_TABLE, build_match_query
+from django.core.management.base import BaseCommand
+
+WORDS = (
+    "drill saw hammer wrench pliers sander grinder router chisel clamp level "
+    "screwdriver socket ratchet torque cordless brushless steel carbide cobalt "
+    "titanium compact heavy duty pro mini max red blue black yellow green small "
+    "medium large battery charger blade bit kit case set metric imperial"
+).split()
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare LIKE scans with the FTS5 index on a throwaway SQLite file "
+        "filled with synthetic products."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--products", type=int, default=1_000_000)
+        parser.add_argument("--queries", type=int, default=20)
+
+    def handle(self, *args, **options):
+        rng = random.Random(42)
+        path = os.path.join(tempfile.mkdtemp(), "search-bench.sqlite3")
+        db = sqlite3.connect(path)
+        try:
+            self.seed(db, rng, options["products"])
+            # What staff actually type: the start of a model name, optionally
+            # narrowed with a common word.
+            selective = [
+                f"{rng.choice(self.models)[:5]} {rng.choice(WORDS)}"
+                for _ in range(options["queries"])
+            ]
+            broad = [rng.choice(WORDS)[:4] for _ in range(options["queries"])]
+            results = {
+                "selective": (
+                    self.time_like(db, selective),
+                    self.time_fts(db, selective),
+                ),
+                "broad": (self.time_like(db, broad), self.time_fts(db, broad)),
+            }
+        finally:
+            db.close()
+            os.remove(path)
+
+        self.stdout.write(f"products: {options['products']}")
+        for name, (like, fts) in results.items():
+            self.stdout.write(
+                f"{name:<10} LIKE '%x%': {like * 1000:9.2f} ms/query   "
+                f"FTS5 MATCH (ranked): {fts * 1000:9.2f} ms/query"
+            )
+
+    def seed(self, db, rng, count):
+        db.execute(
+            "CREATE TABLE product (id TEXT PRIMARY KEY, vendor_id INTEGER, "
+            "tool TEXT, sku TEXT, description TEXT, category TEXT, attributes TEXT)"
+        )
+        db.execute(FTS_SCHEMA)
+
+        self.models = [
+            "".join(rng.choices(string.ascii_lowercase, k=8))
+            for _ in range(max(count // 20, 1))
+        ]
+
+        def rows():
+            for i in range(count):
+                words = rng.sample(WORDS, 7)
+                yield (
+                    uuid.UUID(int=rng.getrandbits(128)).hex,
+                    i % 50,
+                    words[0],
+                    f"{words[1][:3].upper()}-{i:07d}",
+                    " ".join([rng.choice(self.models), *words[2:5]]),
+                    words[5],
+                    words[6],
+                )
+
+        db.executemany("INSERT INTO product VALUES (?, ?, ?, ?, ?, ?, ?)", rows())
+        db.execute(
+            f"INSERT INTO {FTS_TABLE} (product_id, vendor_id, tool, sku, "
+            "description, category, attributes) SELECT * FROM product"
+        )
+        db.commit()
+
+    def time_like(self, db, queries):
+        started = time.perf_counter()
+        for query in queries:
+            clauses, params = [], []
+            for term in query.split():
+                clauses.append(
+                    "(tool LIKE ? OR sku LIKE ? OR description LIKE ? "
+                    "OR category LIKE ? OR attributes LIKE ?)"
+                )
+                params.extend([f"%{term}%"] * 5)
+            db.execute(
+                f"SELECT id FROM product WHERE {' AND '.join(clauses)} LIMIT 50",
+                params,
+            ).fetchall()
+        return (time.perf_counter() - started) / len(queries)
+
+    def time_fts(self, db, queries):
+        started = time.perf_counter()
+        for query in queries:
+            db.execute(
+                f"SELECT product_id FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH ? "
+                f"ORDER BY {FTS_RANK} LIMIT 50",
+                [build_match_query(query)],
+            ).fetchall()
+        return (time.perf_counter() - started) / len(queries)
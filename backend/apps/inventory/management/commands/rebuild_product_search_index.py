@@ -0,0 +1,11 @@
+from apps.inventory.utils import rebuild_search_index
+from apps.vendor.sharding import vendor_tenants
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = "Rebuild the FTS5 product search index, e.g. after a bulk import."
+
+    def handle(self, *args, **options):
+        indexed = sum(rebuild_search_index() for _ in vendor_tenants())
+        self.stdout.write(self.style.SUCCESS(f"Indexed {indexed} products."))
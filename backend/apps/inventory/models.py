@@ -3,13 +3,14 @@ from decimal import Decimal
 
 from apps.categories.models import Attribute, AttributeValue, Category
 from apps.common.models import TimeStampedModel
-from apps.vendor.models import Vendor
+from apps.vendor.models import Vendor, VendorScopedModel
+from apps.vendor.sharding import tenant_atomic
 from django.core.exceptions import ValidationError
-from django.db import models, transaction
+from django.db import models
 from django.utils.translation import gettext_lazy as _
 
 
-class Product(TimeStampedModel):
+class Product(TimeStampedModel, VendorScopedModel):
     vendor = models.ForeignKey(
         Vendor, on_delete=models.CASCADE, related_name="products"
     )
@@ -41,20 +42,28 @@ class Product(TimeStampedModel):
 
     class Meta:
         ordering = ["sku"]
+        indexes = [
+            models.Index(fields=["vendor", "sku"], name="product_vendor_sku"),
+        ]
 
 
-class Warehouse(TimeStampedModel):
+class Warehouse(TimeStampedModel, VendorScopedModel):
     vendor = models.ForeignKey(
         Vendor, on_delete=models.CASCADE, related_name="warehouse"
     )
     name = models.CharField(max_length=255)
     location = models.CharField(max_length=255)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["vendor", "name"], name="warehouse_vendor_name"),
+        ]
+
     def __str__(self):
         return self.name
 
 
-class Stock(TimeStampedModel):
+class Stock(TimeStampedModel, VendorScopedModel):
     vendor = models.ForeignKey(Vendor, on_delete=models.CASCADE, related_name="stocks")
     product = models.ForeignKey(Product, on_delete=models.CASCADE)
     warehouse = models.ForeignKey(Warehouse, on_delete=models.CASCADE)
@@ -69,12 +78,15 @@ class Stock(TimeStampedModel):
         verbose_name = _("Stock")
         verbose_name_plural = _("Stock")
         ordering = ["product"]
+        indexes = [
+            models.Index(fields=["vendor", "product"], name="stock_vendor_product"),
+        ]
 
     def __str__(self):
         return f"{self.product.tool} - {self.quantity} in {self.warehouse.name}"
 
 
-class StockMovement(TimeStampedModel):
+class StockMovement(TimeStampedModel, VendorScopedModel):
     class MovementType(models.TextChoices):
         IN = "in", _("In")
         OUT = "out", _("Out")
@@ -101,6 +113,21 @@ class StockMovement(TimeStampedModel):
     movement_type = models.CharField(max_length=10, choices=MovementType.choices)
     quantity = models.PositiveIntegerField()
     remarks = models.TextField(blank=True)
+    # Set on the OUT movements recorded when a restaurant order is delivered.
+    order = models.ForeignKey(
+        "restaurant.Order",
+        on_delete=models.SET_NULL,
+        related_name="stock_movements",
+        blank=True,
+        null=True,
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["vendor", "-created_at"], name="stock_movement_vendor_created"
+            ),
+        ]
 
     def clean(self):
         if self.movement_type == self.MovementType.TRANSFER:
@@ -127,7 +154,42 @@ class StockMovement(TimeStampedModel):
         return f"{self.movement_type.upper()} - {self.product.tool} x{self.quantity}"
 
 
-class Sale(TimeStampedModel):
+class RecipeIngredient(TimeStampedModel, VendorScopedModel):
+    """How much of a product one unit of a menu item uses, and where it is stored."""
+
+    vendor = models.ForeignKey(
+        Vendor, on_delete=models.CASCADE, related_name="recipe_ingredients"
+    )
+    menu_item = models.ForeignKey(
+        "category.Category",
+        on_delete=models.CASCADE,
+        related_name="recipe_ingredients",
+    )
+    product = models.ForeignKey(
+        Product, on_delete=models.CASCADE, related_name="recipe_ingredients"
+    )
+    warehouse = models.ForeignKey(
+        Warehouse, on_delete=models.CASCADE, related_name="recipe_ingredients"
+    )
+    quantity = models.PositiveIntegerField()
+
+    class Meta:
+        unique_together = ["menu_item", "product", "warehouse"]
+        indexes = [
+            models.Index(
+                fields=["vendor", "menu_item"], name="recipe_vendor_menu_item"
+            ),
+        ]
+
+    def clean(self):
+        if self.quantity is not None and self.quantity < 1:
+            raise ValidationError({"quantity": _("Quantity must be at least 1.")})
+
+    def __str__(self):
+        return f"{self.menu_item} uses {self.quantity} x {self.product.tool}"
+
+
+class Sale(TimeStampedModel, VendorScopedModel):
     vendor = models.ForeignKey(Vendor, on_delete=models.CASCADE, related_name="sales")
     product = models.ForeignKey("Product", on_delete=models.PROTECT)
     quantity = models.PositiveIntegerField()
@@ -203,7 +265,7 @@ class Sale(TimeStampedModel):
 
         return total_revenue - total_cost - seller_commission
 
-    @transaction.atomic
+    @tenant_atomic
     def process_sale(self):
         stock = self.get_stock()
         if stock.quantity < self.quantity:
@@ -217,3 +279,6 @@ class Sale(TimeStampedModel):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["vendor", "-created_at"], name="sale_vendor_created"),
+        ]
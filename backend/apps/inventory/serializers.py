@@ -1,10 +1,18 @@
 from decimal import Decimal
 
 from apps.categories.models import AttributeValue, Category
-from django.db import transaction
+from apps.vendor.mixins import VendorScopedSerializerMixin
+from apps.vendor.sharding import tenant_atomic
 from rest_framework import serializers
 
-from .models import Product, Sale, Stock, StockMovement, Warehouse
+from .models import (
+    Product,
+    RecipeIngredient,
+    Sale,
+    Stock,
+    StockMovement,
+    Warehouse,
+)
 
 
 class CategoryReadSerializer(serializers.ModelSerializer):
@@ -19,7 +27,7 @@ class AttributeValueSlugSerializer(serializers.ModelSerializer):
         fields = ("id", "attribute_value")
 
 
-class ProductSerializer(serializers.ModelSerializer):
+class ProductSerializer(VendorScopedSerializerMixin, serializers.ModelSerializer):
     tool = serializers.CharField(max_length=100, required=False)
 
     class Meta:
@@ -65,16 +73,16 @@ class ProductSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
-class WarehouseSerializer(serializers.ModelSerializer):
+class WarehouseSerializer(VendorScopedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Warehouse
         fields = ("id", "name", "location", "created_at", "updated_at")
         read_only_fields = ("created_at", "updated_at")
 
 
-class StockSerializer(serializers.ModelSerializer):
-    product = serializers.PrimaryKeyRelatedField(queryset=Product.objects.all())
-    warehouse = serializers.PrimaryKeyRelatedField(queryset=Warehouse.objects.all())
+class StockSerializer(VendorScopedSerializerMixin, serializers.ModelSerializer):
+    product = serializers.PrimaryKeyRelatedField(queryset=Product.objects)
+    warehouse = serializers.PrimaryKeyRelatedField(queryset=Warehouse.objects)
 
     class Meta:
         model = Stock
@@ -96,13 +104,13 @@ class StockSerializer(serializers.ModelSerializer):
         read_only_fields = ("created_at", "updated_at")
 
 
-class StockMovementSerializer(serializers.ModelSerializer):
-    product = serializers.PrimaryKeyRelatedField(queryset=Product.objects.all())
+class StockMovementSerializer(VendorScopedSerializerMixin, serializers.ModelSerializer):
+    product = serializers.PrimaryKeyRelatedField(queryset=Product.objects)
     from_warehouse = serializers.PrimaryKeyRelatedField(
-        queryset=Warehouse.objects.all(), required=False, allow_null=True
+        queryset=Warehouse.objects, required=False, allow_null=True
     )
     to_warehouse = serializers.PrimaryKeyRelatedField(
-        queryset=Warehouse.objects.all(), required=False, allow_null=True
+        queryset=Warehouse.objects, required=False, allow_null=True
     )
 
     class Meta:
@@ -142,8 +150,30 @@ class StockMovementSerializer(serializers.ModelSerializer):
         return data
 
 
-class SaleSerializer(serializers.ModelSerializer):
-    product = serializers.PrimaryKeyRelatedField(queryset=Product.objects.all())
+class RecipeIngredientSerializer(
+    VendorScopedSerializerMixin, serializers.ModelSerializer
+):
+    class Meta:
+        model = RecipeIngredient
+        fields = (
+            "id",
+            "menu_item",
+            "product",
+            "warehouse",
+            "quantity",
+            "created_at",
+            "updated_at",
+        )
+        read_only_fields = ("created_at", "updated_at")
+
+    def validate_quantity(self, value):
+        if value < 1:
+            raise serializers.ValidationError("Quantity must be at least 1")
+        return value
+
+
+class SaleSerializer(VendorScopedSerializerMixin, serializers.ModelSerializer):
+    product = serializers.PrimaryKeyRelatedField(queryset=Product.objects)
 
     commission_percent = serializers.SerializerMethodField(read_only=True)
     total_revenue = serializers.SerializerMethodField(read_only=True)
@@ -219,7 +249,7 @@ class SaleSerializer(serializers.ModelSerializer):
     def get_seller_profit(self, obj):
         return obj.get_seller_profit()
 
-    @transaction.atomic
+    @tenant_atomic
     def create(self, validated_data):
         sale = Sale(**validated_data)
         sale.process_sale()
@@ -1,3 +1,57 @@
-from django.db.models.signals import m2m_changed, post_save
+from apps.categories.models import AttributeValue, Category
+from apps.common.tasks import run_in_background
+from apps.restaurant.models import Order
+from apps.restaurant.utils import order_status_changed
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
+from .models import Product
+from .utils import (
+    consume_order_ingredients,
+    ensure_search_index,
+    index_products,
+    index_products_on_commit,
+    unindex_products,
+)
+
+
+def create_search_index(sender, using, **kwargs):
+    ensure_search_index(using)
+
+
+@receiver(post_save, sender=Product)
+def index_saved_product(sender, instance, using, **kwargs):
+    index_products_on_commit([instance.pk], using)
+
+
+@receiver(post_delete, sender=Product)
+def unindex_deleted_product(sender, instance, using, **kwargs):
+    unindex_products([instance.pk], using)
+
+
+def reindex_category_products(category_id):
+    ids = Product.objects.filter(category_id=category_id).values_list("id", flat=True)
+    index_products(ids)
+
+
+@receiver(post_save, sender=AttributeValue)
+@receiver(post_delete, sender=AttributeValue)
+def reindex_products_offering_value(sender, instance, using, **kwargs):
+    attribute = instance.attribute
+    ids = Product.all_vendors.using(using).filter(
+        category_id=attribute.category_id, tool=attribute.tool_key
+    )
+    index_products_on_commit(ids.values_list("id", flat=True), using)
+
+
+@receiver(post_save, sender=Category)
+def reindex_renamed_category(sender, instance, created, **kwargs):
+    previous = getattr(instance, "_previous_name", None)
+    if not created and previous is not None and previous != instance.name:
+        run_in_background(reindex_category_products, instance.pk)
+
+
+@receiver(order_status_changed, sender=Order)
+def consume_delivered_order(sender, order, **kwargs):
+    if order.status == Order.OrderStatus.DELIVERED:
+        consume_order_ingredients(order)
@@ -4,6 +4,7 @@ from rest_framework.routers import DefaultRouter
 from . import views
 from .views import (
     ProductViewSet,
+    RecipeIngredientViewSet,
     SaleViewSet,
     StockMovementViewSet,
     StockViewSet,
@@ -12,6 +13,7 @@ from .views import (
 
 router = DefaultRouter()
 router.register('products', ProductViewSet)
+router.register('recipe-ingredients', RecipeIngredientViewSet)
 router.register('sales', SaleViewSet)
 router.register('stocks', StockViewSet)
 router.register('stock-movements', StockMovementViewSet)
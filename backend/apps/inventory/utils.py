@@ -0,0 +1,332 @@
+import re
+import threading
+import uuid
+from collections import Counter, defaultdict
+
+from apps.categories.models import AttributeValue
+from apps.vendor.sharding import tenant_atomic, tenant_db
+from django.core.exceptions import ValidationError
+from django.db import connections, transaction
+from django.db.models import Case, Exists, F, Q, Sum, When
+from django.utils.translation import gettext_lazy as _
+
+from .models import Product, RecipeIngredient, Stock, StockMovement
+
+FTS_TABLE = "inventory_product_fts"
+
+# rowid is derived from the product UUID so a product can be replaced or
+# removed without scanning the index. Column weights for bm25() follow the
+# column order: tool, sku, description, category, attributes.
+FTS_SCHEMA = f"""
+CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+    product_id UNINDEXED,
+    vendor_id UNINDEXED,
+    tool,
+    sku,
+    description,
+    category,
+    attributes,
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+)
+"""
+FTS_RANK = f"bm25({FTS_TABLE}, 0, 0, 10.0, 8.0, 1.0, 3.0, 2.0)"
+
+
+def index_connection(using=None):
+    """Connection to ``using``, by default the database of the active tenant."""
+    return connections[using or tenant_db()]
+
+
+def search_index_available(using=None):
+    return index_connection(using).vendor == "sqlite"
+
+
+def ensure_search_index(using=None):
+    if search_index_available(using):
+        with index_connection(using).cursor() as cursor:
+            cursor.execute(FTS_SCHEMA)
+
+
+def fts_rowid(product_id):
+    return uuid.UUID(str(product_id)).int >> 65
+
+
+def build_match_query(text):
+    """Turn free text into an FTS5 query: every word must match as a prefix."""
+    terms = re.findall(r"\w+", text or "")
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def _flatten(value):
+    if isinstance(value, dict):
+        return " ".join(_flatten(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return " ".join(_flatten(v) for v in value)
+    return "" if value is None else str(value)
+
+
+def product_document(row, values=()):
+    """Map a ``values()`` row of a product to its FTS row."""
+    return (
+        fts_rowid(row["id"]),
+        str(row["id"]),
+        row["vendor_id"],
+        row["tool"],
+        row["sku"],
+        row["description"],
+        row["category__name"],
+        " ".join([_flatten(row["attributes"]), *values]).strip(),
+    )
+
+
+def _offered_values(rows, using):
+    """Attribute values of the category and tool of each row, by that pair."""
+    pairs = {(row["category_id"], row["tool"]) for row in rows}
+    if not pairs:
+        return {}
+    offered = Q()
+    for category_id, tool in pairs:
+        offered |= Q(attribute__category_id=category_id, attribute__tool_key=tool)
+    values = defaultdict(list)
+    for category_id, tool, value in (
+        AttributeValue.all_vendors.using(using)
+        .filter(offered)
+        .values_list("attribute__category_id", "attribute__tool_key", "attribute_value")
+    ):
+        values[(category_id, tool)].append(value)
+    return values
+
+
+def index_products(product_ids, using=None):
+    """
+    (Re)index products, e.g. after signals-free bulk imports or updates.
+
+    Besides its own fields, a product is found by the attribute values its
+    category offers for its tool. Products that no longer exist are removed.
+    """
+    product_ids = set(product_ids)
+    using = using or tenant_db()
+    if not product_ids or not search_index_available(using):
+        return
+    rows = list(
+        Product.all_vendors.using(using)
+        .filter(pk__in=product_ids)
+        .values(
+            "id",
+            "vendor_id",
+            "tool",
+            "sku",
+            "description",
+            "category_id",
+            "category__name",
+            "attributes",
+        )
+    )
+    offered = _offered_values(rows, using)
+    documents = [
+        product_document(row, offered.get((row["category_id"], row["tool"]), ()))
+        for row in rows
+    ]
+    with index_connection(using).cursor() as cursor:
+        cursor.executemany(
+            f"INSERT OR REPLACE INTO {FTS_TABLE} (rowid, product_id, vendor_id, "
+            "tool, sku, description, category, attributes) "
+            "VALUES (%s, %s, %s, %s, %s, %s, %s, %s)",
+            documents,
+        )
+    missing = product_ids - {row["id"] for row in rows}
+    if missing:
+        unindex_products(missing, using)
+
+
+def unindex_products(product_ids, using=None):
+    if not search_index_available(using):
+        return
+    with index_connection(using).cursor() as cursor:
+        cursor.executemany(
+            f"DELETE FROM {FTS_TABLE} WHERE rowid = %s",
+            [(fts_rowid(pk),) for pk in product_ids],
+        )
+
+
+_pending = threading.local()
+
+
+def index_products_on_commit(product_ids, using=None):
+    """
+    Reindex products once the transaction commits, all in one batch.
+
+    The products saved in a transaction are indexed together by a few
+    queries, however many there are. Ids left over by a transaction that
+    rolled back go with the next batch, which reindexes them harmlessly.
+    """
+    using = using or tenant_db()
+    pending = _pending.__dict__.setdefault(using, set())
+    pending.update(product_ids)
+
+    def flush():
+        if pending:
+            product_ids = list(pending)
+            pending.clear()
+            index_products(product_ids, using)
+
+    transaction.on_commit(flush, using=using)
+
+
+def rebuild_search_index(chunk_size=5000):
+    """Recreate the whole index from ``Product``; returns the number indexed."""
+    if not search_index_available():
+        return 0
+    with index_connection().cursor() as cursor:
+        cursor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+        cursor.execute(FTS_SCHEMA)
+    ids = list(Product.objects.values_list("id", flat=True))
+    for start in range(0, len(ids), chunk_size):
+        index_products(ids[start : start + chunk_size])
+    return len(ids)
+
+
+def search_products(text, vendor_id, limit=50):
+    """
+    Return the ids of the products of ``vendor_id`` matching ``text``, best
+    match first.
+
+    Uses the FTS5 index on SQLite and falls back to ``icontains`` elsewhere.
+    """
+    if vendor_id is None:
+        raise ValueError("Product search needs a vendor.")
+    match = build_match_query(text)
+    if not match:
+        return []
+
+    if not search_index_available():
+        queryset = Product.all_vendors.using(tenant_db()).filter(vendor_id=vendor_id)
+        for term in re.findall(r"\w+", text):
+            queryset = queryset.filter(
+                Q(tool__icontains=term)
+                | Q(sku__icontains=term)
+                | Q(description__icontains=term)
+                | Q(category__name__icontains=term)
+            )
+        return list(queryset.values_list("id", flat=True)[:limit])
+
+    sql = (
+        f"SELECT product_id FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s "
+        f"AND vendor_id = %s ORDER BY {FTS_RANK} LIMIT %s"
+    )
+    with index_connection().cursor() as cursor:
+        cursor.execute(sql, [match, vendor_id, limit])
+        return [uuid.UUID(row[0]) for row in cursor.fetchall()]
+
+
+def order_consumption(order):
+    """
+    Explode the items of a restaurant order into product quantities.
+
+    Returns a ``Counter`` keyed by ``(product_id, warehouse_id)``. Items are
+    summed per menu item and recipes are read in one query each, so the cost
+    does not grow with the number of order lines.
+    """
+    from apps.restaurant.models import OrderItem
+
+    portions = dict(
+        OrderItem.objects.filter(order=order)
+        .order_by()
+        .values("category_id")
+        .annotate(total=Sum("quantity"))
+        .values_list("category_id", "total")
+    )
+    consumption = Counter()
+    ingredients = RecipeIngredient.objects.filter(menu_item_id__in=portions).values(
+        "menu_item_id", "product_id", "warehouse_id", "quantity"
+    )
+    for ingredient in ingredients:
+        key = (ingredient["product_id"], ingredient["warehouse_id"])
+        consumption[key] += (
+            ingredient["quantity"] * portions[ingredient["menu_item_id"]]
+        )
+    return consumption
+
+
+def _stock_rows(consumption):
+    return {
+        (stock.product_id, stock.warehouse_id): stock
+        for stock in Stock.objects.select_for_update()
+        .filter(
+            product_id__in={key[0] for key in consumption},
+            warehouse_id__in={key[1] for key in consumption},
+        )
+        .only("id", "product_id", "warehouse_id", "quantity")
+    }
+
+
+def _check_stock(consumption, stocks):
+    short = [
+        str(product_id)
+        for (product_id, warehouse_id), needed in consumption.items()
+        if (product_id, warehouse_id) not in stocks
+        or stocks[(product_id, warehouse_id)].quantity < needed
+    ]
+    if short:
+        raise ValidationError(
+            _("Not enough stock for products: %(products)s.")
+            % {"products": ", ".join(sorted(short))}
+        )
+
+
+@tenant_atomic
+def consume_order_ingredients(order):
+    """
+    Take the ingredients of a delivered order out of stock.
+
+    Every affected ``Stock`` row is decremented by a single ``UPDATE`` and one
+    OUT ``StockMovement`` per product and warehouse is written with
+    ``bulk_create``. Raises ``ValidationError`` without changing anything when
+    stock is missing; an order is only ever consumed once.
+
+    The ``UPDATE`` only runs while every row still holds enough, so stock
+    taken by a concurrent delivery since it was checked is reported as
+    missing too, also on SQLite where ``select_for_update`` locks nothing.
+    """
+    if StockMovement.objects.filter(order=order).exists():
+        return []
+    consumption = order_consumption(order)
+    if not consumption:
+        return []
+
+    stocks = _stock_rows(consumption)
+    _check_stock(consumption, stocks)
+    # All or nothing: no row is decremented while any of them is short.
+    short = Q()
+    for key, needed in consumption.items():
+        short |= Q(pk=stocks[key].pk, quantity__lt=needed)
+    updated = (
+        Stock.objects.filter(pk__in=[stocks[key].pk for key in consumption])
+        .exclude(Exists(Stock.objects.filter(short)))
+        .update(
+            quantity=Case(
+                *[
+                    When(pk=stocks[key].pk, then=F("quantity") - needed)
+                    for key, needed in consumption.items()
+                ]
+            )
+        )
+    )
+    if updated != len(consumption):
+        _check_stock(consumption, _stock_rows(consumption))
+        raise ValidationError(
+            _("The stock changed while the order was delivered; try again.")
+        )
+    return StockMovement.objects.bulk_create(
+        StockMovement(
+            vendor_id=order.vendor_id,
+            product_id=product_id,
+            from_warehouse_id=warehouse_id,
+            movement_type=StockMovement.MovementType.OUT,
+            quantity=needed,
+            order=order,
+            remarks=f"Order {order.id}",
+        )
+        for (product_id, warehouse_id), needed in consumption.items()
+    )
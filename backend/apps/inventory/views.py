@@ -1,22 +1,37 @@
 from apps.categories.models import Category
+from apps.restaurant.utils import user_vendor_id
+from apps.vendor.mixins import VendorScopedViewMixin
+from apps.vendor.permissions import IsVendorMember
+from apps.vendor.tenancy import current_vendor_id
 from rest_framework import status, viewsets
-from rest_framework.decorators import action, api_view
+from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
 
-from .models import Product, Sale, Stock, StockMovement, Warehouse
+from .models import (
+    Product,
+    RecipeIngredient,
+    Sale,
+    Stock,
+    StockMovement,
+    Warehouse,
+)
 from .serializers import (
     ProductSerializer,
+    RecipeIngredientSerializer,
     SaleSerializer,
     StockMovementSerializer,
     StockSerializer,
     WarehouseSerializer,
 )
+from .utils import search_products
 
 
 @api_view(["POST"])
+@permission_classes([IsVendorMember])
 def create_product_for_category(request, category_id):
+    vendor_id = user_vendor_id(request.user)
     try:
-        category = Category.objects.get(id=category_id)
+        category = Category.objects.for_vendor(vendor_id).get(id=category_id)
     except Category.DoesNotExist:
         return Response(
             {"detail": "Category not found."}, status=status.HTTP_404_NOT_FOUND
@@ -40,13 +55,32 @@ def create_product_for_category(request, category_id):
 
     serializer = ProductSerializer(data=data, context={"request": request})
     serializer.is_valid(raise_exception=True)
-    serializer.save()
+    serializer.save(vendor_id=vendor_id)
     return Response(serializer.data, status=status.HTTP_201_CREATED)
 
 
-class ProductViewSet(viewsets.ModelViewSet):
+class ProductViewSet(VendorScopedViewMixin, viewsets.ModelViewSet):
     queryset = Product.objects.all()
     serializer_class = ProductSerializer
+    permission_classes = [IsVendorMember]
+
+    @action(detail=False, methods=["get"])
+    def search(self, request):
+        """Full-text product search with prefix matching, best match first."""
+        try:
+            limit = min(int(request.query_params.get("limit", 50)), 200)
+        except ValueError:
+            limit = 50
+        ids = search_products(
+            request.query_params.get("q", ""),
+            vendor_id=current_vendor_id(),
+            limit=limit,
+        )
+        products = self.get_queryset().in_bulk(ids)
+        serializer = self.get_serializer(
+            [products[pk] for pk in ids if pk in products], many=True
+        )
+        return Response(serializer.data, status=status.HTTP_200_OK)
 
     @action(detail=True, methods=["get"])
     def tools(self, request, pk=None):
@@ -54,14 +88,17 @@ class ProductViewSet(viewsets.ModelViewSet):
         tools = product.category.tools
         return Response(tools, status=status.HTTP_200_OK)
 
-    def perform_create(self, serializer):
-        vendor = self.request.user.vendor  # or however your user relates to vendor
-        serializer.save(vendor=vendor)
+
+class RecipeIngredientViewSet(VendorScopedViewMixin, viewsets.ModelViewSet):
+    queryset = RecipeIngredient.objects.all()
+    serializer_class = RecipeIngredientSerializer
+    permission_classes = [IsVendorMember]
 
 
-class SaleViewSet(viewsets.ModelViewSet):
+class SaleViewSet(VendorScopedViewMixin, viewsets.ModelViewSet):
     queryset = Sale.objects.all()
     serializer_class = SaleSerializer
+    permission_classes = [IsVendorMember]
 
     @action(detail=True, methods=["post"])
     def process_sale(self, request, pk=None):
@@ -69,33 +106,20 @@ class SaleViewSet(viewsets.ModelViewSet):
         sale.process_sale()
         return Response({"status": "sale processed"}, status=status.HTTP_200_OK)
 
-    def perform_create(self, serializer):
-        vendor = self.request.user.vendor  # or however your user relates to vendor
-        serializer.save(vendor=vendor)
 
-
-class StockViewSet(viewsets.ModelViewSet):
+class StockViewSet(VendorScopedViewMixin, viewsets.ModelViewSet):
     queryset = Stock.objects.all()
     serializer_class = StockSerializer
-
-    def perform_create(self, serializer):
-        vendor = self.request.user.vendor  # or however your user relates to vendor
-        serializer.save(vendor=vendor)
+    permission_classes = [IsVendorMember]
 
 
-class StockMovementViewSet(viewsets.ModelViewSet):
+class StockMovementViewSet(VendorScopedViewMixin, viewsets.ModelViewSet):
     queryset = StockMovement.objects.all()
     serializer_class = StockMovementSerializer
+    permission_classes = [IsVendorMember]
 
-    def perform_create(self, serializer):
-        vendor = self.request.user.vendor  # or however your user relates to vendor
-        serializer.save(vendor=vendor)
 
-
-class WarehouseViewSet(viewsets.ModelViewSet):
+class WarehouseViewSet(VendorScopedViewMixin, viewsets.ModelViewSet):
     queryset = Warehouse.objects.all()
     serializer_class = WarehouseSerializer
-
-    def perform_create(self, serializer):
-        vendor = self.request.user.vendor  # or however your user relates to vendor
-        serializer.save(vendor=vendor)
+    permission_classes = [IsVendorMember]
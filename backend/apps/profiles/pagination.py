@@ -1,7 +1,7 @@
-from rest_framework.pagination import PageNumberPagination
+from apps.common.pagination import EstimatedCountPagination
 
 
-class ProfilePagination(PageNumberPagination):
+class ProfilePagination(EstimatedCountPagination):
     max_page_size = 20
     page_size = 10
     page_size_query_param = "page_size"
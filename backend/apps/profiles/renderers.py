@@ -1,27 +1,21 @@
-import json
+from apps.common.renderers import FastJSONRenderer
 
-from rest_framework.renderers import JSONRenderer
 
-
-class ProfileJsonRenderers(JSONRenderer):
+class ProfileJsonRenderers(FastJSONRenderer):
     charset = "utf-8"
+    envelope = "profile"
 
     def render(self, data, accepted_media_type=None, renderer_context=None):
         status_code = renderer_context["response"].status_code
-        errors = data.get("error", None)
-        if errors is not None:
-            return super(ProfileJsonRenderers, self).render(data)
-
-        return json.dumps({"status_code": status_code, "profile": data})
-
+        if isinstance(data, dict) and data.get("error") is not None:
+            return super().render(data, accepted_media_type, renderer_context)
 
-class ProfilesJsonRenderers(JSONRenderer):
-    charset = "utf-8"
+        return super().render(
+            {"status_code": status_code, self.envelope: data},
+            accepted_media_type,
+            renderer_context,
+        )
 
-    def render(self, data, accepted_media_type=None, renderer_context=None):
-        status_code = renderer_context["response"].status_code
-        errors = data.get("error", None)
-        if errors is not None:
-            return super(ProfilesJsonRenderers, self).render(data)
 
-        return json.dumps({"status_code": status_code, "profiles": data})
+class ProfilesJsonRenderers(ProfileJsonRenderers):
+    envelope = "profiles"
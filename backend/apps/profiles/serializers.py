@@ -1,4 +1,5 @@
-from apps.vendor.serializers import VendorSerializer
+from apps.common.serializers import CountryCodeField, FastReadSerializer, FileURLField
+from apps.vendor.serializers import VendorReadSerializer, VendorSerializer
 from django_countries.serializer_fields import CountryField
 from rest_framework import serializers
 
@@ -68,6 +69,39 @@ class ProfileSerializers(serializers.ModelSerializer):
         return instance
 
 
+class ProfileReadSerializer(FastReadSerializer):
+    """
+    ``ProfileSerializers`` output for list views: a page is one joined query
+    instead of several queries per profile.
+    """
+
+    # Read by the keyset mode of ProfilePagination.
+    extra_lookups = ["created_at"]
+
+    id = serializers.UUIDField()
+    user_id = serializers.UUIDField(source="user__id")
+    username = serializers.CharField(source="user__username")
+    first_name = serializers.CharField(source="user__first_name")
+    last_name = serializers.CharField(source="user__last_name")
+    role = serializers.CharField(source="user__role__label")
+    full_name = serializers.SerializerMethodField()
+    email = serializers.EmailField(source="user__email")
+    business_type = serializers.CharField(source="user__business_type")
+    vendor = VendorReadSerializer(source="user__vendor")
+    profile_photo = FileURLField()
+    country = CountryCodeField(name_only=True)
+    address = serializers.CharField()
+    gender = serializers.CharField()
+    city = serializers.CharField()
+    about_me = serializers.CharField()
+    phone_number = serializers.CharField()
+
+    def get_full_name(self, row):
+        first_name = self.value(row, "user__first_name").title()
+        last_name = self.value(row, "user__last_name").title()
+        return f"{first_name} {last_name}"
+
+
 class UpdateProfileSerializer(serializers.ModelSerializer):
     country = CountryField(name_only=True, read_only=True)
 
@@ -1,3 +1,117 @@
-from django.test import TestCase
+import pytest
+from apps.common.pagination import estimated_count
+from apps.users.models import User
+from apps.vendor.models import Vendor
+from django.core.cache import cache
+from rest_framework.test import APIClient, APIRequestFactory
 
-# Create your tests here.
+from .models import Profile
+from .serializers import ProfileReadSerializer, ProfileSerializers
+
+
+def _users(count):
+    users = [
+        User.objects.create_user(
+            first_name="john",
+            last_name=f"doe {i}",
+            email=f"john{i}@example.com",
+            password="x",
+        )
+        for i in range(count)
+    ]
+    Vendor.objects.create(user=users[0], name="Shop", mobile="0700")
+    users[1].is_superuser = True
+    users[1].save()
+    Vendor.objects.create(user=users[1], name="Admin shop")
+    return users
+
+
+@pytest.mark.django_db
+def test_read_serializer_matches_the_model_serializer():
+    _users(3)
+    request = APIRequestFactory().get("/api/v1/profiles/all/")
+    profiles = Profile.objects.order_by("created_at", "id")
+    rows = ProfileReadSerializer.values(profiles)
+
+    fast = ProfileReadSerializer(rows, many=True, context={"request": request}).data
+    slow = ProfileSerializers(profiles, many=True, context={"request": request}).data
+
+    assert fast == slow
+    assert fast[1]["vendor"]["user"]["admin"] is True
+    assert fast[2]["vendor"] is None
+
+
+@pytest.mark.django_db
+def test_profile_list_pages_without_counting(django_assert_num_queries):
+    cache.clear()
+    users = _users(25)
+    client = APIClient()
+    client.force_authenticate(users[0])
+
+    # The count is taken once; afterwards a page is one joined query.
+    with django_assert_num_queries(2):
+        response = client.get("/api/v1/profiles/all/", {"page_size": 5})
+    for page_size in [5, 20]:
+        with django_assert_num_queries(1):
+            response = client.get("/api/v1/profiles/all/", {"page_size": page_size})
+        profiles = response.json()["profiles"]
+        assert profiles["count"] == 25
+        assert len(profiles["results"]) == page_size
+    assert profiles["results"][0]["vendor"]["name"] == "Shop"
+    assert profiles["next"].endswith("page=2&page_size=20")
+
+    profiles = client.get(profiles["next"]).json()["profiles"]
+    assert len(profiles["results"]) == 5
+    assert profiles["next"] is None
+    assert client.get("/api/v1/profiles/all/", {"page": 4}).status_code == 404
+
+
+@pytest.mark.django_db
+def test_profile_list_keyset_mode_walks_every_profile(django_assert_num_queries):
+    cache.clear()
+    users = _users(25)
+    client = APIClient()
+    client.force_authenticate(users[0])
+    expected = [
+        str(pk)
+        for pk in Profile.objects.order_by("created_at", "id").values_list(
+            "id", flat=True
+        )
+    ]
+
+    with django_assert_num_queries(2):
+        response = client.get("/api/v1/profiles/all/", {"cursor": ""})
+    assert response.json()["profiles"]["previous"] is None
+
+    seen = []
+    url = "/api/v1/profiles/all/?cursor=&page_size=10"
+    while url:
+        with django_assert_num_queries(1):
+            profiles = client.get(url).json()["profiles"]
+        assert profiles["count"] == 25
+        seen += [profile["id"] for profile in profiles["results"]]
+        url = profiles["next"]
+    assert seen == expected
+
+
+@pytest.mark.django_db
+def test_estimated_count_is_refreshed_in_the_background(
+    settings, django_capture_on_commit_callbacks
+):
+    cache.clear()
+    settings.BACKGROUND_TASKS_EAGER = True
+    _users(3)
+    profiles = Profile.objects.order_by("created_at", "id")
+    assert estimated_count(profiles) == 3
+
+    User.objects.create_user(
+        first_name="jane", last_name="doe", email="jane@example.com", password="x"
+    )
+    assert estimated_count(profiles) == 3
+    settings.PAGINATION_COUNT_REFRESH = 0
+    with django_capture_on_commit_callbacks(execute=True) as callbacks:
+        assert estimated_count(profiles) == 3
+        # Only one request schedules the recount.
+        assert estimated_count(profiles) == 3
+    assert len(callbacks) == 1
+    assert estimated_count(profiles) == 4
@@ -11,18 +11,27 @@ from rest_framework.views import APIView
 from .models import Profile
 from .pagination import ProfilePagination
 from .renderers import ProfileJsonRenderers, ProfilesJsonRenderers
-from .serializers import ProfileSerializers, UpdateProfileSerializer
+from .serializers import (
+    ProfileReadSerializer,
+    ProfileSerializers,
+    UpdateProfileSerializer,
+)
 
 User = get_user_model()
 
 
 class ProfileListAPIView(generics.ListAPIView):
-    queryset = Profile.objects.all()
-    serializer_class = ProfileSerializers
+    serializer_class = ProfileReadSerializer
     permission_classes = [IsAuthenticated]
     pagination_class = ProfilePagination
     renderer_classes = [ProfilesJsonRenderers]
 
+    def get_queryset(self):
+        # One joined query per page; the rows are plain dicts.
+        return ProfileReadSerializer.values(
+            Profile.objects.order_by("created_at", "id")
+        )
+
 
 class ProfileDetailAPIView(generics.RetrieveAPIView):
     permission_classes = [AllowAny]
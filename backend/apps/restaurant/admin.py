@@ -1,6 +1,16 @@
-from django.contrib import admin
+from apps.role.registry import RoleChoiceField
+from django.contrib import admin, messages
+from django.core.exceptions import ValidationError
 
-from .models import MultiImages, Order, OrderItem, RestaurantRole, StaffManagement
+from .models import (
+    MultiImages,
+    Order,
+    OrderItem,
+    RestaurantRole,
+    StaffManagement,
+    restaurant_roles,
+)
+from .utils import transition_order
 
 admin.site.register(MultiImages)
 
@@ -11,13 +21,58 @@ class OrderItemInline(admin.TabularInline):
     readonly_fields = []  # if you want to make some fields readonly
 
 
+def transition_action(status):
+    """
+    Admin action moving the selected orders to ``status`` the way the API does,
+    so deliveries consume stock and are rolled back when stock is short.
+    """
+
+    @admin.action(description=f"Mark selected orders {status.value}")
+    def action(modeladmin, request, queryset):
+        moved, failed = 0, []
+        for order in queryset:
+            try:
+                moved += transition_order(order, status)
+            except ValidationError as exc:
+                failed.append(f"#{order.pk}: {' '.join(exc.messages)}")
+        modeladmin.message_user(request, f"{moved} orders marked {status.value}.")
+        if failed:
+            modeladmin.message_user(request, " ".join(failed), messages.ERROR)
+
+    action.__name__ = f"mark_{status.value}"
+    return action
+
+
 @admin.register(Order)
 class OrderAdmin(admin.ModelAdmin):
-    list_display = ["id", "customer", "vendor", "status", "created_at", "updated_at"]
+    list_display = [
+        "id",
+        "customer",
+        "vendor",
+        "status",
+        "item_count",
+        "subtotal",
+        "created_at",
+        "updated_at",
+    ]
     list_filter = ["status", "vendor"]
     search_fields = ["customer", "vendor__name"]
-    readonly_fields = ["created_at", "updated_at"]
+    # Status changes go through the actions, like those of the API.
+    readonly_fields = [
+        "status",
+        "item_count",
+        "subtotal",
+        "claimed_by",
+        "claimed_at",
+        "created_at",
+        "updated_at",
+    ]
     inlines = [OrderItemInline]
+    actions = [
+        transition_action(status)
+        for status in Order.OrderStatus
+        if status != Order.OrderStatus.PENDING
+    ]
 
 
 @admin.register(StaffManagement)
@@ -41,5 +96,10 @@ class StaffManagementAdmin(admin.ModelAdmin):
     )
     ordering = ("-start_day",)
 
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if db_field.name == "role":
+            return RoleChoiceField(restaurant_roles, label=db_field.verbose_name)
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
 
 admin.site.register(RestaurantRole)
@@ -6,3 +6,9 @@ class RestaurantConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.restaurant"
     verbose_name = _("Restaurant")
+
+    def ready(self):
+        from apps.restaurant import signals
+        from apps.restaurant.models import restaurant_roles
+
+        restaurant_roles.connect()
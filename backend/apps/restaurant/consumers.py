@@ -0,0 +1,45 @@
+import asyncio
+
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+
+from .utils import order_events, order_group_name, order_snapshot, user_vendor_id
+
+
+class OrderStreamConsumer(AsyncJsonWebsocketConsumer):
+    """
+    Live orders of the connected user's vendor for kitchen and waiter screens.
+
+    The first frame is ``{"type": "snapshot", "orders": [...]}`` with every
+    active order. After that only ``{"type": "delta", "orders": [...]}`` frames
+    are sent, one per ``ORDER_STREAM_BATCH_WINDOW`` at most, each order merged
+    to its latest change. Clients upsert deltas by ``id`` and drop orders that
+    are no longer pending or accepted.
+    """
+
+    async def connect(self):
+        self.vendor_id = await database_sync_to_async(user_vendor_id)(
+            self.scope.get("user")
+        )
+        if self.vendor_id is None:
+            await self.close(code=4403)
+            return
+        order_events.attach(asyncio.get_running_loop())
+        self.group_name = order_group_name(self.vendor_id)
+        # Join before reading the snapshot: changes made meanwhile are queued
+        # and replayed as deltas instead of being lost.
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
+        orders = await database_sync_to_async(order_snapshot)(self.vendor_id)
+        await self.send_json({"type": "snapshot", "orders": orders})
+
+    async def disconnect(self, code):
+        if getattr(self, "group_name", None):
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+
+    async def receive_json(self, content, **kwargs):
+        # The stream is one-way; order changes go through the REST API.
+        pass
+
+    async def order_deltas(self, event):
+        await self.send_json({"type": "delta", "orders": event["orders"]})
@@ -0,0 +1,118 @@
+import asyncio
+import statistics
+import time
+
+from apps.restaurant.consumers import OrderStreamConsumer
+from apps.restaurant.models import Order
+from apps.users.models import User
+from apps.vendor.models import Vendor
+from asgiref.sync import async_to_sync
+from channels.db import database_sync_to_async
+from channels.testing import WebsocketCommunicator
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+
+
+class Command(BaseCommand):
+    help = (
+        "Connect many order stream screens in-process, replay bursts of order "
+        "creations and status changes through the ORM, and report frames and "
+        "delivery latency with and without batching. Test data is deleted "
+        "afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--screens", type=int, default=1000)
+        parser.add_argument("--bursts", type=int, default=5)
+        parser.add_argument("--burst-size", type=int, default=20)
+        parser.add_argument("--window", type=float, default=0.1)
+
+    def handle(self, *args, **options):
+        user = User.objects.create_user(
+            first_name="bench",
+            last_name="orders",
+            email=f"bench-orders-{time.time_ns()}@example.com",
+            password=None,
+        )
+        vendor = Vendor.objects.create(user=user, name="Order stream benchmark")
+        Order.objects.bulk_create(
+            Order(vendor=vendor, customer=f"Table {i}") for i in range(50)
+        )
+        try:
+            self.stdout.write(
+                f"screens: {options['screens']}, bursts: {options['bursts']} x "
+                f"{options['burst_size']} orders (created, then accepted)"
+            )
+            for window in (0, options["window"]):
+                with override_settings(ORDER_STREAM_BATCH_WINDOW=window):
+                    result = async_to_sync(self.run)(user, vendor, options)
+                self.report(window, result)
+        finally:
+            vendor.delete()
+            user.delete()
+
+    def report(self, window, result):
+        latencies = sorted(result["latencies"])
+        p99 = latencies[int(len(latencies) * 0.99) - 1]
+        self.stdout.write(
+            f"window {window:>4}s: connect+snapshot {result['connect']:6.2f}s | "
+            f"{result['events']} events -> {result['frames']:.1f} frames/screen | "
+            f"delivery p50 {statistics.median(latencies) * 1000:7.1f} ms, "
+            f"p99 {p99 * 1000:7.1f} ms"
+        )
+
+    def burst(self, vendor, size):
+        orders = [
+            Order.objects.create(vendor=vendor, customer=f"Guest {i}")
+            for i in range(size)
+        ]
+        for order in orders:
+            order.status = Order.OrderStatus.ACCEPTED
+            order.save(update_fields=["status", "updated_at"])
+        return {str(order.id) for order in orders}
+
+    async def run(self, user, vendor, options):
+        screens = []
+        for _ in range(options["screens"]):
+            communicator = WebsocketCommunicator(
+                OrderStreamConsumer.as_asgi(), "/ws/v1/restaurant/orders/"
+            )
+            communicator.scope["user"] = user
+            screens.append(communicator)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(screen.connect() for screen in screens))
+        await asyncio.gather(*(screen.receive_json_from(10) for screen in screens))
+        connect = time.perf_counter() - started
+
+        async def drain(screen, expected):
+            accepted, frames = set(), 0
+            while not expected <= accepted:
+                frame = await screen.receive_json_from(30)
+                frames += 1
+                accepted.update(
+                    item["id"]
+                    for item in frame["orders"]
+                    if item["status"] == Order.OrderStatus.ACCEPTED
+                )
+            return frames, time.perf_counter()
+
+        latencies, frames = [], 0
+        for _ in range(options["bursts"]):
+            started = time.perf_counter()
+            expected = await database_sync_to_async(self.burst)(
+                vendor, options["burst_size"]
+            )
+            results = await asyncio.gather(
+                *(drain(screen, expected) for screen in screens)
+            )
+            frames += sum(count for count, _ in results)
+            latencies.extend(finished - started for _, finished in results)
+
+        await asyncio.gather(*(screen.disconnect() for screen in screens))
+        return {
+            "connect": connect,
+            "events": options["bursts"] * options["burst_size"] * 2,
+            "frames": frames / len(screens),
+            "latencies": latencies,
+        }
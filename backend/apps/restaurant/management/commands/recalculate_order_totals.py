@@ -0,0 +1,24 @@
+from apps.restaurant.models import Order
+from apps.restaurant.utils import update_order_totals
+from apps.vendor.sharding import vendor_tenants
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the stored subtotal and item count of orders from their "
+        "items, e.g. after bulk imports that skipped signals."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--vendor", type=int, help="Only orders of this vendor.")
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        size = options["batch_size"]
+        updated = 0
+        for _ in vendor_tenants(options["vendor"]):
+            ids = list(Order.objects.order_by("pk").values_list("pk", flat=True))
+            for start in range(0, len(ids), size):
+                updated += update_order_totals(ids[start : start + size])
+        self.stdout.write(self.style.SUCCESS(f"Recalculated {updated} orders."))
@@ -1,15 +1,17 @@
 from apps.category.models import AttributeType, Category
 from apps.common.models import Staff, TimeStampedModel
-from apps.vendor.models import Vendor
+from apps.common.storage import content_addressed_storage
+from apps.role.registry import RoleRegistry
+from apps.vendor.models import Vendor, VendorScopedModel
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
-from django.db import models
-from django.db.models import F, FloatField, Sum
+from django.db import models, router, transaction
 from django.utils.translation import gettext_lazy as _
+
 User = get_user_model()
 
 
-class Order(TimeStampedModel):
+class Order(TimeStampedModel, VendorScopedModel):
     class OrderStatus(models.TextChoices):
         PENDING = "pending", _("Pending")
         ACCEPTED = "accepted", _("Accepted")
@@ -17,6 +19,15 @@ class Order(TimeStampedModel):
         DELIVERED = "delivered", _("Delivered")
         CANCELLED = "cancelled", _("Cancelled")
 
+    ALLOWED_TRANSITIONS = {
+        OrderStatus.PENDING: [
+            OrderStatus.ACCEPTED,
+            OrderStatus.REJECTED,
+            OrderStatus.CANCELLED,
+        ],
+        OrderStatus.ACCEPTED: [OrderStatus.DELIVERED, OrderStatus.CANCELLED],
+    }
+
     customer = models.CharField(max_length=300)
     vendor = models.ForeignKey(Vendor, on_delete=models.CASCADE, related_name="orders")
     status = models.CharField(
@@ -25,17 +36,103 @@ class Order(TimeStampedModel):
         default=OrderStatus.PENDING,
     )
     notes = models.TextField(blank=True, null=True)
+    covers = models.PositiveSmallIntegerField(
+        default=1, help_text=_("Number of guests served.")
+    )
+    # Maintained from the items by apps.restaurant.signals; repair with the
+    # recalculate_order_totals command after writes that bypass signals.
+    subtotal = models.DecimalField(
+        max_digits=12, decimal_places=2, default=0, editable=False
+    )
+    item_count = models.PositiveIntegerField(default=0, editable=False)
+    # Set when a kitchen display claims an accepted order.
+    claimed_by = models.CharField(max_length=100, blank=True, editable=False)
+    claimed_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["vendor", "status", "created_at"],
+                name="order_vendor_status_created",
+            ),
+            models.Index(fields=["vendor", "-created_at"], name="order_vendor_created"),
+        ]
 
     def __str__(self):
         return f"Order #{self.id} by {self.customer}"
 
+    def save(self, *args, **kwargs):
+        # The totals are only written by UPDATEs from the item signals, so
+        # saving an instance loaded before an item changed keeps them. The
+        # status is only written by transition_order, whose conditional
+        # UPDATE enforces ALLOWED_TRANSITIONS against the stored state.
+        moved_to = None
+        if not self._state.adding and not kwargs.get("force_insert"):
+            previous = getattr(self, "_previous_status", None)
+            if previous is not None and self.status != previous:
+                moved_to, self.status = self.status, previous
+            update_fields = kwargs.get("update_fields")
+            if update_fields is None:
+                update_fields = [
+                    field.name
+                    for field in self._meta.concrete_fields
+                    if not field.primary_key
+                    and field.name not in ("subtotal", "item_count")
+                ]
+            kwargs["update_fields"] = [
+                name for name in update_fields if name != "status"
+            ]
+        if moved_to is None:
+            return super().save(*args, **kwargs)
+
+        from .utils import transition_order
+
+        using = kwargs.get("using") or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using):
+            super().save(*args, **kwargs)
+            if not transition_order(self, moved_to, expected=self.status):
+                raise ValidationError(
+                    {
+                        "status": _(
+                            "An order cannot move from %(current)s to %(status)s."
+                        )
+                        % {"current": self.status, "status": moved_to}
+                    }
+                )
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        # Set by the post_init receiver of apps.restaurant.signals.
+        self._previous_status = self.__dict__.get("status")
+
+    @classmethod
+    def sources_of(cls, status):
+        """The states an order may move to ``status`` from."""
+        return [
+            source
+            for source, targets in cls.ALLOWED_TRANSITIONS.items()
+            if status in targets
+        ]
+
+    def clean(self):
+        if self._state.adding:
+            current = self.OrderStatus.PENDING
+        else:
+            current = (
+                Order.objects.filter(pk=self.pk)
+                .values_list("status", flat=True)
+                .first()
+            )
+        if self.status != current and current not in self.sources_of(self.status):
+            raise ValidationError(
+                {
+                    "status": _("An order cannot move from %(current)s to %(status)s.")
+                    % {"current": current, "status": self.status}
+                }
+            )
+
     def total_price(self):
-        return (
-            self.items.aggregate(
-                total=Sum(F("price") * F("quantity"), output_field=FloatField())
-            )["total"]
-            or 0
-        )
+        return self.subtotal
 
 
 class OrderItem(models.Model):
@@ -47,6 +144,18 @@ class OrderItem(models.Model):
     selected_option = models.JSONField(blank=True, null=True)
     price = models.DecimalField(max_digits=10, decimal_places=2)
 
+    def save(self, *args, using=None, **kwargs):
+        # The totals of the order are recomputed by post_save and post_delete
+        # receivers; one transaction keeps them in step with the items.
+        using = using or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using):
+            super().save(*args, using=using, **kwargs)
+
+    def delete(self, using=None, keep_parents=False):
+        using = using or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using):
+            return super().delete(using=using, keep_parents=keep_parents)
+
     def clean(self):
         if self.quantity < 1:
             raise ValidationError("Quantity must be at least 1.")
@@ -75,10 +184,13 @@ class RestaurantRole(models.Model):
     @classmethod
     def get_choices(cls):
         # Return all roles as (key, label) tuples
-        return list(cls.objects.values_list("key", "label"))
+        return restaurant_roles.choices()
 
 
-class StaffManagement(Staff):
+restaurant_roles = RoleRegistry("restaurant.RestaurantRole")
+
+
+class StaffManagement(Staff, VendorScopedModel):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     vendor = models.ForeignKey(Vendor, on_delete=models.CASCADE, related_name="staff")
     role = models.ForeignKey(
@@ -99,7 +211,13 @@ class MultiImages(models.Model):
     category = models.ForeignKey(
         Category, on_delete=models.CASCADE, related_name="multi_images"
     )
-    image = models.ImageField(upload_to="category/", null=True, blank=True)
+    image = models.ImageField(
+        upload_to="category/",
+        storage=content_addressed_storage,
+        null=True,
+        blank=True,
+    )
+    image_hash = models.CharField(max_length=64, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -0,0 +1,7 @@
+from apps.common.pagination import EstimatedCountPagination
+
+
+class RestaurantPagination(EstimatedCountPagination):
+    max_page_size = 200
+    page_size = 50
+    page_size_query_param = "page_size"
@@ -1,4 +1,5 @@
 from apps.category.models import AttributeType
+from apps.common.images import image_variant_urls
 from apps.users.serializers import UserSerializer
 from apps.vendor.models import Vendor
 from apps.vendor.serializers import VendorSerializer
@@ -6,34 +7,127 @@ from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
 from rest_framework import serializers
 
-from .models import MultiImages, Order, OrderItem, RestaurantRole, StaffManagement
+from .models import (
+    MultiImages,
+    Order,
+    OrderItem,
+    RestaurantRole,
+    StaffManagement,
+    restaurant_roles,
+)
 
 User = get_user_model()
 
 
 class MultiImagesSerializer(serializers.ModelSerializer):
+    image_variants = serializers.SerializerMethodField()
+
     class Meta:
         model = MultiImages
-        fields = ["id", "category", "image", "created_at", "updated_at"]
+        fields = [
+            "id",
+            "category",
+            "image",
+            "image_variants",
+            "created_at",
+            "updated_at",
+        ]
+
+    def get_image_variants(self, obj):
+        return image_variant_urls(
+            obj.image, obj.image_hash, self.context.get("request")
+        )
+
+
+class OrderSerializer(serializers.ModelSerializer):
+    total_price = serializers.DecimalField(
+        source="subtotal", max_digits=12, decimal_places=2, read_only=True
+    )
+
+    class Meta:
+        model = Order
+        fields = [
+            "id",
+            "customer",
+            "status",
+            "notes",
+            "covers",
+            "item_count",
+            "subtotal",
+            "total_price",
+            "claimed_by",
+            "claimed_at",
+            "created_at",
+            "updated_at",
+        ]
+        read_only_fields = fields
+
+
+class OrderTransitionSerializer(serializers.Serializer):
+    status = serializers.ChoiceField(choices=Order.OrderStatus.choices)
+    expected = serializers.ChoiceField(
+        choices=Order.OrderStatus.choices, required=False
+    )
+
+
+class OrderClaimSerializer(serializers.Serializer):
+    claimed_by = serializers.CharField(max_length=100)
+    limit = serializers.IntegerField(min_value=1, max_value=50, default=10)
+
+
+class RestaurantRoleField(serializers.CharField):
+    """A restaurant role given by its key, resolved through the role registry."""
+
+    def get_attribute(self, instance):
+        return restaurant_roles.get_by_pk(instance.role_id)
+
+    def to_internal_value(self, data):
+        key = super().to_internal_value(data)
+        try:
+            return restaurant_roles.get(key)
+        except RestaurantRole.DoesNotExist:
+            raise serializers.ValidationError(f"Unknown role '{key}'.")
 
 
 class StaffManagementSerializer(serializers.ModelSerializer):
-    role = serializers.CharField()  # role key from input
+    role = RestaurantRoleField()  # role key from input
 
     class Meta:
         model = StaffManagement
         exclude = ["user"]  # user is set automatically, exclude from client input
 
     def create(self, validated_data):
-        role_key = validated_data.pop("role")
-        role = RestaurantRole.objects.get(key=role_key)
-        validated_data["role"] = role
         # user will be set in view, not here
         return StaffManagement.objects.create(**validated_data)
 
-    def update(self, instance, validated_data):
-        if "role" in validated_data:
-            role_key = validated_data.pop("role")
-            role = RestaurantRole.objects.get(key=role_key)
-            validated_data["role"] = role
-        return super().update(instance, validated_data)
+
+class StaffOnboardingRowSerializer(serializers.ModelSerializer):
+    email = serializers.EmailField()
+    first_name = serializers.CharField(max_length=255)
+    last_name = serializers.CharField(max_length=255)
+    role = RestaurantRoleField()
+
+    class Meta:
+        model = StaffManagement
+        fields = [
+            "email",
+            "first_name",
+            "last_name",
+            "role",
+            "salary",
+            "start_day",
+            "end_day",
+            "status",
+            "attribute",
+        ]
+        extra_kwargs = {"attribute": {"required": False}}
+
+
+class StaffOnboardingSerializer(serializers.Serializer):
+    staff = StaffOnboardingRowSerializer(many=True, allow_empty=False, max_length=1000)
+
+    def validate_staff(self, rows):
+        emails = [User.objects.normalize_email(row["email"]) for row in rows]
+        if len(set(emails)) != len(emails):
+            raise serializers.ValidationError("Each email may only appear once.")
+        return rows
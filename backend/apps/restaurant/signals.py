@@ -0,0 +1,52 @@
+from apps.common.images import remember_image_name, schedule_image_derivatives
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from .models import MultiImages, Order, OrderItem
+from .utils import (
+    order_delta,
+    publish_order_deltas,
+    update_order_totals,
+)
+
+
+@receiver(post_init, sender=MultiImages)
+def remember_multi_image_name(sender, instance, **kwargs):
+    remember_image_name(instance)
+
+
+@receiver(post_save, sender=MultiImages)
+def build_multi_image_derivatives(sender, instance, **kwargs):
+    schedule_image_derivatives(instance)
+
+
+@receiver(post_init, sender=Order)
+def remember_order_status(sender, instance, **kwargs):
+    instance._previous_status = instance.__dict__.get("status")
+
+
+@receiver(post_save, sender=Order)
+def publish_order_change(sender, instance, created, **kwargs):
+    previous = instance._previous_status
+    if created or instance.status != previous:
+        publish_order_deltas(instance.vendor_id, [order_delta(instance, full=created)])
+    instance._previous_status = instance.status
+
+
+@receiver(post_init, sender=OrderItem)
+def remember_item_order(sender, instance, **kwargs):
+    instance._previous_order_id = instance.__dict__.get("order_id")
+
+
+@receiver(post_save, sender=OrderItem)
+def update_totals_on_item_save(sender, instance, **kwargs):
+    order_ids = {instance.order_id, instance._previous_order_id} - {None}
+    update_order_totals(order_ids)
+    instance._previous_order_id = instance.order_id
+
+
+@receiver(post_delete, sender=OrderItem)
+def update_totals_on_item_delete(sender, instance, origin=None, **kwargs):
+    # Items removed along with their order leave nothing to update.
+    if not isinstance(origin, Order):
+        update_order_totals([instance.order_id])
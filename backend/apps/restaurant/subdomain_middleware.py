@@ -1,7 +1,14 @@
+from apps.vendor.subdomains import subdomain_vendors
 from django.utils.deprecation import MiddlewareMixin
 
 
 class SubdomainMiddleware(MiddlewareMixin):
+    """
+    Set ``request.subdomain`` from the host and ``request.vendor`` to the
+    vendor whose slug it is, or None. Vendors come from ``subdomain_vendors``,
+    so a known or recently unknown subdomain costs no query.
+    """
+
     def process_request(self, request):
         host = request.get_host().split(":")[0]
         domain_parts = host.split(".")
@@ -10,3 +17,6 @@ class SubdomainMiddleware(MiddlewareMixin):
             request.subdomain = domain_parts[0]
         else:
             request.subdomain = None
+        request.vendor = (
+            subdomain_vendors.get(request.subdomain) if request.subdomain else None
+        )
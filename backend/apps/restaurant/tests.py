@@ -1,3 +1,330 @@
-from django.test import TestCase
+from decimal import Decimal
 
-# Create your tests here.
+import pytest
+from apps.category.models import Category
+from apps.users.models import User
+from apps.vendor.models import Vendor
+from asgiref.sync import async_to_sync
+from channels.db import database_sync_to_async
+from channels.testing import WebsocketCommunicator
+from django.contrib.auth.models import AnonymousUser
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.db import DatabaseError
+from rest_framework.test import APIClient
+
+from . import signals
+from .consumers import OrderStreamConsumer
+from .models import Order, OrderItem
+
+STREAM_PATH = "/ws/v1/restaurant/orders/"
+
+
+def _open_stream(user):
+    communicator = WebsocketCommunicator(OrderStreamConsumer.as_asgi(), STREAM_PATH)
+    communicator.scope["user"] = user
+    return communicator
+
+
+@pytest.mark.django_db(transaction=True)
+def test_order_stream_sends_snapshot_then_batched_deltas(settings):
+    settings.ORDER_STREAM_BATCH_WINDOW = 0.05
+    user = User.objects.create_user(
+        first_name="john", last_name="doe", email="john@example.com", password="x"
+    )
+    vendor = Vendor.objects.create(user=user, name="Shop")
+    pending = Order.objects.create(vendor=vendor, customer="Ali")
+    Order.objects.create(
+        vendor=vendor, customer="Sara", status=Order.OrderStatus.DELIVERED
+    )
+
+    def place_and_accept():
+        order = Order.objects.create(vendor=vendor, customer="Omid")
+        order.status = Order.OrderStatus.ACCEPTED
+        order.save()
+        pending.status = Order.OrderStatus.REJECTED
+        pending.save()
+        return order
+
+    async def scenario():
+        communicator = _open_stream(user)
+        connected, _ = await communicator.connect()
+        assert connected
+        snapshot = await communicator.receive_json_from()
+        order = await database_sync_to_async(place_and_accept)()
+        delta = await communicator.receive_json_from(timeout=1)
+        quiet = await communicator.receive_nothing(timeout=0.1)
+        await communicator.disconnect()
+        return snapshot, delta, quiet, order
+
+    snapshot, delta, quiet, order = async_to_sync(scenario)()
+
+    assert snapshot["type"] == "snapshot"
+    assert [item["id"] for item in snapshot["orders"]] == [str(pending.id)]
+    # Three changes in a burst arrive as one frame with one entry per order.
+    assert delta["type"] == "delta"
+    changes = {item["id"]: item for item in delta["orders"]}
+    assert changes[str(order.id)]["status"] == "accepted"
+    assert changes[str(order.id)]["customer"] == "Omid"
+    assert changes[str(pending.id)] == {
+        "id": str(pending.id),
+        "status": "rejected",
+        "updated_at": changes[str(pending.id)]["updated_at"],
+    }
+    assert quiet
+
+
+@pytest.mark.django_db(transaction=True)
+def test_order_stream_rejects_users_without_vendor():
+    async def scenario():
+        connected, code = await _open_stream(AnonymousUser()).connect()
+        return connected, code
+
+    assert async_to_sync(scenario)() == (False, 4403)
+
+
+@pytest.mark.django_db
+def test_order_totals_follow_item_changes_and_can_be_repaired():
+    user = User.objects.create_user(
+        first_name="john", last_name="doe", email="john@example.com", password="x"
+    )
+    vendor = Vendor.objects.create(user=user, name="Shop")
+    category = Category.objects.create(vendor=vendor, owner=user, name="Dishes")
+    order = Order.objects.create(vendor=vendor, customer="Ali")
+
+    tea = OrderItem.objects.create(
+        order=order, category=category, quantity=3, price=Decimal("0.10")
+    )
+    OrderItem.objects.create(
+        order=order, category=category, quantity=1, price=Decimal("12.35")
+    )
+    order.refresh_from_db()
+    assert (order.subtotal, order.item_count) == (Decimal("12.65"), 4)
+
+    tea.quantity = 1
+    tea.save()
+    order.refresh_from_db()
+    assert order.total_price() == Decimal("12.45")
+
+    tea.delete()
+    order.refresh_from_db()
+    assert (order.subtotal, order.item_count) == (Decimal("12.35"), 1)
+
+    # Saving an order loaded before its items changed keeps the totals.
+    stale = Order.objects.get(pk=order.pk)
+    OrderItem.objects.create(
+        order=order, category=category, quantity=1, price=Decimal("1.00")
+    )
+    stale.notes = "No onions"
+    stale.save()
+    order.refresh_from_db()
+    assert (order.subtotal, order.item_count, order.notes) == (
+        Decimal("13.35"),
+        2,
+        "No onions",
+    )
+    order.items.filter(price=Decimal("1.00")).delete()
+
+    OrderItem.objects.bulk_create(
+        [OrderItem(order=order, category=category, quantity=2, price=Decimal("1.50"))]
+    )
+    Order.objects.filter(pk=order.pk).update(subtotal=0, item_count=0)
+    call_command("recalculate_order_totals")
+    order.refresh_from_db()
+    assert (order.subtotal, order.item_count) == (Decimal("15.35"), 3)
+
+
+@pytest.mark.django_db
+def test_item_writes_roll_back_when_the_totals_cannot_be_updated(monkeypatch):
+    user = User.objects.create_user(
+        first_name="john", last_name="doe", email="john@example.com", password="x"
+    )
+    vendor = Vendor.objects.create(user=user, name="Shop")
+    category = Category.objects.create(vendor=vendor, owner=user, name="Dishes")
+    order = Order.objects.create(vendor=vendor, customer="Ali")
+    item = OrderItem.objects.create(order=order, category=category, price=1)
+
+    def fail(order_ids):
+        raise DatabaseError("totals")
+
+    monkeypatch.setattr(signals, "update_order_totals", fail)
+    with pytest.raises(DatabaseError):
+        OrderItem.objects.create(order=order, category=category, price=2)
+    with pytest.raises(DatabaseError):
+        item.delete()
+    assert list(order.items.values_list("price", flat=True)) == [Decimal("1.00")]
+
+
+@pytest.fixture
+def owner():
+    user = User.objects.create_user(
+        first_name="john", last_name="doe", email="john@example.com", password="x"
+    )
+    Vendor.objects.create(user=user, name="Shop")
+    return user
+
+
+@pytest.mark.django_db
+def test_order_transitions_are_conditional(owner):
+    order = Order.objects.create(vendor=owner.vendor, customer="Ali")
+    client = APIClient()
+    client.force_authenticate(owner)
+    url = f"/api/v1/restaurant/orders/{order.id}/transition/"
+
+    response = client.post(url, {"status": "delivered"})
+    assert response.status_code == 409
+
+    accept = {"status": "accepted", "expected": "pending"}
+    assert client.post(url, accept).status_code == 200
+    # A second waiter acting on the same stale view loses.
+    response = client.post(url, accept)
+    assert response.status_code == 409
+    assert response.json()["order"]["status"] == "accepted"
+
+    assert client.post(url, {"status": "delivered"}).json()["status"] == "delivered"
+
+    order.refresh_from_db()
+    order.status = Order.OrderStatus.PENDING
+    with pytest.raises(ValidationError):
+        order.full_clean()
+    with pytest.raises(ValidationError):
+        order.save()
+    assert Order.objects.get(pk=order.pk).status == Order.OrderStatus.DELIVERED
+
+
+@pytest.mark.django_db
+def test_saved_status_changes_are_conditional(owner):
+    order = Order.objects.create(vendor=owner.vendor, customer="Ali")
+    stale = Order.objects.get(pk=order.pk)
+
+    order.status = Order.OrderStatus.ACCEPTED
+    order.notes = "No onions"
+    order.save()
+    # Saved from the pending state it last saw, which it is no longer in.
+    stale.status = Order.OrderStatus.CANCELLED
+    with pytest.raises(ValidationError):
+        stale.save()
+    # A full save of another stale copy does not put the old status back.
+    stale = Order.objects.get(pk=order.pk)
+    Order.objects.filter(pk=order.pk).update(status=Order.OrderStatus.DELIVERED)
+    stale.save()
+
+    order.refresh_from_db()
+    assert (order.status, order.notes) == (Order.OrderStatus.DELIVERED, "No onions")
+
+
+@pytest.mark.django_db
+def test_kitchen_displays_claim_distinct_batches_oldest_first(owner):
+    orders = [
+        Order.objects.create(
+            vendor=owner.vendor, customer=f"T{i}", status=Order.OrderStatus.ACCEPTED
+        )
+        for i in range(5)
+    ]
+    Order.objects.create(vendor=owner.vendor, customer="Waiting")
+    client = APIClient()
+    client.force_authenticate(owner)
+    url = "/api/v1/restaurant/orders/claim/"
+
+    first = client.post(url, {"claimed_by": "grill", "limit": 3}).json()
+    second = client.post(url, {"claimed_by": "fryer", "limit": 3}).json()
+
+    assert [item["id"] for item in first] == [str(o.id) for o in orders[:3]]
+    assert [item["id"] for item in second] == [str(o.id) for o in orders[3:]]
+    assert {item["claimed_by"] for item in second} == {"fryer"}
+    assert client.post(url, {"claimed_by": "grill"}).json() == []
+
+
+@pytest.mark.django_db(transaction=True)
+def test_bulk_staff_onboarding_resolves_roles_from_the_registry(
+    owner, django_assert_max_num_queries
+):
+    from .models import RestaurantRole, StaffManagement, restaurant_roles
+
+    RestaurantRole.objects.create(key="chef", label="Chef")
+    RestaurantRole.objects.create(key="waiter", label="Waiter")
+    existing = User.objects.create_user(
+        first_name="sara", last_name="k", email="sara@example.com", password="x"
+    )
+    staff = [
+        {
+            "email": f"cook{i}@example.com" if i else existing.email,
+            "first_name": "Cook",
+            "last_name": str(i),
+            "role": "chef" if i % 2 else "waiter",
+            "salary": "250.00",
+            "start_day": "2024-01-01",
+        }
+        for i in range(300)
+    ]
+    client = APIClient()
+    client.force_authenticate(owner)
+    restaurant_roles.all()
+
+    with django_assert_max_num_queries(20):
+        response = client.post(
+            "/api/v1/restaurant/staff/bulk/", {"staff": staff}, format="json"
+        )
+
+    assert response.status_code == 201
+    assert len(response.json()) == 300
+    assert StaffManagement.objects.filter(role__key="chef").count() == 150
+    assert StaffManagement.objects.get(user=existing).role.key == "waiter"
+    assert User.objects.get(email="cook7@example.com").profile is not None
+
+    response = client.post(
+        "/api/v1/restaurant/staff/bulk/",
+        {"staff": [dict(staff[1], role="sommelier")]},
+        format="json",
+    )
+    assert response.status_code == 400
+    response = client.post(
+        "/api/v1/restaurant/staff/bulk/", {"staff": staff[:1]}, format="json"
+    )
+    assert response.json() == {"staff": ["sara@example.com is already a staff member."]}
+
+
+@pytest.mark.django_db(transaction=True)
+def test_role_registry_reloads_after_role_changes(django_assert_num_queries):
+    from apps.role.models import Role, roles
+
+    role = Role.get_default_role()
+    assert Role.get_default_role() == role
+    with django_assert_num_queries(0):
+        assert Role.get_default_role() == role
+        assert roles.get("user").label == role.label
+
+    Role.objects.filter(pk=role.pk).update(label="Member")
+    assert roles.get("user").label == role.label
+    role.label = "Member"
+    role.save()
+    assert Role.get_choices() == [("user", "Member")]
+
+    # Unknown keys reload the table at most once per interval.
+    roles.get("user")
+    with django_assert_num_queries(0):
+        for _ in range(3):
+            with pytest.raises(Role.DoesNotExist):
+                roles.get("ghost")
+    roles._loaded_at -= roles.miss_reload_interval
+    with django_assert_num_queries(1):
+        with pytest.raises(Role.DoesNotExist):
+            roles.get("ghost")
+
+
+@pytest.mark.django_db(transaction=True)
+def test_role_registries_of_other_processes_reload_after_changes():
+    from apps.role.models import Role, roles
+    from apps.role.registry import RoleRegistry
+
+    # Not connected to signals, as in a process that did not save the role.
+    other = RoleRegistry("role.Role")
+    role = Role.get_default_role()
+    assert other.get("user").label == role.label
+
+    role.label = "Member"
+    role.save()
+    Role.objects.create(key="ghost", label="Ghost")
+    assert other.get("user").label == "Member"
+    assert other.get("ghost").label == "Ghost"
+    assert roles.get("ghost").label == "Ghost"
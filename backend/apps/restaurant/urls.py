@@ -6,6 +6,7 @@ from . import views
 router = DefaultRouter()
 
 router.register("staff", views.StaffManagementViewSet, basename="staffmanagement")
+router.register("orders", views.OrderViewSet, basename="order")
 urlpatterns = [
     path("", include(router.urls)),
 ]
@@ -0,0 +1,287 @@
+import asyncio
+from datetime import timedelta
+
+from apps.vendor.sharding import vendor_db
+from apps.vendor.tenancy import tenant
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.db import connections, transaction
+from django.db.models import DecimalField, F, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.dispatch import Signal
+from django.utils import timezone
+
+from .models import Order, OrderItem, StaffManagement
+
+User = get_user_model()
+
+# Orders a kitchen or waiter screen still has to act on.
+ACTIVE_ORDER_STATUSES = [Order.OrderStatus.PENDING, Order.OrderStatus.ACCEPTED]
+ORDER_FIELDS = ["id", "customer", "status", "notes", "created_at", "updated_at"]
+
+# Sent with ``sender=Order``, ``order`` and ``previous`` by transition_order(),
+# inside the transaction that changed the status and the tenant of the order,
+# so receivers write to the vendor's database; receivers raising roll the
+# change back. Plain saves of the status field do not send it.
+order_status_changed = Signal()
+
+
+def order_group_name(vendor_id):
+    return f"orders.vendor.{vendor_id}"
+
+
+def user_vendor_id(user):
+    """Return the vendor ``user`` owns or works for, if any."""
+    if user is None or not user.is_authenticated:
+        return None
+    claims = getattr(user, "token_claims", None)
+    if claims is not None:
+        return claims["vendor_id"]
+    vendor = getattr(user, "vendor", None)
+    if vendor is not None:
+        return vendor.id
+    return (
+        StaffManagement.all_vendors.filter(user=user)
+        .values_list("vendor_id", flat=True)
+        .first()
+    )
+
+
+def _serialize(row):
+    return {
+        key: (
+            str(value)
+            if key == "id"
+            else value.isoformat() if hasattr(value, "isoformat") else value
+        )
+        for key, value in row.items()
+    }
+
+
+def order_delta(order, full=False):
+    """
+    The part of ``order`` a screen needs to apply a change.
+
+    New orders are sent whole; later changes only carry the status and the
+    timestamp clients use to discard stale updates.
+    """
+    fields = ORDER_FIELDS if full else ["id", "status", "updated_at"]
+    return _serialize({field: getattr(order, field) for field in fields})
+
+
+def order_snapshot(vendor_id):
+    rows = (
+        Order.objects.for_vendor(vendor_id)
+        .filter(status__in=ACTIVE_ORDER_STATUSES)
+        .order_by("created_at")
+        .values(*ORDER_FIELDS)
+    )
+    return [_serialize(row) for row in rows]
+
+
+class OrderEventBatcher:
+    """
+    Merge order changes per vendor and fan them out once per batch window.
+
+    Buffering happens on the event loop that serves the sockets of this
+    process, which consumers register on connect. A burst of changes then
+    costs one group message, and one frame per screen, instead of one per
+    change. Processes without connected screens send straight to the layer.
+    """
+
+    def __init__(self):
+        self.loop = None
+        self.pending = {}
+
+    def attach(self, loop):
+        self.loop = loop
+
+    def publish(self, vendor_id, deltas):
+        loop = self.loop
+        if loop is None or loop.is_closed() or not loop.is_running():
+            async_to_sync(self.send)(vendor_id, deltas)
+            return
+        loop.call_soon_threadsafe(self.add, vendor_id, deltas)
+
+    def add(self, vendor_id, deltas):
+        batch = self.pending.get(vendor_id)
+        if batch is None:
+            batch = self.pending[vendor_id] = {}
+            self.loop.call_later(
+                settings.ORDER_STREAM_BATCH_WINDOW,
+                lambda: asyncio.ensure_future(self.flush(vendor_id)),
+            )
+        for delta in deltas:
+            batch.setdefault(delta["id"], {}).update(delta)
+
+    async def flush(self, vendor_id):
+        batch = self.pending.pop(vendor_id, {})
+        await self.send(vendor_id, list(batch.values()))
+
+    async def send(self, vendor_id, deltas):
+        channel_layer = get_channel_layer()
+        if channel_layer is not None and deltas:
+            await channel_layer.group_send(
+                order_group_name(vendor_id),
+                {"type": "order.deltas", "orders": list(deltas)},
+            )
+
+
+order_events = OrderEventBatcher()
+
+
+def publish_order_deltas(vendor_id, deltas):
+    """Send order changes to every screen of a vendor once the transaction commits."""
+    deltas = list(deltas)
+    if deltas:
+        transaction.on_commit(
+            lambda: order_events.publish(vendor_id, deltas), using=vendor_db(vendor_id)
+        )
+
+
+def update_order_totals(order_ids):
+    """Recompute ``subtotal`` and ``item_count`` of orders from their items."""
+    items = OrderItem.objects.filter(order=OuterRef("pk")).order_by().values("order")
+    money = DecimalField(max_digits=12, decimal_places=2)
+    subtotal = items.annotate(
+        total=Sum(F("price") * F("quantity"), output_field=money)
+    ).values("total")
+    count = items.annotate(count=Sum("quantity")).values("count")
+    return Order.objects.filter(pk__in=order_ids).update(
+        subtotal=Coalesce(Subquery(subtotal), Value(0), output_field=money),
+        item_count=Coalesce(Subquery(count), Value(0)),
+        updated_at=timezone.now(),
+    )
+
+
+def transition_order(order, status, expected=None):
+    """
+    Move ``order`` to ``status`` if its state in the database allows it.
+
+    The check and the write are one conditional UPDATE, so when two waiters
+    accept the same order only one of them wins. ``expected`` narrows the
+    allowed source state to the one the caller last saw. Returns ``False``
+    when the order was no longer in an allowed state.
+    """
+    sources = Order.sources_of(status)
+    if expected is not None:
+        sources = [source for source in sources if source == expected]
+    now = timezone.now()
+    with tenant(order.vendor_id), transaction.atomic(using=vendor_db(order.vendor_id)):
+        updated = (
+            Order.objects.for_vendor(order.vendor_id)
+            .filter(pk=order.pk, status__in=sources)
+            .update(status=status, updated_at=now)
+        )
+        if not updated:
+            return False
+        previous = (order.status, order.updated_at)
+        order.status, order.updated_at = status, now
+        order._previous_status = status
+        try:
+            order_status_changed.send(sender=Order, order=order, previous=previous[0])
+        except Exception:
+            # Rolled back: the instance keeps the state that is stored.
+            order.status, order.updated_at = previous
+            order._previous_status = order.status
+            raise
+    publish_order_deltas(order.vendor_id, [order_delta(order)])
+    return True
+
+
+def kitchen_queue(vendor_id):
+    """Accepted orders of a vendor nobody is working on, oldest first."""
+    stale = timezone.now() - timedelta(seconds=settings.KITCHEN_CLAIM_TIMEOUT)
+    return (
+        Order.objects.for_vendor(vendor_id)
+        .filter(status=Order.OrderStatus.ACCEPTED)
+        .filter(Q(claimed_at__isnull=True) | Q(claimed_at__lt=stale))
+        .order_by("created_at")
+    )
+
+
+def claim_orders(vendor_id, limit, claimed_by):
+    """
+    Claim up to ``limit`` queued orders for the display ``claimed_by``.
+
+    Where the database supports it, rows other displays are claiming are
+    skipped rather than waited for (``SKIP LOCKED``). Elsewhere the claim is a
+    conditional UPDATE on the still-unclaimed candidates, so concurrent
+    displays may get fewer orders but never the same one.
+    """
+    queue = kitchen_queue(vendor_id)
+    now = timezone.now()
+    using = vendor_db(vendor_id)
+    with transaction.atomic(using=using):
+        if connections[using].features.has_select_for_update_skip_locked:
+            queue = queue.select_for_update(skip_locked=True)
+        ids = list(queue.values_list("pk", flat=True)[:limit])
+        kitchen_queue(vendor_id).filter(pk__in=ids).update(
+            claimed_by=claimed_by, claimed_at=now
+        )
+    return list(
+        Order.objects.for_vendor(vendor_id)
+        .filter(pk__in=ids, claimed_by=claimed_by, claimed_at=now)
+        .order_by("created_at")
+    )
+
+
+@transaction.atomic
+def onboard_staff(vendor, rows):
+    """
+    Add many staff members to ``vendor`` with a fixed number of queries.
+
+    Rows are validated ``StaffOnboardingRowSerializer`` data whose roles are
+    already resolved from the role registry. Users are matched by email;
+    missing ones are created with an unusable password, the default role and
+    a profile, all through ``bulk_create``.
+    """
+    from apps.profiles.models import Profile
+    from apps.role.models import Role
+
+    rows = [dict(row, email=User.objects.normalize_email(row["email"])) for row in rows]
+    users = {
+        user.email: user
+        for user in User.objects.filter(email__in=[row["email"] for row in rows])
+    }
+    # A user works for one vendor at most, whichever vendor is active.
+    taken = sorted(
+        StaffManagement.all_vendors.filter(user__in=users.values()).values_list(
+            "user__email", flat=True
+        )
+    )
+    if taken:
+        raise ValidationError(
+            {"staff": [f"{email} is already a staff member." for email in taken]}
+        )
+
+    default_role = Role.get_default_role()
+    new_users = []
+    for row in rows:
+        if row["email"] not in users:
+            user = User(
+                email=row["email"],
+                first_name=row["first_name"],
+                last_name=row["last_name"],
+                role=default_role,
+            )
+            user.set_unusable_password()
+            new_users.append(user)
+            users[user.email] = user
+    User.objects.bulk_create(new_users)
+    Profile.objects.bulk_create(Profile(user=user) for user in new_users)
+
+    staff_fields = ["salary", "start_day", "end_day", "status"]
+    return StaffManagement.objects.bulk_create(
+        StaffManagement(
+            user=users[row["email"]],
+            vendor=vendor,
+            role=row["role"],
+            attribute=row.get("attribute") or {},
+            **{field: row[field] for field in staff_fields if field in row},
+        )
+        for row in rows
+    )
@@ -1,26 +1,102 @@
+from apps.vendor.mixins import VendorScopedViewMixin
+from apps.vendor.tenancy import current_vendor_id
+from django.core.exceptions import ValidationError
 from django.shortcuts import get_object_or_404, render
 
 # Create your views here.
-from rest_framework import generics, viewsets
+from rest_framework import generics, status, viewsets
+from rest_framework.decorators import action
 from rest_framework.parsers import FormParser, MultiPartParser
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
 
-from .models import StaffManagement
-from .serializers import StaffManagementSerializer
+from .models import Order, StaffManagement
+from .pagination import RestaurantPagination
+from .serializers import (
+    OrderClaimSerializer,
+    OrderSerializer,
+    OrderTransitionSerializer,
+    StaffManagementSerializer,
+    StaffOnboardingSerializer,
+)
+from .utils import claim_orders, onboard_staff, transition_order
 
 
-class StaffManagementViewSet(viewsets.ModelViewSet):
-    serializer_class = StaffManagementSerializer
+class OrderViewSet(VendorScopedViewMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = Order.objects.order_by("-created_at", "-id")
+    serializer_class = OrderSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = RestaurantPagination
 
     def get_queryset(self):
-        user = self.request.user
-        if hasattr(user, "vendor") and user.vendor:
-            return StaffManagement.objects.filter(vendor=user.vendor)
-        return StaffManagement.objects.none()
+        queryset = super().get_queryset()
+        order_status = self.request.query_params.get("status")
+        if order_status:
+            queryset = queryset.filter(status=order_status)
+        return queryset
+
+    @action(detail=True, methods=["post"])
+    def transition(self, request, pk=None):
+        order = self.get_object()
+        serializer = OrderTransitionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            moved = transition_order(order, **serializer.validated_data)
+        except ValidationError as exc:
+            return Response(
+                {"detail": exc.messages}, status=status.HTTP_400_BAD_REQUEST
+            )
+        if not moved:
+            order.refresh_from_db()
+            return Response(
+                {
+                    "detail": "The order can no longer move to this status.",
+                    "order": OrderSerializer(order).data,
+                },
+                status=status.HTTP_409_CONFLICT,
+            )
+        return Response(OrderSerializer(order).data, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=["post"])
+    def claim(self, request):
+        """Hand the oldest unclaimed accepted orders to a kitchen display."""
+        serializer = OrderClaimSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        orders = claim_orders(current_vendor_id(), **serializer.validated_data)
+        return Response(
+            OrderSerializer(orders, many=True).data, status=status.HTTP_200_OK
+        )
+
+
+class StaffManagementViewSet(VendorScopedViewMixin, viewsets.ModelViewSet):
+    queryset = StaffManagement.objects.order_by("id")
+    serializer_class = StaffManagementSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = RestaurantPagination
+    owners_only = True
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
     def perform_update(self, serializer):
         serializer.save(user=self.request.user)
+
+    @action(detail=False, methods=["post"])
+    def bulk(self, request):
+        """Onboard many staff members at once, creating missing user accounts."""
+        vendor = getattr(request.user, "vendor", None)
+        if vendor is None:
+            return Response(
+                {"detail": "Only vendor owners can onboard staff."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+        serializer = StaffOnboardingSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            staff = onboard_staff(vendor, serializer.validated_data["staff"])
+        except ValidationError as exc:
+            return Response(exc.message_dict, status=status.HTTP_400_BAD_REQUEST)
+        return Response(
+            StaffManagementSerializer(staff, many=True).data,
+            status=status.HTTP_201_CREATED,
+        )
@@ -6,3 +6,8 @@ class RoleConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.role"
     verbose_name = _("Role")
+
+    def ready(self):
+        from apps.role.models import roles
+
+        roles.connect()
@@ -1,5 +1,7 @@
 from django.db import models
 
+from .registry import RoleRegistry
+
 
 class RoleType(models.TextChoices):
     MANAGER = "manager", "Manager"
@@ -21,22 +23,17 @@ class Role(models.Model):
     @classmethod
     def get_default_role(cls):
         # Ensure default 'user' role exists and return it
-        role, created = cls.objects.get_or_create(
-            key=RoleType.USER,
-            defaults={"label": RoleType.USER.label},
-        )
-        return role
+        return roles.get_or_create(RoleType.USER, RoleType.USER.label)
 
     @classmethod
     def get_default_admin_role(cls):
         # Ensure default 'manager' role exists and return it
-        role, created = cls.objects.get_or_create(
-            key=RoleType.ADMIN,
-            defaults={"label": RoleType.ADMIN.label},
-        )
-        return role
+        return roles.get_or_create(RoleType.ADMIN, RoleType.ADMIN.label)
 
     @classmethod
     def get_choices(cls):
         # Return all roles as (key, label) tuples
-        return list(cls.objects.values_list("key", "label"))
+        return roles.choices()
+
+
+roles = RoleRegistry("role.Role")
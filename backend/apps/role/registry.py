@@ -0,0 +1,159 @@
+import threading
+import time
+
+from django import forms
+from django.apps import apps
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models.signals import post_delete, post_migrate, post_save
+
+
+class RoleRegistry:
+    """
+    Process-wide cache of a role model, loaded with one query on first use.
+
+    Roles are small, rarely edited lookup tables, so every key is kept in
+    memory and the whole table is reloaded after any role is saved or deleted.
+    While such a change is uncommitted, roles read inside a transaction are not
+    cached, so a rollback can never leave rows behind that do not exist. A key
+    that is not cached triggers a reload, which covers roles created by
+    another process, but at most once every ``miss_reload_interval`` seconds
+    so that lookups of unknown keys do not each read the table. Returned
+    instances are shared; treat them as read-only.
+
+    Other processes learn about changes through a version number in the
+    cache, which every lookup reads and every committed change bumps; the
+    default cache has to be shared between processes for that.
+    """
+
+    miss_reload_interval = 5
+
+    def __init__(self, model_label):
+        self.model_label = model_label
+        self._roles = None
+        self._loaded_at = None
+        self._version = None
+        self._pending = False
+        self._lock = threading.Lock()
+
+    @property
+    def model(self):
+        return apps.get_model(self.model_label)
+
+    @property
+    def _version_key(self):
+        return f"role-registry-version:{self.model_label}"
+
+    def _current_version(self):
+        # Versions start from the clock so an evicted counter never comes back
+        # at a value an older load was made under.
+        version = cache.get(self._version_key)
+        if version is None:
+            cache.add(self._version_key, time.time_ns(), timeout=None)
+            version = cache.get(self._version_key)
+        return version
+
+    def _bump_version(self):
+        try:
+            cache.incr(self._version_key)
+        except ValueError:
+            cache.set(self._version_key, time.time_ns(), timeout=None)
+
+    def _cached(self):
+        roles, version = self._roles, self._version
+        if roles is not None and version == self._current_version():
+            return roles
+        return None
+
+    def _load(self):
+        # Read first, so a change committed during the query forces a reload.
+        version = self._current_version()
+        roles = list(self.model.objects.order_by("pk"))
+        loaded = (
+            {role.key: role for role in roles},
+            {role.pk: role for role in roles},
+        )
+        if self._pending and connection.in_atomic_block:
+            return loaded
+        with self._lock:
+            self._roles, self._version, self._pending = loaded, version, False
+            self._loaded_at = time.monotonic()
+        return loaded
+
+    def _lookup(self, index, value):
+        roles = self._cached() or self._load()
+        role = roles[index].get(value)
+        if role is None and self._may_reload():
+            role = self._load()[index].get(value)
+        if role is None:
+            raise self.model.DoesNotExist(
+                f"{self.model.__name__} {value!r} does not exist."
+            )
+        return role
+
+    def _may_reload(self):
+        loaded_at = self._loaded_at
+        return (
+            loaded_at is None
+            or time.monotonic() - loaded_at >= self.miss_reload_interval
+        )
+
+    def get(self, key):
+        return self._lookup(0, key)
+
+    def get_by_pk(self, pk):
+        return self._lookup(1, pk)
+
+    def get_or_create(self, key, label):
+        try:
+            return self.get(key)
+        except self.model.DoesNotExist:
+            role, _ = self.model.objects.get_or_create(
+                key=key, defaults={"label": label}
+            )
+            return role
+
+    def all(self):
+        return list((self._cached() or self._load())[1].values())
+
+    def choices(self):
+        return [(role.key, role.label) for role in self.all()]
+
+    def clear(self, **kwargs):
+        self._roles = None
+        if connection.in_atomic_block:
+            self._pending = True
+            transaction.on_commit(self._committed)
+        else:
+            self._bump_version()
+
+    def _committed(self):
+        self._roles, self._pending = None, False
+        self._bump_version()
+
+    def connect(self):
+        post_save.connect(self.clear, sender=self.model, weak=False)
+        post_delete.connect(self.clear, sender=self.model, weak=False)
+        # Test database flushes delete rows without model signals.
+        post_migrate.connect(self.clear, weak=False)
+
+
+class RoleChoiceField(forms.TypedChoiceField):
+    """Form field for a role foreign key whose options come from a registry."""
+
+    def __init__(self, registry, **kwargs):
+        self.registry = registry
+        super().__init__(
+            choices=self.role_choices,
+            coerce=lambda pk: registry.get_by_pk(int(pk)),
+            empty_value=None,
+            **kwargs,
+        )
+
+    def role_choices(self):
+        return [("", "---------")] + [
+            (role.pk, role.label) for role in self.registry.all()
+        ]
+
+    def prepare_value(self, value):
+        return getattr(value, "pk", value)
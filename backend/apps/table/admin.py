@@ -1,3 +1,18 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import Reservation, Table
+
+
+@admin.register(Table)
+class TableAdmin(admin.ModelAdmin):
+    list_display = ("name", "vendor", "seats", "is_active")
+    list_filter = ("vendor", "is_active")
+    search_fields = ("name",)
+
+
+@admin.register(Reservation)
+class ReservationAdmin(admin.ModelAdmin):
+    list_display = ("customer", "table", "party_size", "starts_at", "ends_at", "status")
+    list_filter = ("vendor", "status")
+    search_fields = ("customer", "phone_number")
+    date_hierarchy = "starts_at"
@@ -6,3 +6,6 @@ class TableConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.table"
     verbose_name = _("Table")
+
+    def ready(self):
+        from apps.table import signals
@@ -0,0 +1,147 @@
+import random
+import time
+from datetime import timedelta
+
+from apps.table.models import Reservation, Table
+from apps.table.utils import (
+    availability,
+    day_bounds,
+    find_conflict,
+    free_tables,
+    max_duration,
+    overlapping_reservations,
+)
+from apps.users.models import User
+from apps.vendor.models import Vendor
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare table availability lookups and conflict checks in SQL with "
+        "the in-memory interval index. Test data is deleted afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tables", type=int, default=500)
+        parser.add_argument("--reservations", type=int, default=20_000)
+        parser.add_argument("--lookups", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        rng = random.Random(42)
+        day = timezone.localdate() + timedelta(days=1)
+        vendor = self.seed(rng, day, options["tables"], options["reservations"])
+        try:
+            tables = list(Table.objects.filter(vendor=vendor))
+            start, _ = day_bounds(day)
+            lookups = [
+                (
+                    rng.randint(1, 8),
+                    start + timedelta(minutes=15 * rng.randrange(4 * 22)),
+                    rng.choice(tables),
+                )
+                for _ in range(options["lookups"])
+            ]
+
+            availability.clear()
+            started = time.perf_counter()
+            availability.get(vendor.id, day)
+            build = time.perf_counter() - started
+
+            sql_free, sql_free_time = self.run(
+                lookups, lambda p, s, t: len(self.sql_free_tables(vendor.id, p, s))
+            )
+            index_free, index_free_time = self.run(
+                lookups,
+                lambda p, s, t: len(
+                    free_tables(vendor.id, p, s, s + timedelta(minutes=90))
+                ),
+            )
+            sql_conflicts, sql_conflict_time = self.run(
+                lookups,
+                lambda p, s, t: overlapping_reservations(
+                    t.id, s, s + timedelta(minutes=90)
+                ).exists(),
+            )
+            index_conflicts, index_conflict_time = self.run(
+                lookups,
+                lambda p, s, t: find_conflict(t, s, s + timedelta(minutes=90))
+                is not None,
+            )
+            assert sql_free == index_free and sql_conflicts == index_conflicts
+        finally:
+            vendor.user.delete()
+            availability.clear()
+
+        count = options["lookups"]
+        self.stdout.write(
+            f"tables: {options['tables']}  reservations/day: "
+            f"{options['reservations']}  lookups: {count}"
+        )
+        self.stdout.write(f"index build (cold):      {build * 1000:9.2f} ms")
+        self.stdout.write(
+            f"free tables  SQL:   {sql_free_time / count * 1000:9.3f} ms/lookup   "
+            f"index: {index_free_time / count * 1000:9.3f} ms/lookup"
+        )
+        self.stdout.write(
+            f"conflict     SQL:   {sql_conflict_time / count * 1000:9.3f} ms/check    "
+            f"index: {index_conflict_time / count * 1000:9.3f} ms/check"
+        )
+
+    def run(self, lookups, check):
+        started = time.perf_counter()
+        results = [check(*lookup) for lookup in lookups]
+        return results, time.perf_counter() - started
+
+    def sql_free_tables(self, vendor_id, party_size, starts_at):
+        ends_at = starts_at + timedelta(minutes=90)
+        busy = Reservation.objects.filter(
+            vendor_id=vendor_id,
+            status__in=Reservation.BLOCKING_STATUSES,
+            starts_at__gte=starts_at - max_duration(),
+            starts_at__lt=ends_at,
+            ends_at__gt=starts_at,
+        ).values("table_id")
+        return list(
+            Table.objects.filter(
+                vendor_id=vendor_id, is_active=True, seats__gte=party_size
+            )
+            .exclude(pk__in=busy)
+            .order_by("seats", "name")
+            .values_list("id", flat=True)
+        )
+
+    def seed(self, rng, day, table_count, reservation_count):
+        user = User.objects.create_user(
+            first_name="bench",
+            last_name="tables",
+            email=f"bench-tables-{time.time_ns()}@example.com",
+            password=None,
+        )
+        vendor = Vendor.objects.create(user=user, name="Table benchmark")
+        tables = Table.objects.bulk_create(
+            Table(vendor=vendor, name=f"T{i:04d}", seats=rng.choice([2, 2, 4, 4, 6, 8]))
+            for i in range(table_count)
+        )
+        # Half-hour slots over the day; each table gets an equal share of the
+        # reservations, spread over distinct slots so none of them overlap.
+        start, _ = day_bounds(day)
+        per_table = min(reservation_count // table_count, 48)
+        reservations = []
+        for table in tables:
+            for slot in rng.sample(range(48), per_table):
+                starts_at = start + timedelta(minutes=30 * slot)
+                reservations.append(
+                    Reservation(
+                        vendor=vendor,
+                        table=table,
+                        customer="Guest",
+                        party_size=1,
+                        starts_at=starts_at,
+                        ends_at=starts_at + timedelta(minutes=30),
+                    )
+                )
+        Reservation.objects.bulk_create(reservations, batch_size=2000)
+        availability.invalidate(vendor.id)
+        return vendor
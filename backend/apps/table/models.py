@@ -1,8 +1,100 @@
+from apps.common.models import TimeStampedModel
+from apps.vendor.models import Vendor, VendorScopedModel
+from django.core.exceptions import ValidationError
 from django.db import models
+from django.utils.translation import gettext_lazy as _
 
 
-class Table(models.Model):
-    field_name = models.CharField(max_length=255)
+class Table(TimeStampedModel, VendorScopedModel):
+    vendor = models.ForeignKey(Vendor, on_delete=models.CASCADE, related_name="tables")
+    name = models.CharField(max_length=50)
+    seats = models.PositiveSmallIntegerField()
+    is_active = models.BooleanField(default=True)
 
     class Meta:
-        abstract = True
+        unique_together = ["vendor", "name"]
+        ordering = ["seats", "name"]
+
+    def __str__(self):
+        return f"{self.name} ({self.seats} seats)"
+
+
+class Reservation(TimeStampedModel, VendorScopedModel):
+    class ReservationStatus(models.TextChoices):
+        BOOKED = "booked", _("Booked")
+        SEATED = "seated", _("Seated")
+        COMPLETED = "completed", _("Completed")
+        CANCELLED = "cancelled", _("Cancelled")
+        NO_SHOW = "no_show", _("No show")
+
+    # Reservations in these states keep their table busy. Walk-in guests are
+    # stored as reservations that start out seated.
+    BLOCKING_STATUSES = [ReservationStatus.BOOKED, ReservationStatus.SEATED]
+
+    vendor = models.ForeignKey(
+        Vendor, on_delete=models.CASCADE, related_name="reservations"
+    )
+    table = models.ForeignKey(
+        Table, on_delete=models.CASCADE, related_name="reservations"
+    )
+    customer = models.CharField(max_length=300)
+    phone_number = models.CharField(max_length=30, blank=True)
+    party_size = models.PositiveSmallIntegerField()
+    starts_at = models.DateTimeField()
+    ends_at = models.DateTimeField()
+    status = models.CharField(
+        max_length=20,
+        choices=ReservationStatus.choices,
+        default=ReservationStatus.BOOKED,
+    )
+    notes = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ["starts_at"]
+        indexes = [
+            models.Index(
+                fields=["vendor", "starts_at"], name="reservation_vendor_starts"
+            ),
+            models.Index(
+                fields=["table", "starts_at"], name="reservation_table_starts"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.customer} at {self.table} from {self.starts_at:%Y-%m-%d %H:%M}"
+
+    @property
+    def is_blocking(self):
+        return self.status in self.BLOCKING_STATUSES
+
+    def clean(self):
+        from .utils import overlapping_reservations
+
+        super().clean()
+        if self.starts_at and self.ends_at and self.ends_at <= self.starts_at:
+            raise ValidationError(
+                {"ends_at": _("A reservation must end after it starts.")}
+            )
+        if self.table_id is None:
+            return
+        if self.vendor_id and self.table.vendor_id != self.vendor_id:
+            raise ValidationError({"table": _("The table belongs to another vendor.")})
+        if self.party_size and self.party_size > self.table.seats:
+            raise ValidationError(
+                {
+                    "party_size": _("The table only seats %(seats)s guests.")
+                    % {"seats": self.table.seats}
+                }
+            )
+        # Checked against the database: validation mostly runs in the
+        # transaction of a write, where the availability index of this
+        # process would be rebuilt for every call and never kept.
+        if (
+            self.is_blocking
+            and self.starts_at
+            and self.ends_at
+            and overlapping_reservations(self.table_id, self.starts_at, self.ends_at)
+            .exclude(pk=self.pk)
+            .exists()
+        ):
+            raise ValidationError(_("The table is already booked at that time."))
@@ -0,0 +1,54 @@
+from datetime import timedelta
+
+from django.conf import settings
+from rest_framework import serializers
+
+from .models import Reservation, Table
+
+
+class TableSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Table
+        fields = ("id", "name", "seats", "is_active", "created_at", "updated_at")
+        read_only_fields = ("created_at", "updated_at")
+
+
+class ReservationSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Reservation
+        fields = (
+            "id",
+            "table",
+            "customer",
+            "phone_number",
+            "party_size",
+            "starts_at",
+            "ends_at",
+            "status",
+            "notes",
+            "created_at",
+            "updated_at",
+        )
+        read_only_fields = ("created_at", "updated_at")
+
+    def validate_table(self, table):
+        vendor_id = self.context.get("vendor_id")
+        if vendor_id is not None and table.vendor_id != vendor_id:
+            raise serializers.ValidationError("Unknown table.")
+        return table
+
+
+class AvailabilityQuerySerializer(serializers.Serializer):
+    party_size = serializers.IntegerField(min_value=1)
+    at = serializers.DateTimeField()
+    minutes = serializers.IntegerField(
+        min_value=1,
+        max_value=settings.RESERVATION_MAX_MINUTES,
+        default=settings.RESERVATION_DEFAULT_MINUTES,
+    )
+    limit = serializers.IntegerField(min_value=1, max_value=100, required=False)
+
+    def validate(self, data):
+        data["ends_at"] = data["at"] + timedelta(minutes=data.pop("minutes"))
+        data["starts_at"] = data.pop("at")
+        return data
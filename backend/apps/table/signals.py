@@ -0,0 +1,33 @@
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from .models import Reservation, Table
+from .utils import availability
+
+
+@receiver(post_init, sender=Reservation)
+def remember_reservation_slot(sender, instance, **kwargs):
+    instance._previous_slot = (
+        instance.__dict__.get("starts_at"),
+        instance.__dict__.get("ends_at"),
+    )
+
+
+@receiver(post_save, sender=Reservation)
+def update_index_on_reservation_save(sender, instance, created, **kwargs):
+    previous = None
+    if not created and None not in instance._previous_slot:
+        previous = instance._previous_slot
+    availability.reservation_changed(instance, previous)
+    instance._previous_slot = (instance.starts_at, instance.ends_at)
+
+
+@receiver(post_delete, sender=Reservation)
+def update_index_on_reservation_delete(sender, instance, **kwargs):
+    availability.reservation_changed(instance, deleted=True)
+
+
+@receiver(post_save, sender=Table)
+@receiver(post_delete, sender=Table)
+def rebuild_index_on_table_change(sender, instance, **kwargs):
+    availability.invalidate(instance.vendor_id)
@@ -1,3 +1,116 @@
-from django.test import TestCase
+from datetime import datetime, timedelta, timezone
 
-# Create your tests here.
+import pytest
+from apps.vendor.tests import _vendor
+from django.core.exceptions import ValidationError
+from rest_framework.test import APIClient
+
+from . import utils
+from .models import Reservation, Table
+from .utils import availability, book_table, free_tables
+
+EVENING = datetime(2025, 3, 14, 19, 30, tzinfo=timezone.utc)
+
+
+def _tables(vendor, *seats):
+    return [
+        Table.objects.create(vendor=vendor, name=f"T{i}", seats=count)
+        for i, count in enumerate(seats, start=1)
+    ]
+
+
+def _book(table, starts_at, minutes=90, party_size=2, **fields):
+    return book_table(
+        Reservation(
+            vendor_id=table.vendor_id,
+            table=table,
+            customer="Guest",
+            party_size=party_size,
+            starts_at=starts_at,
+            ends_at=starts_at + timedelta(minutes=minutes),
+            **fields,
+        )
+    )
+
+
+@pytest.mark.django_db
+def test_reservations_block_overlapping_bookings_only():
+    vendor = _vendor()
+    two, four, four_b, six = _tables(vendor, 2, 4, 4, 6)
+    _book(four, EVENING - timedelta(hours=1))
+    _book(six, EVENING - timedelta(hours=3), minutes=180)
+    late = _book(two, EVENING.replace(hour=23), minutes=120)
+
+    assert free_tables(vendor.id, 4, EVENING, EVENING + timedelta(hours=2)) == [
+        four_b.id,
+        six.id,
+    ]
+    # Back-to-back bookings do not overlap; bookings crossing midnight
+    # keep the table busy on the next day as well.
+    assert free_tables(vendor.id, 2, EVENING - timedelta(hours=2), EVENING)[0] == two.id
+    assert two.id not in free_tables(
+        vendor.id, 1, EVENING.replace(day=15, hour=0), EVENING.replace(day=15, hour=1)
+    )
+
+    client = APIClient()
+    client.force_authenticate(vendor.user)
+    response = client.post(
+        "/api/v1/table/reservations/",
+        {
+            "table": str(four.id),
+            "customer": "Ali",
+            "party_size": 4,
+            "starts_at": EVENING.isoformat(),
+            "ends_at": (EVENING + timedelta(hours=1)).isoformat(),
+        },
+        format="json",
+    )
+    assert response.status_code == 400
+    response = client.get(
+        "/api/v1/table/tables/available/",
+        {"party_size": 2, "at": EVENING.replace(hour=23).isoformat(), "minutes": 60},
+    )
+    assert [table["name"] for table in response.json()] == ["T2", "T3", "T4"]
+
+    late.status = Reservation.ReservationStatus.CANCELLED
+    late.save()
+    assert two.id in free_tables(
+        vendor.id, 1, EVENING.replace(hour=23), EVENING.replace(hour=23, minute=30)
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_availability_index_is_updated_in_place(django_assert_num_queries):
+    vendor = _vendor()
+    tables = _tables(vendor, *range(2, 12))
+    for table in tables:
+        _book(table, EVENING - timedelta(hours=2))
+    availability.clear()
+    end = EVENING + timedelta(hours=1)
+
+    with django_assert_num_queries(2):
+        assert len(free_tables(vendor.id, 4, EVENING, end)) == 8
+    reservation = _book(tables[5], EVENING)
+    with django_assert_num_queries(0):
+        assert tables[5].id not in free_tables(vendor.id, 4, EVENING, end)
+    reservation.delete()
+    with django_assert_num_queries(0):
+        assert len(free_tables(vendor.id, 4, EVENING, end)) == 8
+
+    Table.objects.create(vendor=vendor, name="Bar", seats=4)
+    with django_assert_num_queries(2):
+        assert len(free_tables(vendor.id, 4, EVENING, end)) == 9
+
+
+@pytest.mark.django_db
+def test_bookings_are_checked_against_the_database_only(monkeypatch):
+    vendor = _vendor()
+    (table,) = _tables(vendor, 4)
+    # Validation runs in the booking transaction, where a day index would be
+    # rebuilt on every call; any use of it fails here.
+    monkeypatch.setattr(utils, "build_day_index", None)
+
+    _book(table, EVENING)
+    with pytest.raises(ValidationError, match="already booked"):
+        _book(table, EVENING + timedelta(minutes=30))
+    _book(table, EVENING + timedelta(minutes=90))
@@ -0,0 +1,12 @@
+from django.urls import include, path
+from rest_framework.routers import DefaultRouter
+
+from . import views
+
+router = DefaultRouter()
+
+router.register("tables", views.TableViewSet, basename="table")
+router.register("reservations", views.ReservationViewSet, basename="reservation")
+urlpatterns = [
+    path("", include(router.urls)),
+]
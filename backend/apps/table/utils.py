@@ -0,0 +1,298 @@
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict, defaultdict
+from datetime import datetime, timedelta
+
+from apps.vendor.sharding import tenant_atomic, vendor_db
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import connections, transaction
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+from .models import Reservation, Table
+
+
+def max_duration():
+    return timedelta(minutes=settings.RESERVATION_MAX_MINUTES)
+
+
+def local_days(starts_at, ends_at):
+    """Local dates touched by the half-open interval ``[starts_at, ends_at)``."""
+    tz = timezone.get_default_timezone()
+    first = timezone.localtime(starts_at, tz).date()
+    last = timezone.localtime(max(starts_at, ends_at - timedelta.resolution), tz)
+    return [first + timedelta(days=i) for i in range((last.date() - first).days + 1)]
+
+
+def day_bounds(day):
+    tz = timezone.get_default_timezone()
+    start = timezone.make_aware(datetime.combine(day, datetime.min.time()), tz)
+    end = timezone.make_aware(
+        datetime.combine(day + timedelta(days=1), datetime.min.time()), tz
+    )
+    return start, end
+
+
+def _version_key(vendor_id, day=None):
+    return f"table-index-version:{vendor_id}:{day.isoformat() if day else 'tables'}"
+
+
+def _index_versions(vendor_id, day):
+    # Like the menu snapshot versions: they start from the clock so an evicted
+    # counter never comes back at a value an older index was built under.
+    keys = [_version_key(vendor_id), _version_key(vendor_id, day)]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            initial = time.time_ns()
+            cache.add(key, initial, timeout=None)
+            versions[key] = cache.get(key, initial)
+    return tuple(versions[key] for key in keys)
+
+
+def _bump(key):
+    try:
+        return cache.incr(key)
+    except ValueError:
+        version = time.time_ns()
+        cache.set(key, version, timeout=None)
+        return version
+
+
+class TableSlots:
+    """Busy intervals of one table, sorted by start and never overlapping."""
+
+    __slots__ = ("starts", "ends", "ids")
+
+    def __init__(self):
+        self.starts = []
+        self.ends = []
+        self.ids = []
+
+    def conflict(self, start, end, exclude=None):
+        # Only the intervals starting before ``end`` can overlap; since they do
+        # not overlap each other, walking back stops at the first one that
+        # ended by ``start``.
+        i = bisect_left(self.starts, end)
+        while i > 0 and self.ends[i - 1] > start:
+            i -= 1
+            if self.ids[i] != exclude:
+                return self.ids[i]
+        return None
+
+    def add(self, reservation_id, start, end):
+        i = bisect_right(self.starts, start)
+        self.starts.insert(i, start)
+        self.ends.insert(i, end)
+        self.ids.insert(i, reservation_id)
+
+    def remove(self, reservation_id, start):
+        i = bisect_left(self.starts, start)
+        while i < len(self.starts) and self.starts[i] == start:
+            if self.ids[i] == reservation_id:
+                del self.starts[i], self.ends[i], self.ids[i]
+                return
+            i += 1
+
+
+class DayIndex:
+    """Active tables and blocking reservations of a vendor on one local day."""
+
+    def __init__(self, day, versions, tables, reservations):
+        self.day = day
+        self.start, self.end = day_bounds(day)
+        self.versions = versions
+        # (seats, name, id), smallest tables first so the best fit comes first.
+        self.tables = sorted(tables)
+        self.seats = [seats for seats, _, _ in self.tables]
+        self.slots = defaultdict(TableSlots)
+        self.reservations = {}
+        for reservation_id, table_id, start, end in reservations:
+            self.add(reservation_id, table_id, start, end)
+
+    def add(self, reservation_id, table_id, start, end):
+        if start < self.end and end > self.start:
+            self.slots[table_id].add(reservation_id, start, end)
+            self.reservations[reservation_id] = (table_id, start)
+
+    def remove(self, reservation_id):
+        slot = self.reservations.pop(reservation_id, None)
+        if slot is not None:
+            self.slots[slot[0]].remove(reservation_id, slot[1])
+
+    def conflict(self, table_id, start, end, exclude=None):
+        slots = self.slots.get(table_id)
+        return slots.conflict(start, end, exclude) if slots else None
+
+    def candidates(self, party_size):
+        """Ids of the active tables seating ``party_size``, best fit first."""
+        return [
+            table[2] for table in self.tables[bisect_left(self.seats, party_size) :]
+        ]
+
+
+def build_day_index(vendor_id, day, versions=None):
+    start, end = day_bounds(day)
+    tables = (
+        Table.objects.for_vendor(vendor_id)
+        .filter(is_active=True)
+        .values_list("seats", "name", "id")
+    )
+    reservations = (
+        Reservation.objects.for_vendor(vendor_id)
+        .filter(
+            status__in=Reservation.BLOCKING_STATUSES,
+            starts_at__gte=start - max_duration(),
+            starts_at__lt=end,
+            ends_at__gt=start,
+        )
+        .values_list("id", "table_id", "starts_at", "ends_at")
+    )
+    return DayIndex(day, versions, list(tables), reservations.iterator())
+
+
+class AvailabilityIndex:
+    """
+    Per-process interval index of table bookings, one ``DayIndex`` per vendor
+    and local day.
+
+    A day is built lazily with two queries and kept in a bounded LRU. Every
+    committed reservation change bumps a version per day in the cache and is
+    applied in place when this process holds the previous version; any other
+    mismatch (a write in another process, table changes, evictions) rebuilds
+    the day on next use. Use a shared cache backend with several processes.
+    Days built inside a transaction are not kept, as they may contain
+    uncommitted rows.
+    """
+
+    def __init__(self):
+        self._days = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, vendor_id, day):
+        key = (vendor_id, day)
+        versions = _index_versions(vendor_id, day)
+        with self._lock:
+            index = self._days.get(key)
+            if index is not None and index.versions == versions:
+                self._days.move_to_end(key)
+                return index
+        index = build_day_index(vendor_id, day, versions)
+        if not connections[vendor_db(vendor_id)].in_atomic_block:
+            with self._lock:
+                self._days[key] = index
+                self._days.move_to_end(key)
+                while len(self._days) > settings.TABLE_INDEX_MAX_DAYS:
+                    self._days.popitem(last=False)
+        return index
+
+    def reservation_changed(self, reservation, previous=None, deleted=False):
+        days = set(local_days(reservation.starts_at, reservation.ends_at))
+        if previous is not None:
+            days.update(local_days(*previous))
+        slot = None
+        if not deleted and reservation.is_blocking:
+            slot = (reservation.table_id, reservation.starts_at, reservation.ends_at)
+        # Deleted instances lose their pk before commit, so bind it now.
+        vendor_id, reservation_id = reservation.vendor_id, reservation.pk
+        transaction.on_commit(
+            lambda: self._apply(vendor_id, reservation_id, slot, days),
+            using=vendor_db(vendor_id),
+        )
+
+    def _apply(self, vendor_id, reservation_id, slot, days):
+        for day in days:
+            version = _bump(_version_key(vendor_id, day))
+            with self._lock:
+                index = self._days.get((vendor_id, day))
+                if index is None:
+                    continue
+                if index.versions[1] != version - 1:
+                    del self._days[(vendor_id, day)]
+                    continue
+                index.remove(reservation_id)
+                if slot is not None:
+                    index.add(reservation_id, *slot)
+                index.versions = (index.versions[0], version)
+
+    def invalidate(self, vendor_id):
+        """Rebuild every day of a vendor, e.g. after tables or bulk imports change."""
+        transaction.on_commit(
+            lambda: _bump(_version_key(vendor_id)), using=vendor_db(vendor_id)
+        )
+
+    def clear(self):
+        with self._lock:
+            self._days.clear()
+
+
+availability = AvailabilityIndex()
+
+
+def free_tables(vendor_id, party_size, starts_at, ends_at, limit=None):
+    """
+    Ids of the tables free for ``party_size`` guests over ``[starts_at, ends_at)``.
+
+    Tables are tried smallest first and each check is a binary search over the
+    bookings of that table, so a lookup costs O(t log n) for t candidate tables.
+    """
+    indexes = [
+        availability.get(vendor_id, day) for day in local_days(starts_at, ends_at)
+    ]
+    free = []
+    for table_id in indexes[0].candidates(party_size):
+        if all(
+            index.conflict(table_id, starts_at, ends_at) is None for index in indexes
+        ):
+            free.append(table_id)
+            if limit and len(free) >= limit:
+                break
+    return free
+
+
+def find_conflict(table, starts_at, ends_at, exclude=None):
+    """Id of a blocking reservation of ``table`` overlapping the interval, if any."""
+    for day in local_days(starts_at, ends_at):
+        conflict = availability.get(table.vendor_id, day).conflict(
+            table.pk, starts_at, ends_at, exclude
+        )
+        if conflict is not None:
+            return conflict
+    return None
+
+
+def overlapping_reservations(table_id, starts_at, ends_at):
+    # The lower bound on starts_at keeps this a short range scan of the
+    # (table, starts_at) index instead of every past booking of the table.
+    return Reservation.objects.filter(
+        table_id=table_id,
+        status__in=Reservation.BLOCKING_STATUSES,
+        starts_at__gte=starts_at - max_duration(),
+        starts_at__lt=ends_at,
+        ends_at__gt=starts_at,
+    )
+
+
+@tenant_atomic
+def book_table(reservation):
+    """
+    Validate and save ``reservation``.
+
+    The table row is locked first so concurrent bookings of one table are
+    serialized. ``full_clean()`` then checks the overlap against the database
+    rather than the in-memory index, which may lag writes made elsewhere.
+    """
+    Table.objects.select_for_update().filter(pk=reservation.table_id).first()
+    if reservation.ends_at - reservation.starts_at > max_duration():
+        raise ValidationError(
+            {
+                "ends_at": _("Reservations last at most %(minutes)s minutes.")
+                % {"minutes": settings.RESERVATION_MAX_MINUTES}
+            }
+        )
+    reservation.full_clean()
+    reservation.save()
+    return reservation
@@ -1,3 +1,76 @@
-from django.shortcuts import render
+from apps.vendor.mixins import VendorScopedViewMixin
+from apps.vendor.tenancy import current_vendor_id
+from django.core.exceptions import ValidationError
+from django.utils.dateparse import parse_date
+from rest_framework import serializers, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
 
-# Create your views here.
+from .models import Reservation, Table
+from .serializers import (
+    AvailabilityQuerySerializer,
+    ReservationSerializer,
+    TableSerializer,
+)
+from .utils import book_table, free_tables
+
+
+class TableViewSet(VendorScopedViewMixin, viewsets.ModelViewSet):
+    queryset = Table.objects.all()
+    serializer_class = TableSerializer
+    permission_classes = [IsAuthenticated]
+
+    @action(detail=False, methods=["get"])
+    def available(self, request):
+        """Tables free for a party at a time, the best fitting table first."""
+        serializer = AvailabilityQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        vendor_id = current_vendor_id()
+        if vendor_id is None:
+            return Response(
+                {"detail": "No vendor found for this user."},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        ids = free_tables(vendor_id, **serializer.validated_data)
+        tables = Table.objects.in_bulk(ids)
+        return Response(
+            TableSerializer([tables[pk] for pk in ids], many=True).data,
+            status=status.HTTP_200_OK,
+        )
+
+
+class ReservationViewSet(VendorScopedViewMixin, viewsets.ModelViewSet):
+    queryset = Reservation.objects.select_related("table")
+    serializer_class = ReservationSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        day = parse_date(self.request.query_params.get("date") or "")
+        if day:
+            queryset = queryset.filter(starts_at__date=day)
+        return queryset
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["vendor_id"] = current_vendor_id()
+        return context
+
+    def perform_create(self, serializer):
+        reservation = Reservation(
+            vendor_id=current_vendor_id(), **serializer.validated_data
+        )
+        serializer.instance = self._book(reservation)
+
+    def perform_update(self, serializer):
+        for field, value in serializer.validated_data.items():
+            setattr(serializer.instance, field, value)
+        self._book(serializer.instance)
+
+    def _book(self, reservation):
+        try:
+            return book_table(reservation)
+        except ValidationError as exc:
+            detail = exc.message_dict if hasattr(exc, "error_dict") else exc.messages
+            raise serializers.ValidationError(detail)
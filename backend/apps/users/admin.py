@@ -1,3 +1,5 @@
+from apps.role.models import roles
+from apps.role.registry import RoleChoiceField
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.utils.translation import gettext_lazy as _
@@ -69,5 +71,10 @@ class UserAdmin(BaseUserAdmin):
 
     search_fields = ["email", "first_name", "last_name"]
 
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if db_field.name == "role":
+            return RoleChoiceField(roles, required=False, label=db_field.verbose_name)
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
 
 admin.site.register(User, UserAdmin)
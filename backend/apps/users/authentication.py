@@ -0,0 +1,186 @@
+import secrets
+
+from apps.role.models import Role, roles
+from apps.vendor.models import Vendor
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+
+User = get_user_model()
+
+# User fields copied into tokens; everything else on a claims user is loaded
+# from the database on first access.
+USER_CLAIM_FIELDS = ["pkid", "email", "business_type", "is_staff", "is_superuser"]
+
+
+def user_claims(user):
+    """Vendor, role and account claims that tokens of ``user`` carry."""
+    from apps.restaurant.models import StaffManagement
+
+    owned = Vendor.objects.filter(user=user).values_list("id", flat=True).first()
+    vendor_id = owned
+    if vendor_id is None:
+        vendor_id = (
+            StaffManagement.all_vendors.filter(user=user)
+            .values_list("vendor_id", flat=True)
+            .first()
+        )
+    role = roles.get_by_pk(user.role_id).key if user.role_id else None
+    claims = {field: getattr(user, field) for field in USER_CLAIM_FIELDS}
+    claims.update(vendor_id=vendor_id, owns_vendor=owned is not None, role=role)
+    claims["claims_version"] = claims_version(getattr(user, api_settings.USER_ID_FIELD))
+    return claims
+
+
+def add_claims(token, claims):
+    for name, value in claims.items():
+        token[name] = value
+    return token
+
+
+def _claims_cache_key(user_id):
+    return f"jwt-claims:{user_id}"
+
+
+def _active_cache_key(user_id):
+    return f"jwt-active:{user_id}"
+
+
+def _version_cache_key(user_id):
+    return f"jwt-claims-version:{user_id}"
+
+
+def claims_version(user_id):
+    """
+    The version of the claims of ``user_id`` that tokens may be trusted for.
+
+    A missing entry gets a new random version, so tokens issued before the
+    cache lost it are no longer trusted either.
+    """
+    return cache.get_or_set(
+        _version_cache_key(user_id), lambda: secrets.token_hex(8), timeout=None
+    )
+
+
+def expire_claims(user_id):
+    """Stop trusting the claims of tokens issued to ``user_id`` so far."""
+    cache.delete(_claims_cache_key(user_id))
+    cache.set(_version_cache_key(user_id), secrets.token_hex(8), timeout=None)
+
+
+def cached_user_claims(user_id):
+    """Claims for tokens issued without them, cached for a short while."""
+    key = _claims_cache_key(user_id)
+    claims = cache.get(key)
+    if claims is None:
+        user = User.objects.filter(
+            **{api_settings.USER_ID_FIELD: user_id}, is_active=True
+        ).first()
+        if user is None:
+            return None
+        claims = user_claims(user)
+        cache.set(key, claims, timeout=settings.JWT_CLAIMS_CACHE_TIMEOUT)
+    return claims
+
+
+def user_is_active(user_id):
+    """
+    Whether the account behind a token still exists and is active.
+
+    The answer is cached for ``JWT_CLAIMS_CACHE_TIMEOUT`` seconds and read
+    from the database on a miss, so an evicted or never-seen entry can never
+    let a deactivated or deleted user in.
+    """
+    key = _active_cache_key(user_id)
+    active = cache.get(key)
+    if active is None:
+        active = User.objects.filter(
+            **{api_settings.USER_ID_FIELD: user_id}, is_active=True
+        ).exists()
+        cache.set(key, active, timeout=settings.JWT_CLAIMS_CACHE_TIMEOUT)
+    return active
+
+
+def user_changed(user, deleted=False):
+    """Expire the claims of ``user`` and record whether its tokens still work."""
+    user_id = getattr(user, api_settings.USER_ID_FIELD)
+    expire_claims(user_id)
+    cache.set(
+        _active_cache_key(user_id),
+        user.is_active and not deleted,
+        timeout=settings.JWT_CLAIMS_CACHE_TIMEOUT,
+    )
+
+
+def claims_user(user_id, claims):
+    """
+    Build a ``User`` from token claims without touching the database.
+
+    The instance only has the claimed fields loaded, with ``role`` taken from
+    the role registry and ``vendor`` pre-set for vendor owners, so filtering
+    and saving with ``request.user`` or ``request.user.vendor`` needs no
+    query. ``token_claims`` keeps the raw claims, including the vendor a
+    staff member works for.
+    """
+    try:
+        role = roles.get(claims["role"]) if claims["role"] else None
+    except Role.DoesNotExist:
+        role = None
+    id_field = api_settings.USER_ID_FIELD
+    fields = [id_field, "role_id", "is_active", *USER_CLAIM_FIELDS]
+    values = [User._meta.get_field(id_field).to_python(user_id)]
+    values += [role.pk if role else None, True]
+    values += [claims[field] for field in USER_CLAIM_FIELDS]
+    user = User.from_db(DEFAULT_DB_ALIAS, fields, values)
+    User.role.field.set_cached_value(user, role)
+
+    vendor = None
+    if claims["owns_vendor"]:
+        vendor = Vendor.from_db(
+            DEFAULT_DB_ALIAS, ["id", "user_id"], [claims["vendor_id"], user.pk]
+        )
+        Vendor.user.field.set_cached_value(vendor, user)
+    User.vendor.related.set_cached_value(user, vendor)
+    user.token_claims = claims
+    return user
+
+
+class VendorJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that trusts the vendor claims of the token.
+
+    Tokens issued by ``VendorTokenObtainPairSerializer`` are turned into a
+    user without any query while ``user_is_active`` is answered from the
+    cache, as long as their ``claims_version`` is the current one of the
+    user. Tokens issued before the user, its vendor or its staff membership
+    changed, and older tokens without claims, fall back to claims read once
+    and cached for ``JWT_CLAIMS_CACHE_TIMEOUT`` seconds. Claims are read from
+    the database again whenever the token is refreshed.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise AuthenticationFailed(
+                _("Token contained no recognizable user identification")
+            )
+        if not user_is_active(user_id):
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        version = validated_token.get("claims_version")
+        if version is not None and version == claims_version(user_id):
+            claims = {
+                name: validated_token.get(name)
+                for name in [*USER_CLAIM_FIELDS, "vendor_id", "owns_vendor", "role"]
+            }
+        else:
+            claims = cached_user_claims(user_id)
+            if claims is None:
+                raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        return claims_user(user_id, claims)
@@ -0,0 +1,13 @@
+"""
+Password hashing for worker processes.
+
+This module imports no models, so process pools can load it without a
+configured Django project, whichever start method they use.
+"""
+
+from django.utils.module_loading import import_string
+
+
+def encode_password(hasher_path, password):
+    hasher = import_string(hasher_path)()
+    return hasher.encode(password, hasher.salt())
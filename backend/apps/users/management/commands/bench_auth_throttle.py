@@ -0,0 +1,76 @@
+import time
+
+from apps.users.throttling import AuthAccountThrottle, AuthIPThrottle
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+from rest_framework.parsers import JSONParser
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class HistoryIPThrottle(SimpleRateThrottle):
+    """DRF's request-history throttle, keyed like AuthIPThrottle."""
+
+    def get_cache_key(self, request, view):
+        return f"bench_history_{self.get_ident(request)}"
+
+
+class View:
+    kwargs = {}
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure the per-request cost of the auth token-bucket throttles "
+        "against DRF's request-history throttle at the same rate."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=20_000)
+        parser.add_argument("--clients", type=int, default=1000)
+        parser.add_argument(
+            "--rate",
+            default="1000/min",
+            help="Rate for all throttles; high enough that nothing is refused.",
+        )
+
+    def handle(self, *args, **options):
+        factory = APIRequestFactory()
+        requests = [
+            Request(
+                factory.post(
+                    "/api/v1/auth/token/",
+                    {"email": f"user{i}@example.com"},
+                    format="json",
+                    REMOTE_ADDR=f"10.0.{i // 250}.{i % 250}",
+                ),
+                parsers=[JSONParser()],
+            )
+            for i in range(options["clients"])
+        ]
+        for request in requests:
+            request.data  # parse once, as the view would before throttling
+
+        count = options["requests"]
+        self.stdout.write(
+            f"requests: {count}  clients: {options['clients']}  rate: {options['rate']}"
+        )
+        for name, throttle_class in [
+            ("token bucket, per IP", AuthIPThrottle),
+            ("token bucket, per account", AuthAccountThrottle),
+            ("DRF history, per IP", HistoryIPThrottle),
+        ]:
+            for clients in [len(requests), 1]:
+                caches["throttle"].clear()
+                throttle = type("Bench", (throttle_class,), {"rate": options["rate"]})()
+                view = View()
+                started = time.perf_counter()
+                for i in range(count):
+                    throttle.allow_request(requests[i % clients], view)
+                elapsed = time.perf_counter() - started
+                label = "hot key" if clients == 1 else f"{clients} keys"
+                self.stdout.write(
+                    f"{name:<27} {label:<10} {elapsed / count * 1e6:8.2f} µs/check"
+                )
+        caches["throttle"].clear()
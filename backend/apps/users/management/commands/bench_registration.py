@@ -0,0 +1,85 @@
+import time
+
+from apps.role.models import Role
+from apps.users.models import User
+from apps.users.serializers import CustomRegisterSerializer
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+HASHERS = {
+    "pbkdf2": ["django.contrib.auth.hashers.PBKDF2PasswordHasher"],
+    "md5": ["django.contrib.auth.hashers.MD5PasswordHasher"],
+}
+
+
+def register_before(data):
+    """The registration path before the single-write change, for comparison."""
+    role, _ = Role.objects.get_or_create(key="user", defaults={"label": "User"})
+    user = User.objects.create(
+        username=data["email"].split("@")[0],
+        email=data["email"],
+        first_name=data["first_name"],
+        last_name=data["last_name"],
+        role=role,
+        is_active=True,
+    )
+    user.set_password(data["password1"])
+    user.save()
+    return user
+
+
+def register_after(data):
+    serializer = CustomRegisterSerializer(data=data)
+    serializer.is_valid(raise_exception=True)
+    return serializer.save()
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure registrations per second and statements per registration "
+        "before and after the single-write pipeline. Users are deleted afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=200)
+        parser.add_argument("--hasher", choices=HASHERS, default="pbkdf2")
+
+    def handle(self, *args, **options):
+        prefix = f"bench-{time.time_ns()}"
+        count = options["users"]
+        results = []
+        try:
+            with override_settings(PASSWORD_HASHERS=HASHERS[options["hasher"]]):
+                for name, register in [
+                    ("before", register_before),
+                    ("after", register_after),
+                ]:
+                    rows = [self.payload(f"{prefix}-{name}-{i}") for i in range(count)]
+                    # Warm up the role registry, then count one registration.
+                    register(rows.pop())
+                    with CaptureQueriesContext(connection) as queries:
+                        register(rows.pop())
+                    started = time.perf_counter()
+                    for data in rows:
+                        register(data)
+                    rate = len(rows) / (time.perf_counter() - started)
+                    results.append((name, len(queries), rate))
+        finally:
+            User.objects.filter(email__startswith=prefix).delete()
+
+        self.stdout.write(f"users: {count}  hasher: {options['hasher']}")
+        for name, statements, rate in results:
+            self.stdout.write(
+                f"{name:<7} {statements:3d} statements/registration  {rate:9.1f} reg/s"
+            )
+
+    def payload(self, local):
+        return {
+            "first_name": "bench",
+            "last_name": "user",
+            "email": f"{local}@example.com",
+            "password1": "correct horse battery staple",
+            "password2": "correct horse battery staple",
+        }
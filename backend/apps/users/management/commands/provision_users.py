@@ -0,0 +1,47 @@
+import time
+
+from apps.users.utils import provision_users, read_provisioning_csv
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        "Create users, their profiles and the vendors they own from a CSV with "
+        "the columns email, first_name, last_name and optionally password, "
+        "role, business_type, vendor, vendor_email and vendor_mobile."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("csv_file")
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=None,
+            help="Worker processes hashing passwords (default: one per CPU).",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            with open(options["csv_file"], "rb") as file:
+                rows = read_provisioning_csv(file)
+            created = provision_users(
+                rows, processes=options["processes"], batch_size=options["batch_size"]
+            )
+        except OSError as exc:
+            raise CommandError(exc)
+        except ValidationError as exc:
+            errors = [
+                message
+                for messages in exc.message_dict.values()
+                for message in messages
+            ]
+            raise CommandError("\n".join(errors[:50] + [f"{len(errors)} problem(s)."]))
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Created {created['users']} users and {created['vendors']} vendors "
+                f"in {time.perf_counter() - started:.2f}s."
+            )
+        )
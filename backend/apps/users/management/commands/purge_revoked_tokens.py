@@ -0,0 +1,13 @@
+from apps.users.revocation import revoked_tokens
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete revoked refresh tokens that have expired anyway. Run it on a "
+        "schedule, e.g. daily from cron."
+    )
+
+    def handle(self, *args, **options):
+        deleted = revoked_tokens.purge()
+        self.stdout.write(self.style.SUCCESS(f"Purged {deleted} revoked tokens."))
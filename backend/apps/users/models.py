@@ -74,3 +74,14 @@ class User(AbstractBaseUser, PermissionsMixin):
                 # fallback or raise error as needed
                 self.username = None
         super().save(*args, **kwargs)
+
+
+class RevokedToken(models.Model):
+    """A refresh token that may no longer be used, kept until it expires."""
+
+    jti = models.CharField(max_length=64, unique=True)
+    expires_at = models.DateTimeField(db_index=True)
+    revoked_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return self.jti
@@ -0,0 +1,156 @@
+import hashlib
+import math
+import threading
+import time
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import RevokedToken
+
+
+class BloomFilter:
+    """
+    Set membership with false positives but no false negatives.
+
+    Sized for ``capacity`` items at ``error_rate``; the bit positions of an
+    item come from one BLAKE2b digest by double hashing.
+    """
+
+    def __init__(self, capacity, error_rate):
+        self.capacity = max(capacity, 1)
+        self.size = max(
+            8, math.ceil(-self.capacity * math.log(error_rate) / math.log(2) ** 2)
+        )
+        self.hashes = max(1, round(self.size / self.capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return ((first + i * second) % self.size for i in range(self.hashes))
+
+    def add(self, item):
+        added = False
+        for position in self._positions(item):
+            mask = 1 << (position & 7)
+            if not self.bits[position >> 3] & mask:
+                self.bits[position >> 3] |= mask
+                added = True
+        # Items added again (or colliding completely) are not counted twice.
+        self.count += added
+
+    def __contains__(self, item):
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(item)
+        )
+
+
+class RevocationList:
+    """
+    Revoked refresh tokens, screened by an in-process Bloom filter.
+
+    The filter holds the jti of every unexpired ``RevokedToken`` row. A jti
+    it does not contain is certainly not revoked, so checking a valid token
+    needs no query; only possible hits are confirmed in the database. Rows
+    revoked by other processes are picked up every
+    ``JWT_REVOCATION_SYNC_INTERVAL`` seconds, and the filter is rebuilt from
+    scratch every ``JWT_REVOCATION_REBUILD_INTERVAL`` seconds or once it
+    holds more items than it was sized for. Because ``revoke`` inserts
+    into a unique column, a token is never revoked twice, even when a
+    filter is behind.
+    """
+
+    # Rows committed this long after their revoked_at are still picked up.
+    SYNC_OVERLAP = timedelta(minutes=1)
+
+    def __init__(self):
+        self._filter = None
+        self._built_at = 0.0
+        self._synced_at = 0.0
+        self._sync_from = None
+        self._lock = threading.Lock()
+
+    def _rebuild(self, now):
+        sync_from = timezone.now() - self.SYNC_OVERLAP
+        jtis = list(
+            RevokedToken.objects.filter(expires_at__gt=timezone.now()).values_list(
+                "jti", flat=True
+            )
+        )
+        bloom = BloomFilter(
+            max(2 * len(jtis), settings.JWT_REVOCATION_FILTER_CAPACITY),
+            settings.JWT_REVOCATION_FILTER_ERROR_RATE,
+        )
+        for jti in jtis:
+            bloom.add(jti)
+        self._filter, self._sync_from = bloom, sync_from
+        self._built_at = self._synced_at = now
+
+    def _sync(self, now):
+        sync_from = timezone.now() - self.SYNC_OVERLAP
+        for jti in RevokedToken.objects.filter(
+            revoked_at__gte=self._sync_from
+        ).values_list("jti", flat=True):
+            self._filter.add(jti)
+        self._sync_from, self._synced_at = sync_from, now
+
+    def _current(self):
+        now = time.monotonic()
+        bloom = self._filter
+        if (
+            bloom is None
+            or bloom.count > bloom.capacity
+            or now - self._built_at >= settings.JWT_REVOCATION_REBUILD_INTERVAL
+        ):
+            with self._lock:
+                self._rebuild(now)
+        elif now - self._synced_at >= settings.JWT_REVOCATION_SYNC_INTERVAL:
+            with self._lock:
+                self._sync(now)
+        return self._filter
+
+    def might_be_revoked(self, jti):
+        return jti in self._current()
+
+    def is_revoked(self, jti):
+        return (
+            self.might_be_revoked(jti) and RevokedToken.objects.filter(jti=jti).exists()
+        )
+
+    def revoke(self, jti, expires_at):
+        """
+        Revoke the token ``jti``, which expires at the ``exp`` timestamp
+        ``expires_at``. Returns False if it was already revoked.
+        """
+        try:
+            with transaction.atomic():
+                RevokedToken.objects.create(
+                    jti=jti,
+                    expires_at=datetime.fromtimestamp(expires_at, tz=dt_timezone.utc),
+                )
+        except IntegrityError:
+            return False
+        # False positives are harmless, so a rollback can be ignored.
+        self._current().add(jti)
+        return True
+
+    def purge(self):
+        """Delete expired rows and rebuild the filter without them."""
+        deleted, _ = RevokedToken.objects.filter(
+            expires_at__lte=timezone.now()
+        ).delete()
+        self.clear()
+        return deleted
+
+    def clear(self):
+        self._filter = None
+
+
+revoked_tokens = RevocationList()
@@ -1,9 +1,23 @@
 from apps.common.models import Business
-from apps.role.models import Role
+from apps.common.serializers import CountryCodeField, FastReadSerializer, FileURLField
+from apps.role.models import Role, roles
 from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import IntegrityError, transaction
+from django.utils.translation import gettext_lazy as _
 from django_countries.serializer_fields import CountryField
 from phonenumber_field.serializerfields import PhoneNumberField
 from rest_framework import serializers
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, TokenError
+from rest_framework_simplejwt.serializers import (
+    TokenBlacklistSerializer,
+    TokenObtainPairSerializer,
+    TokenRefreshSerializer,
+)
+from rest_framework_simplejwt.settings import api_settings
+
+from .authentication import add_claims, user_claims
+from .revocation import revoked_tokens
 
 User = get_user_model()
 
@@ -53,6 +67,29 @@ class UserSerializer(serializers.ModelSerializer):
         return representation
 
 
+class UserReadSerializer(FastReadSerializer):
+    """``UserSerializer`` output for list views, built from ``values()`` rows."""
+
+    id = serializers.UUIDField()
+    email = serializers.EmailField()
+    first_name = serializers.CharField()
+    last_name = serializers.CharField()
+    gender = serializers.CharField(source="profile__gender")
+    business_type = serializers.CharField()
+    phone_number = serializers.CharField(source="profile__phone_number")
+    profile_photo = FileURLField(source="profile__profile_photo")
+    country = CountryCodeField(source="profile__country")
+    city = serializers.CharField(source="profile__city")
+
+    extra_lookups = ["is_superuser"]
+
+    def to_representation(self, row):
+        representation = super().to_representation(row)
+        if self.value(row, "is_superuser"):
+            representation["admin"] = True
+        return representation
+
+
 class CustomRegisterSerializer(serializers.ModelSerializer):
     username = serializers.CharField(required=False, allow_blank=True, allow_null=True)
     first_name = serializers.CharField(required=True)
@@ -84,17 +121,20 @@ class CustomRegisterSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         # Remove password2 from validated_data since we don't need it after validation
         validated_data.pop("password2", None)
-        password = validated_data.pop("password1")
+        # Hash first and outside the transaction: it is by far the slowest step.
+        password = make_password(validated_data.pop("password1"))
 
         # Handle optional username; default to email username if not provided
         username = validated_data.get("username")
         if not username:
             username = validated_data["email"].split("@")[0]
 
-        # Assign default role, e.g., "user"
+        # Assign default role, e.g., "user" (served from the role registry)
         default_role = Role.get_default_role()
 
-        user = User.objects.create(
+        # A single INSERT; the profile signal adds its row in the same transaction.
+        # Uniqueness is left to the database instead of checked up front.
+        user = User(
             username=username,
             email=validated_data["email"],
             first_name=validated_data["first_name"],
@@ -102,7 +142,102 @@ class CustomRegisterSerializer(serializers.ModelSerializer):
             business_type=validated_data.get("business_type"),
             role=default_role,
             is_active=True,
+            password=password,
         )
-        user.set_password(password)
-        user.save()
+        try:
+            with transaction.atomic():
+                user.save(force_insert=True)
+        except IntegrityError:
+            if User.objects.filter(email=user.email).exists():
+                raise serializers.ValidationError(
+                    {"email": ["A user with this email already exists."]}
+                )
+            raise serializers.ValidationError(
+                {"username": ["This username is already taken."]}
+            )
         return user
+
+
+class RoleKeyField(serializers.CharField):
+    """A user role given by its key, resolved through the role registry."""
+
+    def to_internal_value(self, data):
+        key = super().to_internal_value(data)
+        try:
+            return roles.get(key)
+        except Role.DoesNotExist:
+            raise serializers.ValidationError(f"Unknown role '{key}'.")
+
+
+class UserProvisioningRowSerializer(serializers.Serializer):
+    """One CSV row of ``provision_users``: a user and the vendor they own."""
+
+    email = serializers.EmailField(max_length=255)
+    first_name = serializers.CharField(max_length=255)
+    last_name = serializers.CharField(max_length=255)
+    # Blank passwords give the account an unusable password.
+    password = serializers.CharField(
+        required=False, allow_blank=True, trim_whitespace=False
+    )
+    role = RoleKeyField(required=False, allow_blank=True)
+    business_type = serializers.ChoiceField(
+        choices=User.BUSINESS_TYPES, required=False, allow_blank=True
+    )
+    vendor = serializers.CharField(max_length=100, required=False, allow_blank=True)
+    vendor_email = serializers.EmailField(
+        max_length=100, required=False, allow_blank=True
+    )
+    vendor_mobile = serializers.CharField(
+        max_length=150, required=False, allow_blank=True
+    )
+
+
+class UserProvisioningSerializer(serializers.Serializer):
+    file = serializers.FileField()
+
+
+class VendorTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """Issue tokens carrying the vendor, role and business type of the user."""
+
+    @classmethod
+    def get_token(cls, user):
+        return add_claims(super().get_token(user), user_claims(user))
+
+
+class VendorTokenRefreshSerializer(TokenRefreshSerializer):
+    """Refresh tokens with the current claims of the user instead of stale ones."""
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs["refresh"])
+        jti = refresh[api_settings.JTI_CLAIM]
+        if revoked_tokens.is_revoked(jti):
+            raise TokenError(_("Token is blacklisted"))
+        user = User.objects.filter(
+            **{api_settings.USER_ID_FIELD: refresh.get(api_settings.USER_ID_CLAIM)}
+        ).first()
+        if user is None or not api_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed(
+                self.error_messages["no_active_account"], "no_active_account"
+            )
+        add_claims(refresh, user_claims(user))
+        data = {"access": str(refresh.access_token)}
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            # The rotated-out token is revoked. Of two concurrent refreshes
+            # with the same token, only one wins the unique insert.
+            if not revoked_tokens.revoke(jti, refresh["exp"]):
+                raise TokenError(_("Token is blacklisted"))
+            # Rotated without outstand(), which needs the blacklist app.
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            data["refresh"] = str(refresh)
+        return data
+
+
+class RefreshTokenRevokeSerializer(TokenBlacklistSerializer):
+    """Revoke a refresh token, e.g. on logout."""
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs["refresh"])
+        revoked_tokens.revoke(refresh[api_settings.JTI_CLAIM], refresh["exp"])
+        return {}
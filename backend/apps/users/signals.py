@@ -0,0 +1,27 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework_simplejwt.settings import api_settings
+
+from .authentication import expire_claims, user_changed
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=User)
+def refresh_token_claims(sender, instance, **kwargs):
+    user_changed(instance)
+
+
+@receiver(post_delete, sender=User)
+def revoke_deleted_user_tokens(sender, instance, **kwargs):
+    user_changed(instance, deleted=True)
+
+
+@receiver(post_save, sender="vendor.Vendor")
+@receiver(post_delete, sender="vendor.Vendor")
+@receiver(post_save, sender="restaurant.StaffManagement")
+@receiver(post_delete, sender="restaurant.StaffManagement")
+def refresh_vendor_claims(sender, instance, **kwargs):
+    # The vendor tokens of the owner or staff member carry.
+    expire_claims(getattr(instance.user, api_settings.USER_ID_FIELD))
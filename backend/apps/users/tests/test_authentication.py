@@ -0,0 +1,158 @@
+import pytest
+from apps.categories.models import Category
+from apps.restaurant.models import Order, RestaurantRole, StaffManagement
+from apps.restaurant.utils import user_vendor_id
+from apps.role.models import Role
+from apps.users.authentication import VendorJWTAuthentication
+from apps.users.models import User
+from apps.vendor.models import Vendor
+from django.core.cache import cache
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+
+def _user(email, **fields):
+    return User.objects.create_user(
+        first_name="john",
+        last_name="doe",
+        email=email,
+        password="secret",
+        role=Role.get_default_role(),
+        **fields,
+    )
+
+
+def _login(client, email):
+    response = client.post(
+        "/api/v1/auth/token/", {"email": email, "password": "secret"}, format="json"
+    )
+    assert response.status_code == 200
+    return response.json()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_tokens_carry_vendor_claims_and_skip_auth_queries(
+    django_assert_num_queries,
+):
+    owner = _user("owner@example.com", business_type="restaurant")
+    vendor = Vendor.objects.create(user=owner, name="Shop")
+    Category.objects.create(vendor=vendor, name="Tools", tools=[])
+    waiter = _user("waiter@example.com")
+    StaffManagement.objects.create(
+        user=waiter,
+        vendor=vendor,
+        role=RestaurantRole.objects.create(key="waiter", label="Waiter"),
+        salary=100,
+        start_day="2024-01-01",
+        attribute={},
+    )
+    client = APIClient()
+
+    tokens = _login(client, owner.email)
+    access = AccessToken(tokens["access"])
+    assert access["vendor_id"] == vendor.id
+    assert access["owns_vendor"] is True
+    assert (access["role"], access["business_type"]) == ("user", "restaurant")
+
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+    with django_assert_num_queries(1):
+        response = client.get("/api/v1/categories/categories/")
+    assert [category["name"] for category in response.json()] == ["Tools"]
+    with django_assert_num_queries(1):
+        response = client.post(
+            "/api/v1/categories/categories/",
+            {"name": "Parts", "tools": ["saw"]},
+            format="json",
+        )
+    assert response.status_code == 201
+
+    Order.objects.create(vendor=vendor, customer="Ali")
+    tokens = _login(client, waiter.email)
+    assert AccessToken(tokens["access"])["owns_vendor"] is False
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+    # The page and its (cached) row count.
+    with django_assert_num_queries(2):
+        response = client.get("/api/v1/restaurant/orders/")
+    results = response.json()["results"]
+    assert [order["customer"] for order in results] == ["Ali"]
+
+    waiter.is_active = False
+    waiter.save()
+    assert client.get("/api/v1/restaurant/orders/").status_code == 401
+
+
+@pytest.mark.django_db(transaction=True)
+def test_refresh_and_legacy_tokens_pick_up_current_claims(
+    django_assert_num_queries,
+):
+    user = _user("new@example.com")
+    client = APIClient()
+    tokens = _login(client, user.email)
+    assert AccessToken(tokens["access"])["vendor_id"] is None
+
+    Vendor.objects.create(user=user, name="Later")
+    response = client.post(
+        "/api/v1/auth/refresh/", {"refresh": tokens["refresh"]}, format="json"
+    )
+    assert AccessToken(response.json()["access"])["vendor_id"] == user.vendor.id
+
+    # Tokens issued before vendor claims existed are resolved once, then
+    # served from the cache.
+    legacy = str(RefreshToken.for_user(user).access_token)
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {legacy}")
+    assert client.get("/api/v1/categories/categories/").status_code == 200
+    with django_assert_num_queries(1):
+        assert client.get("/api/v1/categories/categories/").json() == []
+
+
+@pytest.mark.django_db(transaction=True)
+def test_deactivated_and_deleted_users_are_locked_out_without_the_cache():
+    client = APIClient()
+    user = _user("gone@example.com")
+    access = _login(client, user.email)["access"]
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+    assert client.get("/api/v1/categories/categories/").status_code == 200
+
+    # Deactivated in bulk (no signal), or the entry evicted: the database
+    # decides.
+    User.objects.filter(pk=user.pk).update(is_active=False)
+    cache.clear()
+    assert client.get("/api/v1/categories/categories/").status_code == 401
+
+    User.objects.filter(pk=user.pk).update(is_active=True)
+    cache.clear()
+    assert client.get("/api/v1/categories/categories/").status_code == 200
+    user.delete()
+    assert client.get("/api/v1/categories/categories/").status_code == 401
+
+
+@pytest.mark.django_db(transaction=True)
+def test_tokens_are_not_trusted_once_the_claims_changed():
+    owner = _user("boss@example.com", is_staff=True)
+    vendor = Vendor.objects.create(user=owner, name="Shop")
+    waiter = _user("waiter@example.com")
+    staff = StaffManagement.objects.create(
+        user=waiter,
+        vendor=vendor,
+        role=RestaurantRole.objects.create(key="waiter", label="Waiter"),
+        salary=100,
+        start_day="2024-01-01",
+        attribute={},
+    )
+    client = APIClient()
+    owner_access = AccessToken(_login(client, owner.email)["access"])
+    waiter_access = AccessToken(_login(client, waiter.email)["access"])
+    authentication = VendorJWTAuthentication()
+    assert authentication.get_user(owner_access).is_staff
+
+    owner.is_staff = False
+    owner.save()
+    assert not authentication.get_user(owner_access).is_staff
+    assert user_vendor_id(authentication.get_user(waiter_access)) == vendor.id
+    staff.delete()
+    assert user_vendor_id(authentication.get_user(waiter_access)) is None
+
+    # Without the cached version no token is trusted either.
+    User.objects.filter(pk=owner.pk).update(is_superuser=True)
+    cache.clear()
+    assert authentication.get_user(owner_access).is_superuser
@@ -0,0 +1,106 @@
+import io
+
+import pytest
+from apps.profiles.models import Profile
+from apps.role.models import Role
+from apps.users import utils
+from apps.users.models import User
+from apps.users.utils import provision_users, read_provisioning_csv
+from apps.vendor.models import Vendor
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from rest_framework.test import APIClient
+
+CSV = (
+    "email,first_name,last_name,password,role,business_type,vendor\n"
+    "owner@example.com,Sara,K,s3cret,,restaurant,Kabul Grill\n"
+    "chef@example.com,Ali,R,,admin,,\n"
+    "cook@example.com,Mina,J,cook-pass,,,\n"
+)
+
+
+def _rows(text):
+    return read_provisioning_csv(io.BytesIO(text.encode()))
+
+
+@pytest.mark.django_db
+def test_provisioning_matches_the_per_user_signup():
+    Role.objects.create(key="admin", label="Admin")
+
+    assert provision_users(_rows(CSV), processes=2) == {"users": 3, "vendors": 1}
+
+    owner = User.objects.get(email="owner@example.com")
+    assert owner.username == "owner" and owner.check_password("s3cret")
+    assert owner.role.key == "user" and owner.business_type == "restaurant"
+    assert owner.vendor.name == "Kabul Grill" and owner.vendor.slug == "kabul-grill"
+    assert owner.vendor.vid
+    assert not User.objects.get(email="chef@example.com").has_usable_password()
+    assert User.objects.get(email="chef@example.com").role.key == "admin"
+    assert User.objects.get(email="cook@example.com").check_password("cook-pass")
+    assert Profile.objects.count() == 3
+
+
+@pytest.mark.django_db
+def test_provisioning_rejects_bad_files_without_writing():
+    Role.objects.create(key="admin", label="Admin")
+    with pytest.raises(ValidationError) as exc:
+        _rows("email,first_name\nx@example.com,X\n")
+    assert exc.value.message_dict == {"file": ["Missing columns: last_name."]}
+
+    with pytest.raises(ValidationError) as exc:
+        _rows(CSV + "not-an-email,A,B,,manager,,\n")
+    assert exc.value.message_dict["rows"] == [
+        "line 5: email: Enter a valid email address.",
+        "line 5: role: Unknown role 'manager'.",
+    ]
+
+    User.objects.create_user(
+        first_name="c", last_name="d", email="cook@example.com", password="x"
+    )
+    rows = _rows(CSV.replace(",admin,", ",,") + "owner@example.org,O,P,,,,\n")
+    with pytest.raises(ValidationError) as exc:
+        provision_users(rows, processes=1)
+    assert exc.value.message_dict["rows"] == [
+        "Username owner appears more than once.",
+        "cook@example.com already has an account.",
+        "Username cook is already taken.",
+    ]
+    assert User.objects.count() == 1 and not Vendor.objects.exists()
+
+
+@pytest.mark.django_db
+def test_provisioning_endpoint_is_for_admins_only(
+    monkeypatch, settings, django_capture_on_commit_callbacks
+):
+    settings.BACKGROUND_TASKS_EAGER = True
+    # Requests never start a process pool, however many CPUs there are.
+    monkeypatch.setattr(utils.os, "cpu_count", lambda: 4)
+    monkeypatch.setattr(utils, "ProcessPoolExecutor", None)
+    Role.objects.create(key="admin", label="Admin")
+    admin = User.objects.create_superuser(
+        first_name="a", last_name="b", email="admin@example.com", password="x"
+    )
+    client = APIClient()
+    upload = SimpleUploadedFile("staff.csv", CSV.encode(), content_type="text/csv")
+
+    client.force_authenticate(admin)
+    # Accounts are created by the background runner, after the response.
+    with django_capture_on_commit_callbacks() as callbacks:
+        response = client.post("/api/v1/auth/provision/", {"file": upload})
+    assert response.status_code == 202
+    assert response.json() == {"users": 3, "vendors": 1}
+    assert User.objects.count() == 1
+    for callback in callbacks:
+        callback()
+    assert User.objects.count() == 4
+
+    # Conflicts are still reported by the request.
+    upload.seek(0)
+    response = client.post("/api/v1/auth/provision/", {"file": upload})
+    assert response.status_code == 400
+    assert "cook@example.com already has an account." in response.json()["rows"]
+
+    client.force_authenticate(User.objects.get(email="cook@example.com"))
+    upload.seek(0)
+    response = client.post("/api/v1/auth/provision/", {"file": upload})
+    assert response.status_code == 403
@@ -0,0 +1,34 @@
+import pytest
+from apps.profiles.models import Profile
+from apps.role.models import Role
+from apps.users.models import User
+from rest_framework.test import APIClient
+
+
+@pytest.mark.django_db(transaction=True)
+def test_registration_hashes_first_and_writes_each_row_once(
+    django_assert_num_queries,
+):
+    Role.get_default_role()
+    Role.get_default_role()
+    payload = {
+        "first_name": "sara",
+        "last_name": "k",
+        "email": "sara@example.com",
+        "password1": "s3cret-pass",
+        "password2": "s3cret-pass",
+    }
+
+    # The user and profile inserts inside one transaction.
+    with django_assert_num_queries(4):
+        response = APIClient().post("/api/v1/auth/register/", payload, format="json")
+
+    assert response.status_code == 201
+    user = User.objects.get(email="sara@example.com")
+    assert user.username == "sara" and user.check_password("s3cret-pass")
+    assert user.role.key == "user"
+    assert Profile.objects.filter(user=user).exists()
+
+    response = APIClient().post("/api/v1/auth/register/", payload, format="json")
+    assert response.status_code == 400
+    assert response.json() == {"email": ["A user with this email already exists."]}
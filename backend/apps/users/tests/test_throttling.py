@@ -0,0 +1,99 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+from apps.users.throttling import AuthIPThrottle, TokenBucketThrottle
+from django.core.cache import caches
+from rest_framework.test import APIClient
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(TokenBucketThrottle, "timer", lambda self: now[0])
+    caches["throttle"].clear()
+    yield now
+    caches["throttle"].clear()
+
+
+@pytest.mark.django_db
+def test_password_reset_is_limited_per_account_and_refills(clock):
+    client = APIClient()
+    for _ in range(5):
+        response = client.get("/api/v1/auth/user/password-reset/bot@example.com/")
+        assert response.status_code == 404
+
+    response = client.get("/api/v1/auth/user/password-reset/BOT@example.com/")
+    assert response.status_code == 429
+    assert response["Retry-After"] == "12"
+    # Other accounts keep their own bucket; the address has tokens left.
+    response = client.get("/api/v1/auth/user/password-reset/other@example.com/")
+    assert response.status_code == 404
+
+    clock[0] += 12
+    response = client.get("/api/v1/auth/user/password-reset/bot@example.com/")
+    assert response.status_code == 404
+    response = client.get("/api/v1/auth/user/password-reset/bot@example.com/")
+    assert response.status_code == 429
+
+
+@pytest.mark.django_db
+def test_otp_guessing_is_limited_per_address(clock, monkeypatch):
+    monkeypatch.setitem(AuthIPThrottle.THROTTLE_RATES, "auth_ip", "3/min")
+    client = APIClient()
+    statuses = [
+        client.post(
+            "/api/v1/auth/user/password-change/",
+            {"otp": str(guess), "uuidb64": f"user-{guess}", "password": "x"},
+        ).status_code
+        for guess in range(4)
+    ]
+    assert statuses[3] == 429 and 429 not in statuses[:3]
+
+
+def test_concurrent_requests_cannot_spend_the_same_token(clock, monkeypatch):
+    cache = caches["throttle"]
+    get = cache.get
+
+    def slow_get(*args, **kwargs):
+        value = get(*args, **kwargs)
+        # Let every other thread read the bucket before this one writes it.
+        time.sleep(0.005)
+        return value
+
+    monkeypatch.setattr(cache, "get", slow_get)
+    monkeypatch.setitem(AuthIPThrottle.THROTTLE_RATES, "auth_ip", "5/min")
+    request = SimpleNamespace(META={"REMOTE_ADDR": "10.0.0.1"})
+    with ThreadPoolExecutor(8) as pool:
+        allowed = list(
+            pool.map(lambda _: AuthIPThrottle().allow_request(request, None), range(8))
+        )
+    assert allowed.count(True) == 5
+
+
+def test_contended_buckets_do_not_turn_requests_away(clock, monkeypatch):
+    monkeypatch.setattr(AuthIPThrottle, "lock_wait", 0.01)
+    request = SimpleNamespace(META={"REMOTE_ADDR": "10.0.0.1"})
+    throttle = AuthIPThrottle()
+    lock = f"{throttle.get_cache_key(request, None)}:lock"
+    caches["throttle"].set(lock, "another worker")
+
+    assert throttle.allow_request(request, None)
+    # The lock of the other worker is left alone.
+    assert caches["throttle"].get(lock) == "another worker"
+
+
+@pytest.mark.django_db
+def test_forwarded_addresses_are_ignored_without_proxies(clock, monkeypatch):
+    monkeypatch.setitem(AuthIPThrottle.THROTTLE_RATES, "auth_ip", "3/min")
+    client = APIClient()
+    statuses = [
+        client.post(
+            "/api/v1/auth/user/password-change/",
+            {"otp": "1", "uuidb64": f"user-{i}", "password": "x"},
+            HTTP_X_FORWARDED_FOR=f"10.0.0.{i}",
+        ).status_code
+        for i in range(4)
+    ]
+    assert statuses[3] == 429
@@ -0,0 +1,104 @@
+import time
+import uuid
+
+from django.core.cache import caches
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """
+    Token bucket kept in the ``throttle`` cache: a rate of ``"5/min"`` allows a
+    burst of five requests, then one more every twelve seconds.
+
+    Each check reads and writes one ``(tokens, timestamp)`` pair, so its cost
+    does not grow with the rate the way DRF's request history does. The pair
+    is updated under a lock taken with ``cache.add``, so concurrent requests
+    cannot spend the same token. The lock carries an owner token and is only
+    released by its owner; a request that cannot get it in time is checked
+    without it rather than turned away.
+    """
+
+    cache = caches["throttle"]
+    # Seconds a request waits for others checking the same bucket, and after
+    # which the lock of a worker that died holding it expires.
+    lock_wait = 0.25
+    lock_timeout = 1
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        lock = f"{self.key}:lock"
+        owner = uuid.uuid4().hex
+        deadline = time.monotonic() + self.lock_wait
+        delay = 0.001
+        while not self.cache.add(lock, owner, self.lock_timeout):
+            if time.monotonic() > deadline:
+                # The holder is slow or gone: a token spent twice is better
+                # than refusing a client that has tokens left.
+                return self.take_token()
+            time.sleep(delay)
+            delay = min(delay * 2, 0.02)
+        try:
+            return self.take_token()
+        finally:
+            # The lock may have expired and been taken by another request.
+            if self.cache.get(lock) == owner:
+                self.cache.delete(lock)
+
+    def take_token(self):
+        now = self.timer()
+        tokens, updated_at = self.cache.get(self.key, (self.num_requests, now))
+        refill = (now - updated_at) * self.num_requests / self.duration
+        tokens = min(self.num_requests, tokens + refill)
+        if tokens < 1:
+            self.wait_seconds = (1 - tokens) * self.duration / self.num_requests
+            return False
+        # An expired bucket reads as full, which it would be by then anyway.
+        self.cache.set(self.key, (tokens - 1, now), self.duration)
+        return True
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class AuthIPThrottle(TokenBucketThrottle):
+    """
+    Limits auth requests per client address. Behind proxies, set
+    ``NUM_PROXIES`` so the address is read from ``X-Forwarded-For``; the
+    header is ignored otherwise, as clients can send any value.
+    """
+
+    scope = "auth_ip"
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {
+            "scope": self.scope,
+            "ident": self.get_ident(request),
+        }
+
+
+class AuthAccountThrottle(TokenBucketThrottle):
+    """
+    Limits auth requests per targeted account, whatever address they come
+    from. The account is the ``email`` in the URL or body, or the
+    ``uuidb64`` of a password change.
+    """
+
+    scope = "auth_account"
+
+    def get_cache_key(self, request, view):
+        data = request.data if hasattr(request.data, "get") else {}
+        account = view.kwargs.get("email") or data.get("email") or data.get("uuidb64")
+        if not account:
+            return None
+        return self.cache_format % {
+            "scope": self.scope,
+            "ident": str(account).strip().lower(),
+        }
+
+
+AUTH_THROTTLES = [AuthIPThrottle, AuthAccountThrottle]
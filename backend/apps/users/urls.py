@@ -1,12 +1,23 @@
 from django.urls import path
-from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+from rest_framework_simplejwt.views import (
+    TokenBlacklistView,
+    TokenObtainPairView,
+    TokenRefreshView,
+)
 
 from . import views
+from .throttling import AUTH_THROTTLES
 
 urlpatterns = [
-    path("token/", TokenObtainPairView.as_view(), name="token_obtain_pair"),
+    path(
+        "token/",
+        TokenObtainPairView.as_view(throttle_classes=AUTH_THROTTLES),
+        name="token_obtain_pair",
+    ),
     path("refresh/", TokenRefreshView.as_view(), name="token_refresh"),
+    path("logout/", TokenBlacklistView.as_view(), name="token_revoke"),
     path("register/", views.UserRegisterAPIView.as_view(), name="register"),
+    path("provision/", views.UserProvisioningAPIView.as_view(), name="provision"),
     path(
         "user/password-reset/<email>/",
         views.PasswordRegisterEmailVerifyApiView.as_view(),
@@ -1,17 +1,35 @@
+import codecs
+import csv
 import datetime
+import os
 import random
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 
 import shortuuid
-from django.conf import settings
+from apps.common.mail import queue_email
+from apps.common.storage import retain_files
+from apps.profiles.models import Profile
+from apps.role.models import Role
+from apps.vendor.models import Vendor
+from apps.vendor.sharding import migrate_shards_on_commit
+from apps.vendor.subdomains import subdomain_vendors
 from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import get_hasher, make_password
 from django.contrib.auth.tokens import default_token_generator
 from django.contrib.sites.shortcuts import get_current_site
-from django.core.mail import EmailMessage, EmailMultiAlternatives
+from django.core.exceptions import ValidationError
+from django.db import transaction
 from django.template.loader import render_to_string
 from django.utils.encoding import force_bytes
 from django.utils.http import urlsafe_base64_encode
+from django.utils.text import slugify
 from rest_framework_simplejwt.tokens import RefreshToken
 
+from .hashing import encode_password
+from .serializers import UserProvisioningRowSerializer
+
 User = get_user_model()
 
 
@@ -55,12 +73,7 @@ def send_verification_email(user):
     text_body = render_to_string("email/password_reset.txt", merge_data)
     html_body = render_to_string("email/password_reset.html", merge_data)
 
-    msg = EmailMultiAlternatives(
-        subject=subject, from_email=settings.FROM_EMAIL, to=[user.email], body=text_body
-    )
-    msg.attach_alternative(html_body, "text/html")
-    msg.send()
-    msg.send()
+    queue_email([user.email], subject, body=text_body, html_body=html_body)
 
 
 def send_email_notification(request, user, email_subject, email_template, link=None):
@@ -102,13 +115,176 @@ def send_email_notification(request, user, email_subject, email_template, link=N
             },
         )
 
-    # Prepare the email message
-    email = EmailMessage(
-        subject=email_subject,
-        body=email_message,
-        to=[user.email],
-    )
-    email.content_subtype = "html"  # Send as HTML email
-    email.send()
+    # Delivered by the send_outbox worker, outside the request
+    queue_email([user.email], email_subject, html_body=email_message)
+
+
+PROVISIONING_REQUIRED_COLUMNS = {"email", "first_name", "last_name"}
+
+
+def read_provisioning_csv(file):
+    """
+    Read and validate the rows of a user provisioning CSV.
+
+    ``file`` is a binary file object whose header names the columns of
+    ``UserProvisioningRowSerializer``. Problems are raised together as a
+    ``ValidationError`` that points at CSV line numbers.
+    """
+    reader = csv.DictReader(codecs.iterdecode(file, "utf-8-sig"))
+    columns = {name.strip() for name in reader.fieldnames or []}
+    missing = sorted(PROVISIONING_REQUIRED_COLUMNS - columns)
+    if missing:
+        raise ValidationError({"file": [f"Missing columns: {', '.join(missing)}."]})
+
+    rows, lines = [], []
+    for row in reader:
+        rows.append(
+            {
+                name.strip(): value
+                for name, value in row.items()
+                if name and value is not None
+            }
+        )
+        lines.append(reader.line_num)
+    if not rows:
+        raise ValidationError({"file": ["The file has no rows."]})
+
+    serializer = UserProvisioningRowSerializer(data=rows, many=True)
+    if not serializer.is_valid():
+        errors = [
+            f"line {line}: {field}: {' '.join(messages)}"
+            for line, row_errors in zip(lines, serializer.errors)
+            for field, messages in row_errors.items()
+        ]
+        raise ValidationError({"rows": errors})
+    return serializer.validated_data
 
-    print(f"Sent email to {user.email} with subject: {email_subject}")
+
+def hash_passwords(passwords, processes=None):
+    """
+    Hash ``passwords`` with the default hasher across worker processes.
+
+    Blank passwords become unusable ones. Hashes come back in input order.
+    With ``processes`` set to 1, or a single password to hash, everything
+    runs in this process.
+    """
+    hasher = get_hasher()
+    hasher_path = f"{type(hasher).__module__}.{type(hasher).__qualname__}"
+    given = [index for index, password in enumerate(passwords) if password]
+    hashed = [None if password else make_password(None) for password in passwords]
+    processes = processes or os.cpu_count() or 1
+
+    if processes > 1 and len(given) > 1:
+        with ProcessPoolExecutor(processes) as pool:
+            results = list(
+                pool.map(
+                    encode_password,
+                    repeat(hasher_path),
+                    [passwords[index] for index in given],
+                    chunksize=max(1, len(given) // (processes * 4)),
+                )
+            )
+    else:
+        results = [encode_password(hasher_path, passwords[index]) for index in given]
+    for index, result in zip(given, results):
+        hashed[index] = result
+    return hashed
+
+
+def _taken(field, values, batch_size):
+    values = list(values)
+    taken = []
+    for start in range(0, len(values), batch_size):
+        taken += User.objects.filter(
+            **{f"{field}__in": values[start : start + batch_size]}
+        ).values_list(field, flat=True)
+    return sorted(taken)
+
+
+def _emails_and_usernames(rows):
+    emails = [User.objects.normalize_email(row["email"]) for row in rows]
+    return emails, [email.split("@")[0] for email in emails]
+
+
+def check_provisioning(rows, batch_size=1000):
+    """
+    Reject provisioning ``rows`` that conflict with each other or with
+    existing accounts, as one ``ValidationError``.
+    """
+    emails, usernames = _emails_and_usernames(rows)
+    errors = [
+        f"{email} appears more than once."
+        for email, count in Counter(emails).items()
+        if count > 1
+    ]
+    errors += [
+        f"Username {username} appears more than once."
+        for username, count in Counter(usernames).items()
+        if count > 1
+    ]
+    errors += [
+        f"{email} already has an account."
+        for email in _taken("email", emails, batch_size)
+    ]
+    errors += [
+        f"Username {username} is already taken."
+        for username in _taken("username", usernames, batch_size)
+    ]
+    if errors:
+        raise ValidationError({"rows": errors})
+
+
+def provision_users(rows, processes=None, batch_size=1000):
+    """
+    Create users, their profiles and the vendors they own in bulk.
+
+    ``rows`` are validated ``UserProvisioningRowSerializer`` data. Passwords
+    are hashed by ``hash_passwords`` before the transaction; users, profiles
+    and vendors are then written with ``bulk_create``. The per-row signals
+    are skipped, so everything they would do is done here: profiles, the
+    username derived from the email, vendor slugs, file references and
+    vendor databases. Any conflict with existing accounts rejects the whole
+    file (see ``check_provisioning``).
+    """
+    check_provisioning(rows, batch_size)
+    emails, usernames = _emails_and_usernames(rows)
+    passwords = hash_passwords([row.get("password") for row in rows], processes)
+    default_role = Role.get_default_role()
+    users = [
+        User(
+            username=username,
+            email=email,
+            first_name=row["first_name"],
+            last_name=row["last_name"],
+            password=password,
+            role=row.get("role") or default_role,
+            business_type=row.get("business_type") or None,
+        )
+        for row, email, username, password in zip(rows, emails, usernames, passwords)
+    ]
+
+    with transaction.atomic():
+        User.objects.bulk_create(users, batch_size=batch_size)
+        Profile.objects.bulk_create(
+            (Profile(user=user) for user in users), batch_size=batch_size
+        )
+        vendors = Vendor.objects.bulk_create(
+            (
+                Vendor(
+                    user=user,
+                    name=row["vendor"],
+                    slug=slugify(row["vendor"]),
+                    email=row.get("vendor_email") or None,
+                    mobile=row.get("vendor_mobile") or None,
+                )
+                for row, user in zip(rows, users)
+                if row.get("vendor")
+            ),
+            batch_size=batch_size,
+        )
+        retain_files(vendors)
+        # bulk_create skips the signals; new slugs may be cached as unknown
+        # and the vendor databases (VENDOR_SHARDING) do not exist yet.
+        subdomain_vendors.invalidate()
+        migrate_shards_on_commit(vendor.pk for vendor in vendors)
+    return {"users": len(users), "vendors": len(vendors)}
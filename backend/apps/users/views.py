@@ -1,18 +1,31 @@
 import datetime
 
+from apps.common.tasks import run_in_background
 from django.contrib.auth import get_user_model
 from django.contrib.auth.tokens import default_token_generator
+from django.core.exceptions import ValidationError
 from django.http import HttpResponse
 from django.shortcuts import render
 from django.utils.encoding import force_bytes, force_str
 from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
 from rest_framework import generics, status
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.parsers import MultiPartParser
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework_simplejwt.tokens import RefreshToken
 
-from .serializers import CustomRegisterSerializer, UserSerializer
-from .utils import send_email_notification
+from .serializers import (
+    CustomRegisterSerializer,
+    UserProvisioningSerializer,
+    UserSerializer,
+)
+from .throttling import AUTH_THROTTLES
+from .utils import (
+    check_provisioning,
+    provision_users,
+    read_provisioning_csv,
+    send_email_notification,
+)
 
 User = get_user_model()
 import random
@@ -23,7 +36,8 @@ class CustomUserDetailsView(generics.RetrieveUpdateAPIView):
     permission_classes = [IsAuthenticated]
 
     def get_object(self):
-        return self.request.user
+        # request.user only carries the token claims; edit the stored row.
+        return get_user_model().objects.get(pk=self.request.user.pk)
 
     def get_queryset(self):
         return get_user_model().objects.none()
@@ -32,12 +46,45 @@ class CustomUserDetailsView(generics.RetrieveUpdateAPIView):
 class UserRegisterAPIView(generics.ListCreateAPIView):
     queryset = User.objects.all()
     serializer_class = CustomRegisterSerializer
+    throttle_classes = AUTH_THROTTLES
     # permission_classes = [IsAuthenticated]
 
     def perform_create(self, serializer):
         serializer.save(request=self.request)
 
 
+class UserProvisioningAPIView(generics.GenericAPIView):
+    """
+    Create users, their profiles and vendors from an uploaded CSV.
+
+    The file is validated in the request and the accounts are created in the
+    background; the response (202) counts what will be created.
+    """
+
+    serializer_class = UserProvisioningSerializer
+    permission_classes = [IsAdminUser]
+    parser_classes = [MultiPartParser]
+
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            rows = read_provisioning_csv(serializer.validated_data["file"])
+            check_provisioning(rows)
+        except ValidationError as exc:
+            return Response(exc.message_dict, status=status.HTTP_400_BAD_REQUEST)
+        # Hashing takes a good part of a second per password, so the accounts
+        # are created by the background runner. Hash in its thread: forking a
+        # pool from a web worker copies its threads and connections. Big
+        # files go through the provision_users command.
+        run_in_background(provision_users, rows, processes=1)
+        accepted = {
+            "users": len(rows),
+            "vendors": sum(1 for row in rows if row.get("vendor")),
+        }
+        return Response(accepted, status=status.HTTP_202_ACCEPTED)
+
+
 def generate_random_opt_code(length=8):
     otp = "".join([str(random.randint(0, 9)) for _ in range(length)])
     return otp
@@ -46,6 +93,7 @@ def generate_random_opt_code(length=8):
 class PasswordRegisterEmailVerifyApiView(generics.RetrieveAPIView):
     serializer_class = UserSerializer
     permission_classes = [AllowAny]
+    throttle_classes = AUTH_THROTTLES
 
     def get_object(self):
         email = self.kwargs["email"]
@@ -81,6 +129,7 @@ class PasswordRegisterEmailVerifyApiView(generics.RetrieveAPIView):
 class PasswordChangeApiView(generics.CreateAPIView):
     serializer_class = UserSerializer
     permission_classes = [AllowAny]
+    throttle_classes = AUTH_THROTTLES
 
     def create(self, request, *args, **kwargs):
         otp = request.data.get("otp")
@@ -9,6 +9,8 @@ ALLOWED_HOSTS = ["0.0.0.0", "localhost", "127.0.0.1", "api"]
 
 
 DJANGO_INSTALLED_APPS = [
+    # Serves config.asgi (HTTP and WebSockets) from runserver.
+    "daphne",
     "jazzmin",
     "django.contrib.admin",
     "django.contrib.auth",
@@ -20,6 +22,8 @@ DJANGO_INSTALLED_APPS = [
 
 LOCAL_APPS = [
     "apps.category",
+    "apps.categories",
+    "apps.inventory",
     "apps.users",
     "apps.vendor",
     "apps.profiles",
@@ -27,6 +31,7 @@ LOCAL_APPS = [
     "apps.table",
     "apps.role",
     "apps.common",
+    "apps.analytics",
 ]
 THIRD_PARTY_APP = [
     "drf_spectacular",
@@ -34,6 +39,7 @@ THIRD_PARTY_APP = [
     "django_filters",
     "corsheaders",
     "phonenumber_field",
+    "channels",
 ]
 
 
@@ -72,6 +78,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = "config.wsgi.application"
+ASGI_APPLICATION = "config.asgi.application"
 
 
 # Database
@@ -84,6 +91,39 @@ DATABASES = {
     }
 }
 
+# Per-vendor databases. When enabled, the rows of the models listed below
+# ("app_label" or "app_label.model") live in one SQLite file per vendor under
+# VENDOR_SHARD_DIR, so a vendor's writes do not lock out the others; users,
+# vendors, staff and everything else stay in the default database. Create and
+# migrate them with `manage.py migrate_vendor_shards`.
+VENDOR_SHARDING = os.getenv("VENDOR_SHARDING", "False") == "True"
+VENDOR_SHARD_DIR = Path(os.getenv("VENDOR_SHARD_DIR", ROOT_DIR / "shards"))
+VENDOR_SHARD_MODELS = [
+    "analytics",
+    "categories",
+    "category",
+    "inventory",
+    "table",
+    "restaurant.order",
+    "restaurant.orderitem",
+    "restaurant.multiimages",
+]
+# Seconds a process keeps a vendor database connection open between requests.
+VENDOR_SHARD_CONN_MAX_AGE = int(os.getenv("VENDOR_SHARD_CONN_MAX_AGE", 5 * 60))
+DATABASE_ROUTERS = ["apps.vendor.routers.VendorShardRouter"]
+
+CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    # Auth throttle buckets. Local to each process and sized so that many
+    # clients do not evict (and so refill) each other's buckets; use a shared
+    # backend such as Redis to enforce the limits across workers.
+    "throttle": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "throttle",
+        "OPTIONS": {"MAX_ENTRIES": 100_000},
+    },
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -125,6 +165,8 @@ STATIC_ROOT = str(ROOT_DIR / "staticfiles")
 # Media files (uploads)
 MEDIA_URL = "/media/"
 MEDIA_ROOT = str(ROOT_DIR / "mediafile")
+# Content-addressed uploads never change under the same URL.
+MEDIA_CACHE_MAX_AGE = 60 * 60 * 24 * 365
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
@@ -147,6 +189,51 @@ EMAIL_HOST_USER = os.getenv("EMAIL_HOST_USER")
 
 EMAIL_HOST_PASSWORD = os.getenv("EMAIL_HOST_PASSWORD")
 DEFAULT_FROM_EMAIL = os.getenv("DEFAULT_FROM_EMAIL", EMAIL_HOST_USER)
+# Mail is queued in common.OutboxEmail and delivered by `manage.py send_outbox`.
+# Failed messages are retried after 30s, 1m, 2m, ... up to the maximum delay.
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.getenv("EMAIL_OUTBOX_MAX_ATTEMPTS", 8))
+EMAIL_OUTBOX_RETRY_DELAY = int(os.getenv("EMAIL_OUTBOX_RETRY_DELAY", 30))
+EMAIL_OUTBOX_MAX_DELAY = int(os.getenv("EMAIL_OUTBOX_MAX_DELAY", 60 * 60))
+EMAIL_OUTBOX_CLAIM_TIMEOUT = int(os.getenv("EMAIL_OUTBOX_CLAIM_TIMEOUT", 5 * 60))
+
+# Background tasks run in an in-process thread pool after the transaction commits.
+BACKGROUND_TASK_WORKERS = int(os.getenv("BACKGROUND_TASK_WORKERS", 2))
+BACKGROUND_TASKS_EAGER = os.getenv("BACKGROUND_TASKS_EAGER", "False") == "True"
+IMAGE_DERIVATIVE_WORKERS = int(os.getenv("IMAGE_DERIVATIVE_WORKERS", 2))
+
+# Pre-serialized public menus, versioned per vendor. Use a shared cache backend
+# when running several processes so version bumps are seen everywhere.
+MENU_SNAPSHOT_ENABLED = os.getenv("MENU_SNAPSHOT_ENABLED", "True") == "True"
+MENU_SNAPSHOT_TIMEOUT = int(os.getenv("MENU_SNAPSHOT_TIMEOUT", 60 * 60))
+
+# Row counts shown by paginated list views are cached for the timeout and
+# recounted in the background once older than the refresh interval, in seconds.
+PAGINATION_COUNT_REFRESH = int(os.getenv("PAGINATION_COUNT_REFRESH", 60))
+PAGINATION_COUNT_TIMEOUT = int(os.getenv("PAGINATION_COUNT_TIMEOUT", 60 * 60))
+
+# Vendors resolved from subdomains by SubdomainMiddleware, per process. Unknown
+# subdomains are remembered for the negative timeout, in seconds.
+VENDOR_SUBDOMAIN_CACHE_SIZE = int(os.getenv("VENDOR_SUBDOMAIN_CACHE_SIZE", 10_000))
+VENDOR_SUBDOMAIN_NEGATIVE_TIMEOUT = int(
+    os.getenv("VENDOR_SUBDOMAIN_NEGATIVE_TIMEOUT", 60)
+)
+
+# Order events for kitchen and waiter screens. The in-memory layer only reaches
+# sockets served by the same process; use channels_redis with several workers.
+CHANNEL_LAYERS = {"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}}
+ORDER_STREAM_BATCH_WINDOW = float(os.getenv("ORDER_STREAM_BATCH_WINDOW", 0.1))
+# Seconds after which an order claimed by a kitchen display can be claimed again.
+KITCHEN_CLAIM_TIMEOUT = int(os.getenv("KITCHEN_CLAIM_TIMEOUT", 5 * 60))
+
+# Local time zone that analytics rollups bucket orders into hours with.
+ANALYTICS_TIME_ZONE = os.getenv("ANALYTICS_TIME_ZONE", TIME_ZONE)
+
+# Table reservations, in minutes. The longest length also bounds the range the
+# overlap queries scan. Availability indexes are kept for this many vendor days.
+RESERVATION_DEFAULT_MINUTES = int(os.getenv("RESERVATION_DEFAULT_MINUTES", 90))
+RESERVATION_MAX_MINUTES = int(os.getenv("RESERVATION_MAX_MINUTES", 12 * 60))
+TABLE_INDEX_MAX_DAYS = int(os.getenv("TABLE_INDEX_MAX_DAYS", 512))
+
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:5173",
 ]
@@ -157,7 +244,7 @@ CORS_ALLOW_CREDENTIALS = True
 # Rest framework settings with JWT
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "apps.users.authentication.VendorJWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.AllowAny",
@@ -166,6 +253,24 @@ REST_FRAMEWORK = {
         "django_filters.rest_framework.DjangoFilterBackend",
     ],
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    # JSON is encoded and decoded with orjson when it is installed.
+    "DEFAULT_RENDERER_CLASSES": [
+        "apps.common.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "apps.common.renderers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
+    # Proxies in front of the app that append to X-Forwarded-For. With the
+    # default of 0 throttles key on REMOTE_ADDR and ignore the header.
+    "NUM_PROXIES": int(os.getenv("NUM_PROXIES", 0)),
+    # Token buckets of the login, registration and password reset views.
+    "DEFAULT_THROTTLE_RATES": {
+        "auth_ip": os.getenv("AUTH_THROTTLE_IP_RATE", "30/min"),
+        "auth_account": os.getenv("AUTH_THROTTLE_ACCOUNT_RATE", "5/min"),
+    },
 }
 
 # Simple JWT settings
@@ -179,7 +284,24 @@ SIMPLE_JWT = {
     "ROTATE_REFRESH_TOKENS": True,
     "AUTH_HEADER_NAME": "HTTP_AUTHORIZATION",
     "AUTH_TOKEN_CLASSES": ("rest_framework_simplejwt.tokens.AccessToken",),
+    "TOKEN_OBTAIN_SERIALIZER": "apps.users.serializers.VendorTokenObtainPairSerializer",
+    "TOKEN_REFRESH_SERIALIZER": "apps.users.serializers.VendorTokenRefreshSerializer",
+    "TOKEN_BLACKLIST_SERIALIZER": "apps.users.serializers.RefreshTokenRevokeSerializer",
 }
+# Seconds the claims of tokens issued without vendor claims, and whether a
+# token's user is still active, are cached for. Deactivations reach other
+# processes within this time, or at once with a shared cache such as Redis.
+JWT_CLAIMS_CACHE_TIMEOUT = int(os.getenv("JWT_CLAIMS_CACHE_TIMEOUT", 60))
+# Revoked refresh tokens are screened by an in-process Bloom filter. Rows
+# revoked by other processes are picked up every sync interval; the filter is
+# rebuilt every rebuild interval, dropping tokens purged by
+# `manage.py purge_revoked_tokens`.
+JWT_REVOCATION_SYNC_INTERVAL = int(os.getenv("JWT_REVOCATION_SYNC_INTERVAL", 5))
+JWT_REVOCATION_REBUILD_INTERVAL = int(
+    os.getenv("JWT_REVOCATION_REBUILD_INTERVAL", 60 * 60)
+)
+JWT_REVOCATION_FILTER_CAPACITY = 100_000
+JWT_REVOCATION_FILTER_ERROR_RATE = 0.001
 
 
 LOGGING = {
@@ -1,3 +1,4 @@
+from apps.common.views import serve_media
 from django.conf import settings
 from django.conf.urls.static import static
 from django.contrib import admin
@@ -22,6 +23,10 @@ urlpatterns = [
     path("api/v1/profiles/", include("apps.profiles.urls"), name="profiles"),
     path("api/v1/restaurant/", include("apps.restaurant.urls"), name="restaurant"),
     path("api/v1/category/", include("apps.category.urls"), name="category"),
+    path("api/v1/categories/", include("apps.categories.urls"), name="categories"),
+    path("api/v1/inventory/", include("apps.inventory.urls"), name="inventory"),
+    path("api/v1/analytics/", include("apps.analytics.urls"), name="analytics"),
+    path("api/v1/table/", include("apps.table.urls"), name="table"),
 ] + static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
 
 admin.site.site_header = "Stock management system  Admin"
@@ -29,4 +34,6 @@ admin.site.site_title = "Stock management Admin Portal"
 admin.site.index_title = "Welcome to Stock management Center API Portal"
 
 if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    urlpatterns += static(
+        settings.MEDIA_URL, view=serve_media, document_root=settings.MEDIA_ROOT
+    )